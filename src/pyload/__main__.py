@@ -3,13 +3,14 @@
 
 import argparse
 import atexit
+import importlib.abc
 import os
 import sys
+import threading
 import time
 from functools import partial
 
 from . import __version__
-from .core import Core
 
 DESCRIPTION = """
        ____________
@@ -25,7 +26,86 @@ The free and open-source Download Manager written in pure Python
 """
 
 
+class ImportProfiler(importlib.abc.MetaPathFinder):
+    """
+    measures the time spent importing modules, like `python -X importtime`, and
+    sums it up by the pyLoad subsystem which imported them.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.times = {}  #: module name -> (subsystem, time without submodules)
+
+    def start(self):
+        sys.meta_path.insert(0, self)
+
+    def stop(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        finders = sys.meta_path[sys.meta_path.index(self) + 1 :]
+        for finder in finders:
+            find_spec = getattr(finder, "find_spec", None)
+            spec = None if find_spec is None else find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        #: builtin and frozen modules are loaded by classes shared by all of them
+        if (
+            loader is not None
+            and not isinstance(loader, type)
+            and hasattr(loader, "exec_module")
+            and "exec_module" not in vars(loader)
+        ):
+            loader.exec_module = partial(self.exec_module, loader.exec_module)
+        return spec
+
+    def exec_module(self, exec_module, module):
+        stack = self.local.__dict__.setdefault("stack", [])
+        name = module.__name__
+        if name == "pyload" or name.startswith("pyload."):
+            subsystem = ".".join(name.split(".")[:3])
+        else:
+            subsystem = stack[-1][1] if stack else "python"
+
+        stack.append([name, subsystem, 0.0])  #: name, subsystem, time of submodules
+        start = time.perf_counter()
+        try:
+            exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = stack.pop()[2]
+            if stack:
+                stack[-1][2] += elapsed
+            self.times[name] = (subsystem, elapsed - children)
+
+    def print_report(self, file=sys.stderr, limit=3):
+        subsystems = {}
+        for name, (subsystem, elapsed) in self.times.items():
+            subsystems.setdefault(subsystem, []).append((elapsed, name))
+
+        total = sum(elapsed for _, elapsed in self.times.values())
+        file.write(f"Import time {total * 1000:.0f} ms, by subsystem:\n")
+        for subsystem, modules in sorted(
+            subsystems.items(), key=lambda x: -sum(m[0] for m in x[1])
+        ):
+            modules.sort(reverse=True)
+            heaviest = ", ".join(
+                f"{name} {elapsed * 1000:.0f}" for elapsed, name in modules[:limit]
+            )
+            file.write(
+                f"{sum(m[0] for m in modules) * 1000:8.1f} ms  {subsystem:<28}"
+                f"{len(modules):4d} modules  ({heaviest})\n"
+            )
+
+
 def _daemon(core_args, pid_file=""):
+    from .core import Core
+
     try:
         pid = os.fork()
         if pid > 0:
@@ -162,6 +242,8 @@ def _parse_args(cmd_args):
     Returns:
       :obj:`argparse.Namespace`: command line parameters namespace
     """
+    from .core import Core
+
     parser = argparse.ArgumentParser(
         description=DESCRIPTION, formatter_class=argparse.RawDescriptionHelpFormatter,
     )
@@ -201,12 +283,20 @@ def _parse_args(cmd_args):
     parser.add_argument("--daemon", action="store_true", help="run as daemon")
     parser.add_argument("--quit", action="store_true", help="quit running pyLoad instance", default=False)
     parser.add_argument("--status", action="store_true", help="display pid if running or 0", default=False)
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print the time spent importing modules on start-up",
+        default=False,
+    )
     group.add_argument("--version", action="version", version=f"pyLoad {__version__}")
 
     return parser.parse_args(cmd_args)
 
 
-def run(core_args, daemon=False, pid_file=""):
+def run(core_args, daemon=False, pid_file="", profiler=None):
+    from .core import Core
+
     # change name to 'pyLoad'
     # from .lib.rename_process import rename_process
     # rename_process('pyLoad')
@@ -233,6 +323,10 @@ def run(core_args, daemon=False, pid_file=""):
             atexit.register(partial(delete_pid_file, pid_file))
 
     pyload_core = Core(*core_args)
+    if profiler is not None:
+        profiler.stop()
+        profiler.print_report()
+
     try:
         pyload_core.start()
     except KeyboardInterrupt:
@@ -283,13 +377,19 @@ def main(cmd_args=sys.argv[1:]):
     """
     Entry point for console_scripts.
     """
+    #: started before parsing, which already imports the core
+    profiler = None
+    if "--profile-startup" in cmd_args:
+        profiler = ImportProfiler()
+        profiler.start()
+
     args = _parse_args(cmd_args)
     core_args = (args.userdir, args.tempdir, args.storagedir, args.debug, args.reset, args.dry_run)
 
     if args.quit:
         quit_instance(args.pidfile)
     else:
-        run(core_args, args.daemon, args.pidfile)
+        run(core_args, args.daemon, args.pidfile, profiler)
 
 
 if __name__ == "__main__":
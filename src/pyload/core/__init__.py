@@ -167,6 +167,11 @@ class Core:
         self.api = Api(self)
 
     def _init_webserver(self):
+        #: flask and its extensions are only imported when the webui is used
+        if not self.config.get("webui", "enabled"):
+            self.webserver = None
+            return
+
         from pyload.webui.webserver_thread import WebServerThread
 
         self.webserver = WebServerThread(self)
@@ -292,12 +297,12 @@ class Core:
         self.adm.core_ready()
 
     def _start_webserver(self):
-        if not self.config.get("webui", "enabled"):
+        if self.webserver is None:
             return
         self.webserver.start()
 
     def _stop_webserver(self):
-        if not self.config.get("webui", "enabled"):
+        if self.webserver is None:
             return
         self.webserver.stop()
 
@@ -410,6 +415,8 @@ class Core:
             if self._dry_run:
                 raise Exit
 
+            self.scheduler.start()
+
             while True:
                 self._running.wait()
                 self.thread_manager.run()
@@ -417,7 +424,6 @@ class Core:
                     raise Restart
                 if self._do_exit:
                     raise Exit
-                self.scheduler.run()
                 time.sleep(1)
 
         except Restart:
@@ -479,6 +485,8 @@ class Core:
             for thread in self.thread_manager.threads:
                 thread.put("quit")
 
+            self.scheduler.stop()
+
             for pyfile in list(self.files.cache.values()):
                 pyfile.abort_download()
 
@@ -487,5 +495,13 @@ class Core:
 
         finally:
             self.files.sync_save()
+            try:
+                self.config.flush()
+            except Exception:
+                self.log.error(
+                    self._("Unable to save the configuration"),
+                    exc_info=self.debug > 1,
+                    stack_info=self.debug > 2,
+                )
             self._running.clear()
             # self.evm.fire('pyload:stopped')
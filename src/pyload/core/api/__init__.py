@@ -8,9 +8,11 @@
 #           \  /
 #            \/
 
+import hmac
 import json
 import os
 import re
+import secrets
 import time
 from enum import IntFlag
 
@@ -18,7 +20,9 @@ from ..datatypes.data import *
 from ..datatypes.enums import *
 from ..datatypes.exceptions import *
 from ..datatypes.pyfile import PyFile
+from ..datatypes.ttl_cache import TTLCache
 from ..log_factory import LogFactory
+from ..log_reader import LogReader
 from ..network.request_factory import get_url
 from ..utils import fs, seconds
 from ..utils.old.packagetools import parse_names
@@ -112,10 +116,20 @@ class Api:
 
         return obj
 
+    AUTH_CACHE_SIZE = 100
+    AUTH_CACHE_TTL = 5 * 60  #: seconds verified logins are remembered
+
     def __init__(self, core):
         self.pyload = core
         self._ = core._
 
+        #: keyed hash of verified logins -> user info, spares the slow password hash
+        self.auth_cache = TTLCache(self.AUTH_CACHE_SIZE, self.AUTH_CACHE_TTL)
+        self.auth_key = os.urandom(32)
+        self.auth_generation = 0  #: increased when users change
+
+        self.log_reader = None
+
     def _convert_py_file(self, p):
         f = FileData(
             p["id"],
@@ -132,6 +146,26 @@ class Api:
         )
         return f
 
+    def _convert_package(self, pack, links=True):
+        return PackageData(
+            pack["id"],
+            pack["name"],
+            pack["folder"],
+            pack["site"],
+            pack["password"],
+            pack["queue"],
+            pack["order"],
+            pack["linksdone"],
+            pack["sizedone"],
+            pack["sizetotal"],
+            pack["linkstotal"],
+            links=(
+                [self._convert_py_file(x) for x in pack["links"].values()]
+                if links
+                else None
+            ),
+        )
+
     def _convert_config_format(self, c):
         sections = {}
         for section_name, sub in c.items():
@@ -190,6 +224,8 @@ class Api:
             if option in (
                 "limit_speed",
                 "max_speed",
+                "speed_limits",
+                "speed_weights",
             ):  #: not so nice to update the limit
                 self.pyload.request_factory.update_bucket()
 
@@ -308,6 +344,29 @@ class Api:
         """
         return fs.free_space(self.pyload.config.get("general", "storage_folder"))
 
+    @permission(Perms.STATUS)
+    def get_cache_stats(self):
+        """
+        Statistics of the links and packages kept in memory.
+
+        :return: dict with size, resident, in_use, hits, misses and evictions of the
+            "links" and the "packages" cache
+        """
+        return {
+            "links": self.pyload.files.cache.stats(),
+            "packages": self.pyload.files.package_cache.stats(),
+        }
+
+    @permission(Perms.STATUS)
+    def get_scheduler_stats(self):
+        """
+        Statistics of the scheduled jobs.
+
+        :return: dict with the number of waiting jobs, the active threaded jobs, the
+            workers, the executed jobs and the last and max lag in seconds
+        """
+        return self.pyload.scheduler.stats()
+
     @legacy("getServerVersion")
     @permission(Perms.ANY)
     def get_server_version(self):
@@ -330,26 +389,63 @@ class Api:
 
     @legacy("getLog")
     @permission(Perms.LOGS)
-    def get_log(self, offset=0):
+    def get_log(self, offset=0, limit=0):
         """
         Returns most recent log entries.
 
-        :param offset: line offset
+        :param offset: line offset, negative to count from the end
+        :param limit: maximum number of lines, 0 for all
         :return: List of log entries
         """
+        try:
+            if offset < 0:
+                lines = self._get_log_reader().tail(-offset)
+                return lines[:limit] if limit else lines
+            return self._get_log_reader().read(offset, limit)
+        except Exception:
+            return ["No log available"]
+
+    @permission(Perms.LOGS)
+    def get_log_length(self):
+        """
+        Number of lines in the log.
+        """
+        try:
+            return self._get_log_reader().length()
+        except OSError:
+            return 0
+
+    @permission(Perms.LOGS)
+    def get_log_stats(self):
+        """
+        Statistics of the loggers writing from a background thread.
+
+        :return: dict of logger name to the number of queued and dropped records
+        """
+        return self.pyload.logfactory.stats()
+
+    @permission(Perms.LOGS)
+    def find_log_line(self, date):
+        """
+        Finds the first log entry logged at or after a date.
+
+        :param date: date formatted like "2020-01-31 12:00:00"
+        :return: line offset, the number of lines if there is no such entry
+        """
+        try:
+            return self._get_log_reader().find(date)
+        except OSError:
+            return 0
+
+    def _get_log_reader(self):
         filelog_folder = self.pyload.config.get("log", "filelog_folder")
         if not filelog_folder:
             filelog_folder = os.path.join(self.pyload.userdir, "logs")
 
         path = os.path.join(filelog_folder, "pyload" + LogFactory.FILE_EXTENSION)
-        try:
-            with open(path) as fh:
-                lines = fh.readlines()
-            if offset >= len(lines):
-                return []
-            return lines[offset:]
-        except Exception:
-            return ["No log available"]
+        if self.log_reader is None or self.log_reader.path != path:
+            self.log_reader = LogReader(path)
+        return self.log_reader
 
     @legacy("isTimeDownload")
     @permission(Perms.STATUS)
@@ -805,6 +901,61 @@ class Api:
             ).values()
         ]
 
+    @permission(Perms.LIST)
+    def get_queue_changes(self, revision, destination=Destination.QUEUE):
+        """
+        Returns what changed in queue or collector since a revision, so clients can keep
+        their copy up to date without loading everything again.
+
+        Packages have .links set if all their links changed, other changed links are
+        in .links of the result. If .reload is set the changes are not known that far
+        back, use `get_queue_snapshot` instead.
+
+        :param revision: revision of the last changes or snapshot
+        :param destination: `Destination`
+        :return: `QueueChanges`
+        """
+        revision, changes = self.pyload.files.get_changes(
+            int(revision), Destination(destination)
+        )
+        if changes is None:
+            return QueueChanges(revision, True, [], [], [], [])
+
+        packages = []
+        links = []
+        for pack in changes["packages"].values():
+            linked = pack["id"] in changes["linked"]
+            packages.append(self._convert_package(pack, linked))
+            if not linked:
+                links.extend(self._convert_py_file(x) for x in pack["links"].values())
+
+        return QueueChanges(
+            revision,
+            False,
+            packages,
+            links,
+            sorted(changes["removed_packages"]),
+            sorted(changes["removed_links"]),
+        )
+
+    @permission(Perms.LIST)
+    def get_queue_snapshot(self, destination=Destination.QUEUE, offset=0, limit=100):
+        """
+        Returns a page of the packages in queue or collector with their links, the
+        revision is the starting point for `get_queue_changes`.
+
+        :param destination: `Destination`
+        :param offset: index of the first package
+        :param limit: max number of packages
+        :return: `QueueSnapshot`, .total is the number of packages
+        """
+        revision, packs, total = self.pyload.files.get_snapshot(
+            Destination(destination), int(offset), int(limit)
+        )
+        return QueueSnapshot(
+            revision, [self._convert_package(x) for x in packs.values()], total
+        )
+
     @legacy("addFiles")
     @permission(Perms.ADD)
     def add_files(self, package_id, links):
@@ -1126,6 +1277,21 @@ class Api:
         :return: list of `Events`
         """
         events = self.pyload.event_manager.get_events(uuid)
+        return self._convert_events(events)
+
+    @permission(Perms.STATUS)
+    def wait_events(self, cursor, timeout=0):
+        """
+        Lists the events occurred after cursor, waits up to timeout seconds for one.
+
+        :param cursor: cursor returned by the last call, None to start now
+        :param timeout: seconds to wait if there is no new event
+        :return: tuple of the new cursor and a list of `Events`
+        """
+        cursor, events = self.pyload.event_manager.wait_events(cursor, timeout)
+        return cursor, self._convert_events(events)
+
+    def _convert_events(self, events):
         new_events = []
 
         def conv_dest(d):
@@ -1230,7 +1396,70 @@ class Api:
         :param password:
         :return: dict with info, empty when login is incorrect
         """
-        return self.pyload.db.check_auth(username, password)
+        return self._cached_auth(
+            self.pyload.db.check_auth, "user", username, password
+        )
+
+    def check_token(self, token):
+        """
+        Check an api token and returns details of its user.
+
+        :param token:
+        :return: dict with info, empty when the token is unknown
+        """
+        return self._cached_auth(self.pyload.db.check_token, "token", token)
+
+    @permission(Perms.ANY)
+    def generate_api_token(self, username, password):
+        """
+        Creates a token to authenticate api calls with instead of the password, sent as
+        "Authorization: Bearer <token>" header.
+
+        :param username:
+        :param password:
+        :return: the token, empty when login is incorrect
+        """
+        if not self.check_auth(username, password):
+            return ""
+
+        token = secrets.token_urlsafe(32)
+        self.pyload.db.add_token(username, token)
+        return token
+
+    @permission(Perms.ANY)
+    def revoke_api_tokens(self, username, password):
+        """
+        Deletes all api tokens of the user.
+
+        :param username:
+        :param password:
+        :return: bool indicating login was successful
+        """
+        if not self.check_auth(username, password):
+            return False
+
+        self.pyload.db.remove_tokens(username)
+        self._clear_auth_cache()
+        return True
+
+    def _cached_auth(self, check, *credentials):
+        key = hmac.new(
+            self.auth_key,
+            "\0".join(f"{len(x)}:{x}" for x in credentials).encode(),
+            "sha256",
+        ).digest()
+        user = self.auth_cache.get(key)
+        if user is None:
+            generation = self.auth_generation
+            user = check(*credentials[1:])
+            #: failed logins are not cached, guessing stays as slow as before
+            if user and generation == self.auth_generation:
+                self.auth_cache.set(key, user)
+        return dict(user)
+
+    def _clear_auth_cache(self):
+        self.auth_generation += 1
+        self.auth_cache.clear()
 
     def user_exists(self, username):
         """
@@ -1412,22 +1641,29 @@ class Api:
         """
         creates new user login.
         """
-        return self.pyload.db.add_user(user, newpw, role, perms)
+        result = self.pyload.db.add_user(user, newpw, role, perms)
+        self._clear_auth_cache()
+        return result
 
     def remove_user(self, user):
         """
         deletes a user login.
         """
-        return self.pyload.db.remove_user(user)
+        result = self.pyload.db.remove_user(user)
+        self._clear_auth_cache()
+        return result
 
     @legacy("changePassword")
     def change_password(self, user, oldpw, newpw):
         """
         changes password for specific user.
         """
-        return self.pyload.db.change_password(user, oldpw, newpw)
+        result = self.pyload.db.change_password(user, oldpw, newpw)
+        self._clear_auth_cache()
+        return result
 
     @legacy("setUserPermission")
     def set_user_permission(self, user, permission, role):
         self.pyload.db.set_permission(user, permission)
         self.pyload.db.set_role(user, role)
+        self._clear_auth_cache()
@@ -4,10 +4,12 @@ import os
 import re
 import shutil
 import time
+from threading import RLock, Timer
 
 from pyload import PKGDIR
 
 from ... import exc_logger
+from ..utils.struct.lock import lock
 
 # CONFIG_VERSION
 __version__ = 2
@@ -38,6 +40,8 @@ class ConfigParser:
     _SECTLINE = re.compile(r'(.+?)\s+-\s+"(.+?)":')
     _VERSION = re.compile(r"\s*version\s*:\s*(\d+)")
 
+    SAVE_DELAY = 2  #: seconds changes are collected before they are written
+
     def __init__(self, userdir):
         """
         Constructor.
@@ -54,6 +58,10 @@ class ConfigParser:
 
         self.plugin_cb = None  #: callback when plugin config value is changed
 
+        self.lock = RLock()
+        self.changed = set()  #: configs with unsaved changes, "config" or "plugin"
+        self.save_timer = None
+
         self.check_version()
 
         self.read_default_config()
@@ -232,12 +240,15 @@ class ConfigParser:
                         # else:
                         #    dest[section] = config[section]
 
+    @lock
     def save_config(self, config, filename):
         """
-        saves config to filename.
+        saves config to filename, through a temporary file so it is never left half
+        written.
         """
-        with open(filename, mode="w") as fp:
-            os.chmod(filename, 0o600)
+        tmpfile = filename + ".tmp"
+        with open(tmpfile, mode="w") as fp:
+            os.chmod(tmpfile, 0o600)
             fp.write(f"version: {__version__} \n")
             for section in sorted(config.keys()):
                 fp.write(f'\n{section} - "{config[section]["desc"]}":\n')
@@ -258,6 +269,8 @@ class ConfigParser:
 
                     fp.write(f'\t{data["type"]} {option} : "{data["desc"]}" = {value}')
 
+        os.replace(tmpfile, filename)
+
     def cast(self, typ, value):
         """
         cast value to given format.
@@ -309,12 +322,50 @@ class ConfigParser:
         else:
             return value
 
+    @lock
     def save(self):
         """
         saves the configs to disk.
         """
-        self.save_config(self.config, self.configpath)
-        self.save_config(self.plugin, self.pluginpath)
+        self.changed = {"config", "plugin"}
+        self.flush()
+
+    @lock
+    def save_later(self, name):
+        """
+        marks config name as changed, all changes are saved together SAVE_DELAY
+        seconds after the first one.
+        """
+        self.changed.add(name)
+        if self.save_timer is None:
+            self.save_timer = Timer(self.SAVE_DELAY, self._flush_changes)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    @lock
+    def flush(self):
+        """
+        saves the pending changes to disk.
+        """
+        if self.save_timer is not None:
+            self.save_timer.cancel()
+            self.save_timer = None
+
+        changed, self.changed = self.changed, set()
+        try:
+            if "config" in changed:
+                self.save_config(self.config, self.configpath)
+            if "plugin" in changed:
+                self.save_config(self.plugin, self.pluginpath)
+        except Exception:
+            self.changed |= changed  #: retried with the next save
+            raise
+
+    def _flush_changes(self):
+        try:
+            self.flush()
+        except Exception as exc:
+            exc_logger.exception(exc)
 
     def __getitem__(self, section):
         """
@@ -335,7 +386,7 @@ class ConfigParser:
         value = self.cast(self.config[section][option]["type"], value)
 
         self.config[section][option]["value"] = value
-        self.save()
+        self.save_later("config")
 
     def toggle(self, section, option):
         self.set(section, option, self.get(section, option) ^ True)
@@ -357,7 +408,7 @@ class ConfigParser:
             self.plugin_cb(plugin, option, value)
 
         self.plugin[plugin][option]["value"] = value
-        self.save()
+        self.save_later("plugin")
 
     def get_meta_data(self, section, option):
         """
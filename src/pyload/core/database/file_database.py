@@ -107,7 +107,7 @@ class FileDatabaseMethods:
             (f.order, str(f.packageid)),
         )
 
-    @style.queue
+    @style.read
     def get_all_links(self, q):
         """
         return information about all links in queue q.
@@ -143,7 +143,7 @@ class FileDatabaseMethods:
 
         return data
 
-    @style.queue
+    @style.read
     def get_all_packages(self, q):
         """
         return information about packages in queue q (only useful in get all data)
@@ -161,7 +161,7 @@ class FileDatabaseMethods:
         self.c.execute(
             "SELECT p.id, p.name, p.folder, p.site, p.password, p.queue, p.packageorder, s.sizetotal, s.sizedone, s.linksdone, s.linkstotal \
             FROM packages p JOIN pstats s ON p.id = s.id \
-            WHERE p.queue=? ORDER BY p.packageorder",
+            WHERE p.queue=? AND s.linkstotal > 0 ORDER BY p.packageorder",
             str(q),
         )
 
@@ -184,7 +184,7 @@ class FileDatabaseMethods:
 
         return data
 
-    @style.queue
+    @style.read
     def get_link_data(self, id):
         """
         get link information as dict.
@@ -215,7 +215,7 @@ class FileDatabaseMethods:
 
         return data
 
-    @style.queue
+    @style.read
     def get_package_data(self, id):
         """
         get data about links for a package.
@@ -243,7 +243,39 @@ class FileDatabaseMethods:
 
         return data
 
+    @style.read
+    def get_links(self, ids=(), pids=()):
+        """
+        get information about the given links and all links of the given packages.
+        """
+        data = {}
+        for column, values in (("id", list(ids)), ("package", list(pids))):
+            #: stay below the limit of sql variables
+            for i in range(0, len(values), 500):
+                chunk = values[i : i + 500]
+                self.c.execute(
+                    f"SELECT id,url,name,size,status,error,plugin,package,linkorder FROM links WHERE {column} IN ({','.join('?' * len(chunk))}) ORDER BY linkorder",
+                    chunk,
+                )
+                for r in self.c:
+                    data[r[0]] = {
+                        "id": r[0],
+                        "url": r[1],
+                        "name": r[2],
+                        "size": r[3],
+                        "format_size": format.size(r[3]),
+                        "status": r[4],
+                        "statusmsg": self.pyload.files.status_msg[r[4]],
+                        "error": r[5],
+                        "plugin": r[6],
+                        "package": r[7],
+                        "order": r[8],
+                    }
+
+        return data
+
     @style.async_
+    @style.coalesce
     def update_link(self, f):
         self.c.execute(
             "UPDATE links SET url=?,name=?,size=?,status=?,error=?,package=? WHERE id=?",
@@ -357,44 +389,22 @@ class FileDatabaseMethods:
         return PyFile(self.pyload.files, id, *r)
 
     @style.queue
-    def get_job(self, occupied):
+    def get_jobs(self, pid=None):
         """
-        return pyfile ids, which are suitable for download and don't use an occupied
-        plugin.
+        return (id, plugin, package, queue, packageorder, linkorder) of links waiting
+        to be processed, of all packages or only of package pid.
         """
-        # TODO: improve this hardcoded method
-        # plugins which are processed in collector
-        pre = ("DLC", "TXT", "CCF", "RSDF")
-
-        self.c.execute(
-            f"""
-            SELECT l.id FROM links as l
-            INNER JOIN packages as p ON l.package=p.id
-            WHERE ((p.queue=1 AND l.plugin NOT IN ({",".join("?" * len(occupied))})) OR l.plugin IN ({",".join("?" * len(pre))})) AND l.status IN (2,3,14)
-            ORDER BY p.packageorder ASC, l.linkorder ASC
-            LIMIT 5
-            """,
-            occupied + pre,
-        )
-
-        return [x[0] for x in self.c]
-
-    @style.queue
-    def get_plugin_job(self, plugins):
-        """
-        returns pyfile ids with suited plugins.
-        """
-        self.c.execute(
-            f"""
-            SELECT l.id FROM links as l
+        query = """
+            SELECT l.id, l.plugin, l.package, p.queue, p.packageorder, l.linkorder FROM links as l
             INNER JOIN packages as p ON l.package=p.id
-            WHERE l.plugin IN ({",".join("?" * len(plugins))}) AND l.status IN (2,3,14)
-            ORDER BY p.packageorder ASC, l.linkorder ASC LIMIT 5
-            """,
-            plugins,
-        )
+            WHERE l.status IN (2,3,14)
+            """
+        if pid is None:
+            self.c.execute(query)
+        else:
+            self.c.execute(query + " AND l.package=?", (pid,))
 
-        return [x[0] for x in self.c]
+        return self.c.fetchall()
 
     @style.queue
     def get_unfinished(self, pid):
@@ -23,6 +23,11 @@ def _check_password(hashed, clear):
     return hashed == to_compare
 
 
+#: tokens are random, a plain hash is enough to not store them readable
+def _hashed_token(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 class UserDatabaseMethods:
     @style.queue
     def check_auth(self, user, password):
@@ -122,4 +127,47 @@ class UserDatabaseMethods:
 
     @style.queue
     def remove_user(self, user):
+        self.c.execute(
+            "DELETE FROM tokens WHERE user IN (SELECT id FROM users WHERE name=?)",
+            (user,),
+        )
         self.c.execute("DELETE FROM users WHERE name=?", (user,))
+
+    @style.queue
+    def add_token(self, user, token):
+        self.c.execute("SELECT id FROM users WHERE name=?", (user,))
+        r = self.c.fetchone()
+        if not r:
+            return False
+
+        self.c.execute(
+            "INSERT INTO tokens (user, token) VALUES (?, ?)", (r[0], _hashed_token(token))
+        )
+        return True
+
+    @style.queue
+    def check_token(self, token):
+        self.c.execute(
+            "SELECT users.id, name, role, permission, template, email FROM tokens "
+            "INNER JOIN users ON tokens.user=users.id WHERE tokens.token=?",
+            (_hashed_token(token),),
+        )
+        r = self.c.fetchone()
+        if not r:
+            return {}
+
+        return {
+            "id": r[0],
+            "name": r[1],
+            "role": r[2],
+            "permission": r[3],
+            "template": r[4],
+            "email": r[5],
+        }
+
+    @style.queue
+    def remove_tokens(self, user):
+        self.c.execute(
+            "DELETE FROM tokens WHERE user IN (SELECT id FROM users WHERE name=?)",
+            (user,),
+        )
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from collections import OrderedDict
+from threading import Lock
+
+from ..utils.struct.lock import lock
+
+
+class ChangeLog:
+    """
+    remembers which items changed at which revision, for clients keeping a copy.
+
+    Every change bumps the revision, an item only keeps the revision of its last change,
+    so the log grows with the number of changed items, not with the number of changes.
+    The oldest items are dropped above MAX_CHANGES, clients older than that have to
+    reload everything.
+    """
+
+    MAX_CHANGES = 10000
+
+    def __init__(self):
+        self.lock = Lock()
+        self.revision = 0
+        self.start = 0  #: changes up to this revision are not tracked anymore
+        self.changes = OrderedDict()  #: item key -> revision of its last change
+
+    @lock
+    def add(self, *keys):
+        for key in keys:
+            self.revision += 1
+            self.changes[key] = self.revision
+            self.changes.move_to_end(key)
+
+        while len(self.changes) > self.MAX_CHANGES:
+            key, self.start = self.changes.popitem(last=False)
+
+    @lock
+    def reset(self):
+        """
+        forgets all changes, every client has to reload.
+        """
+        self.revision += 1
+        self.start = self.revision
+        self.changes.clear()
+
+    @lock
+    def since(self, revision):
+        """
+        returns the current revision and the keys changed after revision, or None
+        instead of the keys if they are not known.
+        """
+        if not self.start <= revision <= self.revision:
+            return self.revision, None
+
+        keys = []
+        for key in reversed(self.changes):
+            if self.changes[key] <= revision:
+                break
+            keys.append(key)
+        return self.revision, keys
@@ -297,6 +297,42 @@ class PackageData(AbstractData):
         self.fids = fids
 
 
+class QueueChanges(AbstractData):
+    __slots__ = [
+        "revision",
+        "reload",
+        "packages",
+        "links",
+        "removed_packages",
+        "removed_links",
+    ]
+
+    def __init__(
+        self,
+        revision=None,
+        reload=None,
+        packages=None,
+        links=None,
+        removed_packages=None,
+        removed_links=None,
+    ):
+        self.revision = revision
+        self.reload = reload
+        self.packages = packages
+        self.links = links
+        self.removed_packages = removed_packages
+        self.removed_links = removed_links
+
+
+class QueueSnapshot(AbstractData):
+    __slots__ = ["revision", "packages", "total"]
+
+    def __init__(self, revision=None, packages=None, total=None):
+        self.revision = revision
+        self.packages = packages
+        self.total = total
+
+
 class ServerStatus(AbstractData):
     __slots__ = [
         "pause",
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+
+import heapq
+from threading import Lock
+
+from ..utils.struct.lock import lock
+
+#: status codes of links waiting to be processed: online, queued, unknown
+JOB_STATUS = (2, 3, 14)
+
+
+class JobIndex:
+    """
+    in-memory index of the links waiting to be processed, ordered like the queue.
+
+    Links are kept in one heap per plugin and queue, sorted by package and link order,
+    so the next job is found without querying the database. Heaps are cleaned lazily,
+    a heap entry is only valid while it is the current entry of its link.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.heaps = {}  #: (plugin, queue) -> heap of (packageorder, linkorder, id)
+        self.sizes = {}  #: (plugin, queue) -> number of valid entries in its heap
+        self.entries = {}  #: id -> ((plugin, queue), heap entry, package id)
+        self.packages = {}  #: package id -> ids of its indexed links
+
+    @lock
+    def load(self, jobs):
+        """
+        replaces the index, jobs are tuples (id, plugin, package, queue, packageorder, linkorder).
+        """
+        self.heaps.clear()
+        self.sizes.clear()
+        self.entries.clear()
+        self.packages.clear()
+        for job in jobs:
+            self._add(*job)
+
+    @lock
+    def load_package(self, pid, jobs):
+        """
+        replaces the indexed links of a package.
+        """
+        for id in list(self.packages.get(pid, ())):
+            self._remove(id)
+        for job in jobs:
+            self._add(*job)
+
+    @lock
+    def update(self, id, plugin, pid, queue, packageorder, linkorder, status):
+        """
+        adds, moves or removes a link according to its status.
+        """
+        self._remove(id)
+        if status in JOB_STATUS:
+            self._add(id, plugin, pid, queue, packageorder, linkorder)
+
+    @lock
+    def remove(self, id):
+        self._remove(id)
+
+    @lock
+    def remove_package(self, pid):
+        for id in list(self.packages.get(pid, ())):
+            self._remove(id)
+
+    @lock
+    def get(self, accept):
+        """
+        returns the first id of the heaps accepted by accept(plugin, queue).
+        """
+        best = None
+        for key in self.heaps:
+            if not accept(*key):
+                continue
+            top = self._top(key)
+            if top is not None and (best is None or top < best):
+                best = top
+
+        return None if best is None else best[2]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _add(self, id, plugin, pid, queue, packageorder, linkorder):
+        key = (plugin, queue)
+        entry = (packageorder, linkorder, id)
+        self.entries[id] = (key, entry, pid)
+        self.packages.setdefault(pid, set()).add(id)
+        self.sizes[key] = self.sizes.get(key, 0) + 1
+
+        heap = self.heaps.setdefault(key, [])
+        heapq.heappush(heap, entry)
+        if len(heap) > 2 * self.sizes[key] + 64:
+            self._compact(key)
+
+    def _remove(self, id):
+        current = self.entries.pop(id, None)
+        if current is None:
+            return
+        key, entry, pid = current
+        self.sizes[key] -= 1
+        ids = self.packages[pid]
+        ids.discard(id)
+        if not ids:
+            del self.packages[pid]
+
+    def _is_valid(self, key, entry):
+        current = self.entries.get(entry[2])
+        return current is not None and current[0] == key and current[1] == entry
+
+    def _top(self, key):
+        """
+        pops invalid entries and returns the first valid one.
+        """
+        heap = self.heaps[key]
+        while heap:
+            if self._is_valid(key, heap[0]):
+                return heap[0]
+            heapq.heappop(heap)
+
+    def _compact(self, key):
+        heap = [entry for entry in self.heaps[key] if self._is_valid(key, entry)]
+        heapq.heapify(heap)
+        self.heaps[key] = heap
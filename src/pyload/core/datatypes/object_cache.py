@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from threading import RLock
+
+from ..utils.struct.lock import lock
+
+
+class ObjectCache(MutableMapping):
+    """
+    keeps the recently used objects by id, shrink drops the least recently used ones
+    above size.
+
+    Dropped objects stay reachable as long as they are referenced elsewhere, e.g. by a
+    thread still working with them, so there is never more than one object per id.
+    Iterating covers all objects still in use, without touching the order.
+    """
+
+    def __init__(self, size):
+        self.lock = RLock()
+        self.size = size
+        self.entries = OrderedDict()  #: id -> object, least recently used first
+        self.objects = weakref.WeakValueDictionary()  #: id -> object still in use
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @lock
+    def __getitem__(self, key):
+        value = self.entries.get(key)
+        if value is None:
+            value = self.objects[key]  #: dropped, but still in use
+            self.entries[key] = value
+        else:
+            self.entries.move_to_end(key)
+        return value
+
+    @lock
+    def __setitem__(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self.objects[key] = value
+
+    @lock
+    def __delitem__(self, key):
+        self.entries.pop(key, None)
+        self.objects.pop(key, None)  #: may be gone since the caller checked for it
+
+    def __contains__(self, key):
+        return key in self.objects
+
+    def __iter__(self):
+        return iter(list(self.objects.keys()))
+
+    def __len__(self):
+        return len(self.objects)
+
+    def values(self):
+        return list(self.objects.values())
+
+    def items(self):
+        return list(self.objects.items())
+
+    @lock
+    def get(self, key, default=None):
+        """
+        like dict.get, counts the hits and misses.
+        """
+        try:
+            value = self[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return value
+
+    @lock
+    def shrink(self, pinned):
+        """
+        drops the least recently used objects above size, except the ones pinned(obj)
+        is true for, and returns them.
+        """
+        excess = len(self.entries) - self.size
+        dropped = []
+        if excess <= 0:
+            return dropped
+
+        for key, value in list(self.entries.items()):
+            if len(dropped) >= excess:
+                break
+            if not pinned(value):
+                del self.entries[key]
+                dropped.append(value)
+
+        self.evictions += len(dropped)
+        return dropped
+
+    @lock
+    def stats(self):
+        return {
+            "size": self.size,
+            "resident": len(self.entries),
+            "in_use": len(self.objects),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import time
-from threading import RLock
+from operator import attrgetter
+from threading import Lock, RLock
 
 from ..managers.event_manager import UpdateEvent
 from ..utils import format, purge
@@ -26,12 +27,20 @@ status_map = {
 }
 
 
-def _set_size(self, value):
-    self._size = int(value)
+_lock_creation = Lock()
 
 
-def _set_name(self, value):
-    self._name = purge.name(value, sep="")
+def _field(name, convert=None):
+    """
+    attribute stored in the slot _name, setting it invalidates the cached dict.
+    """
+    slot = "_" + name
+
+    def setter(self, value):
+        setattr(self, slot, value if convert is None else convert(value))
+        self._db_dict = None
+
+    return property(attrgetter(slot), setter)
 
 
 class PyFile:
@@ -39,28 +48,63 @@ class PyFile:
     Represents a file object at runtime.
     """
 
+    __slots__ = (
+        "m",
+        "manager",
+        "id",
+        "_url",
+        "_name",
+        "_size",
+        "_status",
+        "_pluginname",
+        "_packageid",
+        "_error",
+        "_order",
+        "_statusname",
+        "_db_dict",
+        "_lock",
+        "_plugin",
+        "pluginmodule",
+        "pluginclass",
+        "wait_until",
+        "active",
+        "abort",
+        "reconnected",
+        "progress",
+        "maxprogress",
+        "__weakref__",
+    )
+
+    url = _field("url")
+    name = _field("name", lambda x: purge.name(x, sep=""))
+    size = _field("size", int)  #: will convert all sizes to ints
+    status = _field("status")
+    pluginname = _field("pluginname")
+    packageid = _field("packageid")  #: should not be used, use package() instead
+    error = _field("error")
+    order = _field("order")
+    statusname = _field("statusname")
+    plugin = _field("plugin")  #: the size comes from the running download
+
     def __init__(
         self, manager, id, url, name, size, status, error, pluginname, package, order
     ):
         self.m = self.manager = manager
         self.m.cache[int(id)] = self
 
+        self._db_dict = None
         self.id = int(id)
         self.url = url
-        self._name = None
         self.name = name
-
-        self._size = None
         self.size = size
-
         self.status = status
         self.pluginname = pluginname
-        self.packageid = package  #: should not be used, use package() instead
+        self.packageid = package
         self.error = error
         self.order = order
         # database information ends here
 
-        self.lock = RLock()
+        self._lock = None
 
         self.plugin = None
         # self.download = None
@@ -77,12 +121,6 @@ class PyFile:
         self.progress = 0
         self.maxprogress = 100
 
-    # will convert all sizes to ints
-    size = property(lambda self: self._size, _set_size)
-
-    # ensure safe name assignment
-    name = property(lambda self: self._name, _set_name)
-
     def __repr__(self):
         return f"PyFile {self.id}: {self.name}@{self.pluginname}"
 
@@ -106,7 +144,7 @@ class PyFile:
 
         :return:
         """
-        return hasattr(self, "plugin") and self.plugin
+        return self.plugin
 
     def package(self):
         """
@@ -146,9 +184,9 @@ class PyFile:
         if self.packageid > 0:
             self.sync()
 
-        if hasattr(self, "plugin") and self.plugin:
+        if self.plugin:
             self.plugin.clean()
-            del self.plugin
+            self.plugin = None
 
         self.m.release_link(self.id)
 
@@ -166,7 +204,8 @@ class PyFile:
 
     def to_db_dict(self):
         """
-        return data as dict for databse.
+        return data as dict for databse, the inner dict is cached until the file
+        changes and must not be modified.
 
         format:
 
@@ -174,8 +213,9 @@ class PyFile:
             id: {'url': url, 'name': name ... }
         }
         """
-        return {
-            self.id: {
+        data = self._db_dict
+        if data is None:
+            data = {
                 "id": self.id,
                 "url": self.url,
                 "name": self.name,
@@ -188,7 +228,9 @@ class PyFile:
                 "error": self.error,
                 "order": self.order,
             }
-        }
+            if self.plugin is None:  #: the size of a running download changes
+                self._db_dict = data
+        return {self.id: data}
 
     def abort_download(self):
         """
@@ -296,7 +338,7 @@ class PyFile:
         e = UpdateEvent(
             "file", self.id, "collector" if not self.package().queue else "queue"
         )
-        self.m.pyload.event_manager.add_event(e)
+        self.m.add_event(e)
 
     def set_progress(self, value):
         if value != self.progress:
@@ -307,3 +349,16 @@ class PyFile:
         if value != self.name:
             self.name = value
             self.notify_change()
+
+    def _get_lock(self):
+        """
+        created on first use, most files are never locked.
+        """
+        if self._lock is None:
+            with _lock_creation:
+                if self._lock is None:
+                    self._lock = RLock()
+        return self._lock
+
+    #: defined last, the methods above are decorated with the lock function
+    lock = property(_get_lock)
@@ -10,6 +10,20 @@ class PyPackage:
     Represents a package object at runtime.
     """
 
+    __slots__ = (
+        "m",
+        "manager",
+        "id",
+        "name",
+        "_folder",
+        "site",
+        "password",
+        "queue",
+        "order",
+        "set_finished",
+        "__weakref__",
+    )
+
     def __init__(self, manager, id, name, folder, site, password, queue, order):
         self.m = self.manager = manager
         self.m.package_cache[int(id)] = self
@@ -70,4 +84,4 @@ class PyPackage:
 
     def notify_change(self):
         e = UpdateEvent("pack", self.id, "collector" if not self.queue else "queue")
-        self.m.pyload.event_manager.add_event(e)
+        self.m.add_event(e)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from ..utils.struct.lock import lock
+
+
+class TTLCache:
+    """
+    keeps values for ttl seconds, at most size of them, the oldest ones go first.
+    """
+
+    def __init__(self, size, ttl):
+        self.lock = Lock()
+        self.size = size
+        self.ttl = ttl
+        self.entries = OrderedDict()  #: key -> (expiry time, value), oldest first
+
+    @lock
+    def get(self, key, default=None):
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        if entry[0] < time.time():
+            del self.entries[key]
+            return default
+        return entry[1]
+
+    @lock
+    def set(self, key, value):
+        now = time.time()
+        self.entries[key] = (now + self.ttl, value)
+        self.entries.move_to_end(key)
+
+        while self.entries:
+            oldest = next(iter(self.entries.values()))
+            if len(self.entries) <= self.size and oldest[0] >= now:
+                break
+            self.entries.popitem(last=False)
+
+    def __contains__(self, key):
+        return self.get(key, self) is not self
+
+    def __len__(self):
+        return len(self.entries)
+
+    @lock
+    def clear(self):
+        self.entries.clear()
@@ -4,6 +4,7 @@ import locale
 import logging
 import logging.handlers
 import os
+import queue
 import sys
 from contextlib import closing
 
@@ -13,9 +14,50 @@ except ImportError:
     colorlog = None
 
 
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """
+    hands records to the listener thread, records below WARNING are dropped rather
+    than waiting when the queue is full.
+    """
+
+    def __init__(self, listener):
+        super().__init__(listener.queue)
+        self.listener = listener
+        self.dropped = 0
+
+    def prepare(self, record):
+        #: merge the arguments now, they may change before the record is written
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if record.levelno >= logging.WARNING:
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self):
+        super().close()
+        if self.listener is not None:
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+
+
+class LogQueueListener(logging.handlers.QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  #: wait for space, the queue may be full
+
+
 class LogFactory:
 
     FILE_EXTENSION = ".log"
+    QUEUE_SIZE = 10000  #: records waiting for the handlers in background mode
 
     LINESTYLE = "{"
     LINEFORMAT = "[{asctime}]  {levelname:8}  {name:>16}  {message}"
@@ -60,15 +102,30 @@ class LogFactory:
         level = logging.DEBUG if self.pyload.debug else logging.INFO
         logger.setLevel(level)
 
+        handlers = []
         if console:
-            self._init_console_handler(logger)
+            handlers.append(self._init_console_handler(logger))
         if syslog:
-            self._init_syslog_handler(logger)
+            handlers.append(self._init_syslog_handler(logger))
         if filelog:
-            self._init_filelog_handler(logger)
+            handlers.append(self._init_filelog_handler(logger))
+
+        #: the handlers write from a listener thread, logging only queues the record
+        if handlers and self.pyload.config.get("log", "background"):
+            listener = LogQueueListener(
+                queue.Queue(self.QUEUE_SIZE), *handlers, respect_handler_level=True
+            )
+            listener.start()
+            handlers = [LogQueueHandler(listener)]
+
+        for handler in handlers:
+            logger.addHandler(handler)
 
     def get_logger(self, name):
-        return self.loggers.get(name, self.init_logger(name))
+        logger = self.loggers.get(name)
+        if logger is None:
+            logger = self.init_logger(name)
+        return logger
 
     def remove_logger(self, name):
         logger = self.loggers.pop(name)
@@ -83,10 +140,21 @@ class LogFactory:
         self._init_logger(logger)
 
     def _removeHandlers(self, logger):
-        for handler in logger.handlers:
+        for handler in list(logger.handlers):
             with closing(handler) as hdlr:
                 logger.removeHandler(hdlr)
 
+    def stats(self):
+        """
+        queued and dropped records of the loggers writing in the background.
+        """
+        return {
+            name: {"queued": handler.queue.qsize(), "dropped": handler.dropped}
+            for name, logger in self.loggers.items()
+            for handler in logger.handlers
+            if isinstance(handler, LogQueueHandler)
+        }
+
     def shutdown(self):
         for logger in self.loggers.values():
             self._removeHandlers(logger)
@@ -111,7 +179,7 @@ class LogFactory:
 
         consolehdlr = logging.StreamHandler(sys.stdout)
         consolehdlr.setFormatter(consoleform)
-        logger.addHandler(consolehdlr)
+        return consolehdlr
 
     def _init_syslog_handler(self, logger):
         # try to mimic to normal syslog messages
@@ -142,7 +210,7 @@ class LogFactory:
 
         sysloghdlr = logging.handlers.SysLogHandler(syslog_addr)
         sysloghdlr.setFormatter(syslog_form)
-        logger.addHandler(sysloghdlr)
+        return sysloghdlr
 
     def _init_filelog_handler(self, logger):
         filename = logger.name + self.FILE_EXTENSION
@@ -174,4 +242,4 @@ class LogFactory:
             filehdlr = logging.FileHandler(filelog_path, encoding=encoding)
 
         filehdlr.setFormatter(filelog_form)
-        logger.addHandler(filehdlr)
+        return filehdlr
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import locale
+import os
+import re
+from bisect import bisect_right
+from threading import Lock
+
+from .utils.struct.lock import lock
+
+
+class LogReader:
+    """
+    reads lines of a log file by number, without reading the lines before them.
+
+    Every BLOCK_SIZE bytes the number and offset of the next line are indexed, so a
+    line is found by seeking to the closest indexed line before it. The index is
+    extended by the lines written since the last call and rebuilt when the file was
+    rotated or truncated.
+    """
+
+    BLOCK_SIZE = 64 << 10
+    TIME_LINES = 100  #: lines searched for the time of an indexed line
+
+    _RE_TIME = re.compile(rb"\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]")
+
+    def __init__(self, path, encoding=None):
+        self.lock = Lock()
+        self.path = path
+        self.encoding = encoding or locale.getpreferredencoding(do_setlocale=False)
+        self._reset(None)
+
+    def _reset(self, fileid):
+        self.fileid = fileid  #: (device, inode) of the indexed file
+        self.numbers = [0]  #: number of the indexed lines
+        self.offsets = [0]  #: offset of the indexed lines
+        self.times = {}  #: position in the index -> time of the first entry from there
+        self.lines = 0  #: complete lines
+        self.end = 0  #: offset after the last complete line
+        self.size = 0
+
+    def _update(self, fp):
+        st = os.fstat(fp.fileno())
+        fileid = (st.st_dev, st.st_ino)
+        if fileid != self.fileid or st.st_size < self.end:
+            self._reset(fileid)
+
+        fp.seek(self.end)
+        pos = self.end
+        while True:
+            data = fp.read(self.BLOCK_SIZE)
+            if not data:
+                break
+
+            last = data.rfind(b"\n")
+            if last >= 0:
+                self.lines += data.count(b"\n")
+                self.end = pos + last + 1
+                if self.end - self.offsets[-1] >= self.BLOCK_SIZE:
+                    self.numbers.append(self.lines)
+                    self.offsets.append(self.end)
+            pos += len(data)
+
+        self.size = max(pos, st.st_size)
+
+    def _seek(self, fp, number):
+        """
+        moves to the start of line number, returns False if there is no such line.
+        """
+        i = bisect_right(self.numbers, number) - 1
+        fp.seek(self.offsets[i])
+        for _ in range(number - self.numbers[i]):
+            if not fp.readline():
+                return False
+        return True
+
+    def _time(self, fp, i):
+        """
+        time of the first entry from the i-th indexed line on.
+        """
+        if i not in self.times:
+            fp.seek(self.offsets[i])
+            for _ in range(self.TIME_LINES):
+                m = self._RE_TIME.match(fp.readline())
+                if m is not None:
+                    self.times[i] = m.group(1)
+                    break
+            else:
+                return None
+        return self.times[i]
+
+    @lock
+    def length(self):
+        """
+        number of lines, including an unfinished last one.
+        """
+        with open(self.path, mode="rb") as fp:
+            self._update(fp)
+        return self.lines + (self.size > self.end)
+
+    @lock
+    def read(self, start=0, count=0):
+        """
+        returns count lines from line number start on, all up to the end if count is 0.
+        """
+        lines = []
+        with open(self.path, mode="rb") as fp:
+            self._update(fp)
+            if not self._seek(fp, start):
+                return lines
+
+            while not count or len(lines) < count:
+                line = fp.readline()
+                if not line:
+                    break
+                lines.append(line.decode(self.encoding, "replace"))
+        return lines
+
+    @lock
+    def find(self, date):
+        """
+        returns the number of the first line logged at or after date, formatted like
+        "2020-01-31 12:00:00", or the number of lines if there is none.
+
+        Entries are expected in chronological order.
+        """
+        date = date.encode()
+        with open(self.path, mode="rb") as fp:
+            self._update(fp)
+
+            #: last indexed line with entries before date
+            lo, hi = 0, len(self.offsets)
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                time = self._time(fp, mid)
+                if time is not None and time >= date:
+                    hi = mid
+                else:
+                    lo = mid
+
+            number = self.numbers[lo]
+            fp.seek(self.offsets[lo])
+            for line in fp:
+                m = self._RE_TIME.match(line)
+                if m is not None and m.group(1) >= date:
+                    return number
+                number += 1
+        return number
+
+    def tail(self, count):
+        """
+        returns the last count lines, read backwards from the end of the file.
+        """
+        if count <= 0:
+            return []
+
+        with open(self.path, mode="rb") as fp:
+            pos = fp.seek(0, os.SEEK_END)
+            data = b""
+            #: one more line break than lines, unless the file starts in data
+            while pos and data.count(b"\n", 0, -1) < count:
+                size = min(self.BLOCK_SIZE, pos)
+                pos -= size
+                fp.seek(pos)
+                data = fp.read(size) + data
+
+        lines = [x + b"\n" for x in data.split(b"\n")]
+        lines[-1] = lines[-1][:-1]  #: unfinished last line, usually empty
+        if not lines[-1]:
+            del lines[-1]
+        return [x.decode(self.encoding, "replace") for x in lines[-count:]]
@@ -1,63 +1,127 @@
 # -*- coding: utf-8 -*-
 
+import bisect
 import time
-
-from ..utils.purge import uniquify
+from collections import deque
+from itertools import islice
+from threading import Condition
 
 
 class EventManager:
+    """
+    keeps the latest events in a ring buffer, clients read them from a cursor.
+
+    Every event gets a sequence number, clients ask for the events after the last
+    number they received. A client which fell behind the buffer has to reload all.
+    An UpdateEvent replaces an older one of the same item still in the buffer.
+    """
+
+    MAX_EVENTS = 1000
+
     def __init__(self, core):
         self.pyload = core
         self._ = core._
         self.clients = []
 
+        self.condition = Condition()
+        self.events = deque()  #: [sequence number, event], event is None if replaced
+        self.replaced = 0  #: number of replaced events in the buffer
+        self.seq = 0  #: sequence number of the last event
+        self.start = 0  #: sequence number of the last event dropped from the buffer
+        self.updates = {}  #: (destination, type, id) -> buffer entry of its UpdateEvent
+
     def new_client(self, uuid):
-        self.clients.append(Client(uuid))
+        self.clients.append(Client(uuid, self.seq))
 
     def clean(self):
-        for n, client in enumerate(self.clients):
-            if client.last_active + 30 < time.time():
-                del self.clients[n]
+        now = time.time()
+        self.clients = [c for c in self.clients if c.last_active + 30 >= now]
 
     def get_events(self, uuid):
-        events = []
-        valid_uuid = False
         for client in self.clients:
             if client.uuid == uuid:
                 client.last_active = time.time()
-                valid_uuid = True
-                while client.new_events():
-                    events.append(client.pop_event().to_list())
-                break
-        if not valid_uuid:
-            self.new_client(uuid)
-            events = [
-                ReloadAllEvent("queue").to_list(),
-                ReloadAllEvent("collector").to_list(),
-            ]
-        return uniquify(events)  # return uniquify(events, repr)
+                client.cursor, events = self.get_events_since(client.cursor)
+                return events
+
+        self.new_client(uuid)
+        return self._reload_events()
+
+    def get_events_since(self, cursor):
+        """
+        returns the current cursor and the events after cursor as lists, a cursor
+        of None starts at the current position.
+        """
+        with self.condition:
+            return self._get_events_since(cursor)
+
+    def wait_events(self, cursor, timeout):
+        """
+        like get_events_since, but waits up to timeout seconds for new events.
+        """
+        with self.condition:
+            if cursor == self.seq:
+                self.condition.wait(timeout)
+            return self._get_events_since(cursor)
 
     def add_event(self, event):
-        for client in self.clients:
-            client.add_event(event)
+        with self.condition:
+            self.seq += 1
+            entry = [self.seq, event]
+
+            if isinstance(event, UpdateEvent):
+                key = (event.destination, event.type, event.id)
+                prev = self.updates.get(key)
+                if prev is not None:
+                    prev[1] = None
+                    self.replaced += 1
+                self.updates[key] = entry
+
+            self.events.append(entry)
+            if len(self.events) > self.MAX_EVENTS:
+                self._shrink()
+
+            self.condition.notify_all()
+
+    def _get_events_since(self, cursor):
+        if cursor is None:
+            return self.seq, []
+
+        #: missed events or older than a restart
+        if cursor < self.start or cursor > self.seq:
+            return self.seq, self._reload_events()
+
+        i = bisect.bisect_left(self.events, [cursor + 1])
+        events = [e.to_list() for _, e in islice(self.events, i, None) if e is not None]
+        return self.seq, events
+
+    def _shrink(self):
+        if self.replaced > len(self.events) // 2:
+            self.events = deque(entry for entry in self.events if entry[1] is not None)
+            self.replaced = 0
+
+        while len(self.events) > self.MAX_EVENTS:
+            seq, event = entry = self.events.popleft()
+            self.start = seq
+            if event is None:
+                self.replaced -= 1
+            elif isinstance(event, UpdateEvent):
+                key = (event.destination, event.type, event.id)
+                if self.updates.get(key) is entry:
+                    del self.updates[key]
+
+    def _reload_events(self):
+        return [
+            ReloadAllEvent("queue").to_list(),
+            ReloadAllEvent("collector").to_list(),
+        ]
 
 
 class Client:
-    def __init__(self, uuid):
+    def __init__(self, uuid, cursor):
         self.uuid = uuid
         self.last_active = time.time()
-        self.events = []
-
-    def new_events(self):
-        return len(self.events) > 0
-
-    def pop_event(self):
-        if not len(self.events):
-            return None
-        return self.events.pop(0)
-
-    def add_event(self, event):
-        self.events.append(event)
+        self.cursor = cursor  #: sequence number of the last event sent
 
 
 class UpdateEvent:
@@ -1,9 +1,12 @@
 # -*- coding: utf-8 -*-
 
-from itertools import chain
+from itertools import chain, islice
 from threading import RLock
 
+from ..datatypes.change_log import ChangeLog
 from ..datatypes.enums import Destination
+from ..datatypes.job_index import JOB_STATUS, JobIndex
+from ..datatypes.object_cache import ObjectCache
 from ..utils.struct.lock import lock
 from .event_manager import InsertEvent, ReloadAllEvent, RemoveEvent, UpdateEvent
 
@@ -13,7 +16,6 @@ def change(func):
         self.unchanged = False
         self.filecount = -1
         self.queuecount = -1
-        self.job_cache = {}
         return func(self, *args)
 
     return new
@@ -25,6 +27,11 @@ class FileManager:
     links or packages.
     """
 
+    #: container plugins, their links are processed in the collector too
+    PRE_PLUGINS = ("DLC", "TXT", "CCF", "RSDF")
+
+    CACHE_SIZE = 1000  #: idle links and packages kept in memory, each
+
     def __init__(self, core):
         """
         Constructor.
@@ -51,11 +58,15 @@ class FileManager:
             self._("unknown"),
         ]
 
-        # TODO: purge the cache
-        self.cache = {}  #: holds instances for files
-        self.package_cache = {}  #: same for packages
+        self.cache = ObjectCache(self.CACHE_SIZE)  #: holds instances for files
+        self.package_cache = ObjectCache(self.CACHE_SIZE)  #: same for packages
+
+        self.jobs = JobIndex()  #: links waiting to be processed
+        self.jobs_outdated = True  #: reload the whole index on next use
 
-        self.job_cache = {}
+        #: changed items for get_changes, ("pack" | "file", id), ("links", package id)
+        #: when all links of a package changed and ("order", queue) for the package order
+        self.changes = ChangeLog()
 
         self.lock = RLock()  # TODO: should be a Lock w/o R
         # self.lock._Verbose__verbose = True
@@ -122,6 +133,83 @@ class FileManager:
 
         return packs
 
+    @lock
+    def get_changes(self, revision, queue=Destination.QUEUE):
+        """
+        gets the packages and links changed after revision.
+
+        Returns the current revision, the changed packages with the changed links and
+        the ids of the removed packages and links, packages whose links all changed
+        come with their complete links. Returns None instead of the changes if they
+        are not known that far back, the client has to load a snapshot then.
+        """
+        revision, keys = self.changes.since(revision)
+        if keys is None:
+            return revision, None
+
+        changes = {
+            "packages": {},
+            "linked": set(),
+            "removed_packages": set(),
+            "removed_links": set(),
+        }
+        if not keys:  #: polled without changes, skip loading the packages
+            return revision, changes
+
+        fids = {id for type, id in keys if type == "file"}
+        linked_pids = {id for type, id in keys if type == "links"}
+        pids = {id for type, id in keys if type in ("pack", "links")}
+
+        packs = self.get_info_data(queue)
+        links = self._get_links(fids, linked_pids)
+        pids.update(link["package"] for link in links.values())
+        if ("order", queue.value) in keys:
+            pids.update(packs)  #: orders changed, also in the db only
+
+        changed = {id: packs[id] for id in pids if id in packs}
+        for id, link in links.items():
+            if link["package"] in changed:
+                changed[link["package"]]["links"][id] = link
+
+        removed_links = fids.difference(links)
+        removed_links.update(
+            id for id, link in links.items() if link["package"] not in changed
+        )
+        changes["packages"] = changed
+        changes["linked"] = linked_pids.intersection(changed)
+        changes["removed_packages"] = pids.difference(changed)
+        changes["removed_links"] = removed_links
+        return revision, changes
+
+    @lock
+    def get_snapshot(self, queue=Destination.QUEUE, offset=0, limit=None):
+        """
+        gets the current revision, a page of packages with their links and the number
+        of packages.
+        """
+        revision = self.changes.revision  #: changes while loading are sent again
+        packs = self.get_info_data(queue)
+        stop = None if limit is None else offset + limit
+        page = dict(islice(packs.items(), offset, stop))
+
+        for id, link in self._get_links(pids=page).items():
+            page[link["package"]]["links"][id] = link
+
+        return revision, page, len(packs)
+
+    def _get_links(self, fids=(), pids=()):
+        """
+        gets the given links and all links of the given packages, cached links are
+        more up to date than the db.
+        """
+        data = self.pyload.db.get_links(fids, pids)
+        data.update(
+            (x.id, x.to_db_dict()[x.id])
+            for x in list(self.cache.values())
+            if x.id in data or x.id in fids or x.packageid in pids
+        )
+        return data
+
     @lock
     @change
     def add_links(self, urls, package):
@@ -133,10 +221,12 @@ class FileManager:
         data = self.pyload.plugin_manager.parse_urls(urls)
 
         self.pyload.db.add_links(data, package)
+        self.load_package_jobs(package)
         self.pyload.thread_manager.create_info_thread(data, package)
 
         # TODO: change from reload_all event to package update event
         self.pyload.event_manager.add_event(ReloadAllEvent("collector"))
+        self.changes.add(("links", package))
 
     # ----------------------------------------------------------------------
     @lock
@@ -153,7 +243,7 @@ class FileManager:
             p.order,
             "collector" if queue is Destination.COLLECTOR else "queue",
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
         return last_id
 
     # ----------------------------------------------------------------------
@@ -181,7 +271,9 @@ class FileManager:
                 pyfile.release()
 
         self.pyload.db.delete_package(p)
-        self.pyload.event_manager.add_event(e)
+        self.jobs.remove_package(id)
+        self.add_event(e)
+        self.changes.add(("order", queue))
         self.pyload.addon_manager.dispatch_event("package_deleted", id)
 
         if id in self.package_cache:
@@ -216,8 +308,10 @@ class FileManager:
             del self.cache[id]
 
         self.pyload.db.delete_link(f)
+        self.jobs.remove(id)
 
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
+        self.changes.add(("links", pid))
 
         p = self.get_package(pid)
         if not len(p.get_children()):
@@ -245,6 +339,14 @@ class FileManager:
         if id in self.package_cache:
             del self.package_cache[id]
 
+    # ----------------------------------------------------------------------
+    def add_event(self, event):
+        """
+        records the change of a package or link and passes the event on.
+        """
+        self.changes.add((event.type, event.id))
+        self.pyload.event_manager.add_event(event)
+
     # ----------------------------------------------------------------------
     def update_link(self, pyfile):
         """
@@ -252,10 +354,21 @@ class FileManager:
         """
         self.pyload.db.update_link(pyfile)
 
+        pypack = pyfile.package()
+        self.jobs.update(
+            pyfile.id,
+            pyfile.pluginname,
+            pyfile.packageid,
+            pypack.queue,
+            pypack.order,
+            pyfile.order,
+            pyfile.status,
+        )
+
         e = UpdateEvent(
-            "file", pyfile.id, "collector" if not pyfile.package().queue else "queue"
+            "file", pyfile.id, "collector" if not pypack.queue else "queue"
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
 
     # ----------------------------------------------------------------------
     def update_package(self, pypack):
@@ -263,19 +376,21 @@ class FileManager:
         updates a package.
         """
         self.pyload.db.update_package(pypack)
+        self.load_package_jobs(pypack.id)
 
         e = UpdateEvent("pack", pypack.id, "collector" if not pypack.queue else "queue")
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
 
     # ----------------------------------------------------------------------
     def get_package(self, id):
         """
         return package instance.
         """
-        if id in self.package_cache:
-            return self.package_cache[id]
-        else:
-            return self.pyload.db.get_package(id)
+        pypack = self.package_cache.get(id)
+        if pypack is None:
+            pypack = self.pyload.db.get_package(id)
+        self.shrink_cache()
+        return pypack
 
     # ----------------------------------------------------------------------
     def get_package_data(self, id):
@@ -291,13 +406,11 @@ class FileManager:
 
         data = self.pyload.db.get_package_data(id)
 
-        tmplist = []
-
-        cache = list(self.cache.values())
-        for x in cache:
-            if int(x.to_db_dict()[x.id]["package"]) == int(id):
-                tmplist.append((x.id, x.to_db_dict()[x.id]))
-        data.update(tmplist)
+        data.update(
+            (x.id, x.to_db_dict()[x.id])
+            for x in self.cache.values()
+            if int(x.packageid) == int(id)
+        )
 
         pack["links"] = data
 
@@ -318,76 +431,77 @@ class FileManager:
         """
         returns pyfile instance.
         """
-        if id in self.cache:
-            return self.cache[id]
-        else:
-            return self.pyload.db.get_file(id)
+        pyfile = self.cache.get(id)
+        if pyfile is None:
+            pyfile = self.pyload.db.get_file(id)
+        self.shrink_cache()
+        return pyfile
+
+    # ----------------------------------------------------------------------
+    def shrink_cache(self):
+        """
+        drops idle links and packages above CACHE_SIZE from the caches, after saving
+        them. Links with a plugin and the packages of links in use are kept.
+        """
+        for pyfile in self.cache.shrink(
+            lambda x: getattr(x, "plugin", None) is not None
+        ):
+            if pyfile.packageid > 0:
+                self.pyload.db.update_link(pyfile)
+
+        if len(self.package_cache.entries) > self.package_cache.size:
+            active = {x.packageid for x in self.cache.values()}
+            for pypack in self.package_cache.shrink(lambda x: x.id in active):
+                self.pyload.db.update_package(pypack)
 
     # ----------------------------------------------------------------------
+    def load_package_jobs(self, pid):
+        """
+        reloads the waiting links of a package into the job index.
+        """
+        self.jobs.load_package(pid, self.pyload.db.get_jobs(pid))
+
+    def _next_job(self, accept):
+        """
+        returns the first waiting pyfile of the index heaps accepted by accept(plugin, queue).
+        """
+        if self.jobs_outdated:
+            self.jobs_outdated = False
+            self.jobs.load(self.pyload.db.get_jobs())
+
+        while True:
+            id = self.jobs.get(accept)
+            if id is None:
+                return None
+
+            pyfile = self.get_file(id)
+            if pyfile and pyfile.status in JOB_STATUS:
+                return pyfile
+
+            self.jobs.remove(id)  #: changed without the index noticing
+
     @lock
     def get_job(self, occupied):
         """
         get suitable job.
         """
-        # TODO: clean mess
-        # TODO: improve selection of valid jobs
-
-        if occupied in self.job_cache:
-            if self.job_cache[occupied]:
-                id = self.job_cache[occupied].pop()
-                if id == "empty":
-                    pyfile = None
-                    self.job_cache[occupied].append("empty")
-                else:
-                    pyfile = self.get_file(id)
-            else:
-                jobs = self.pyload.db.get_job(occupied)
-                jobs.reverse()
-                if not jobs:
-                    self.job_cache[occupied].append("empty")
-                    pyfile = None
-                else:
-                    self.job_cache[occupied].extend(jobs)
-                    pyfile = self.get_file(self.job_cache[occupied].pop())
-
-        else:
-            self.job_cache = {}  #: better not caching too much
-            jobs = self.pyload.db.get_job(occupied)
-            jobs.reverse()
-            self.job_cache[occupied] = jobs
-
-            if not jobs:
-                self.job_cache[occupied].append("empty")
-                pyfile = None
-            else:
-                pyfile = self.get_file(self.job_cache[occupied].pop())
-
-            # TODO: maybe the new job has to be approved...
-
-        # pyfile = self.get_file(self.job_cache[occ].pop())
-        return pyfile
+        return self._next_job(
+            lambda plugin, queue: plugin in self.PRE_PLUGINS
+            or (queue == Destination.QUEUE and plugin not in occupied)
+        )
 
     @lock
     def get_decrypt_job(self):
         """
         return job for decrypting.
         """
-        if "decrypt" in self.job_cache:
-            return None
-
-        plugins = tuple(
+        plugins = set(
             chain(
                 self.pyload.plugin_manager.decrypter_plugins.keys(),
                 self.pyload.plugin_manager.container_plugins.keys(),
             )
         )
-
-        jobs = self.pyload.db.get_plugin_job(plugins)
-        if jobs:
-            return self.get_file(jobs[0])
-        else:
-            self.job_cache["decrypt"] = "empty"
-            return None
+        return self._next_job(lambda plugin, queue: plugin in plugins)
 
     def get_file_count(self):
         """
@@ -448,6 +562,7 @@ class FileManager:
                 self.restart_file(pyfile.id)
 
         self.pyload.db.restart_package(id)
+        self.load_package_jobs(id)
 
         if id in self.package_cache:
             self.package_cache[id].set_finished = False
@@ -455,7 +570,8 @@ class FileManager:
         e = UpdateEvent(
             "pack", id, "collector" if not self.get_package(id).queue else "queue"
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
+        self.changes.add(("links", id))
 
     @lock
     @change
@@ -470,13 +586,14 @@ class FileManager:
             self.cache[id].abort_download()
 
         self.pyload.db.restart_file(id)
+        self.load_package_jobs(self.get_file(id).packageid)
 
         e = UpdateEvent(
             "file",
             id,
             "collector" if not self.get_file(id).package().queue else "queue",
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
 
     @lock
     @change
@@ -489,7 +606,7 @@ class FileManager:
         oldorder = p.order
 
         e = RemoveEvent("pack", id, "collector" if not p.queue else "queue")
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
 
         self.pyload.db.clear_package_order(p)
 
@@ -509,9 +626,11 @@ class FileManager:
         self.pyload.db.commit()
         self.release_package(id)
         p = self.get_package(id)
+        self.jobs_outdated = True  #: orders of other packages changed too
 
         e = InsertEvent("pack", id, p.order, "collector" if not p.queue else "queue")
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
+        self.changes.add(("links", id), ("order", 0), ("order", 1))
 
     @lock
     @change
@@ -519,7 +638,7 @@ class FileManager:
         p = self.get_package(id)
 
         e = RemoveEvent("pack", id, "collector" if not p.queue else "queue")
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
         self.pyload.db.reorder_package(p, position)
 
         packs = self.package_cache.values()
@@ -537,9 +656,11 @@ class FileManager:
 
         p.order = position
         self.pyload.db.commit()
+        self.jobs_outdated = True
 
         e = InsertEvent("pack", id, position, "collector" if not p.queue else "queue")
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
+        self.changes.add(("order", p.queue))
 
     @lock
     @change
@@ -552,7 +673,7 @@ class FileManager:
             id,
             "collector" if not self.get_package(f["package"]).queue else "queue",
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
 
         self.pyload.db.reorder_link(f, position)
 
@@ -573,6 +694,7 @@ class FileManager:
             self.cache[id].order = position
 
         self.pyload.db.commit()
+        self.load_package_jobs(f["package"])
 
         e = InsertEvent(
             "file",
@@ -580,7 +702,8 @@ class FileManager:
             position,
             "collector" if not self.get_package(f["package"]).queue else "queue",
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
+        self.changes.add(("links", f["package"]))
 
     @change
     def update_file_info(self, data, pid):
@@ -588,10 +711,12 @@ class FileManager:
         updates file info (name, size, status, url)
         """
         self.pyload.db.update_link_info(data)
+        self.load_package_jobs(pid)
         e = UpdateEvent(
             "pack", pid, "collector" if not self.get_package(pid).queue else "queue"
         )
-        self.pyload.event_manager.add_event(e)
+        self.add_event(e)
+        self.changes.add(("links", pid))
 
     def check_package_finished(self, pyfile):
         """
@@ -640,6 +765,8 @@ class FileManager:
             if id not in new_packs:
                 deleted.append(id)
                 self.delete_package(int(id))
+            elif old_packs[id]["linksdone"]:
+                self.changes.add(("links", id))
 
         return deleted
 
@@ -650,3 +777,5 @@ class FileManager:
         restart all failed links.
         """
         self.pyload.db.restart_failed()
+        self.jobs_outdated = True
+        self.changes.reset()
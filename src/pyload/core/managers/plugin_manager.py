@@ -2,12 +2,23 @@
 
 import importlib.abc
 import importlib.util
+import json
 import os
 import re
 import sys
 from ast import literal_eval
 from itertools import chain
 
+try:
+    from re import _constants as sre_constants
+    from re import _parser as sre_parse
+except ImportError:  #: python < 3.11
+    try:
+        import sre_constants
+        import sre_parse
+    except ImportError:  #: the url router tries every pattern then
+        sre_constants = sre_parse = None
+
 from pyload import APPID, PKGDIR
 
 # import semver
@@ -74,6 +85,369 @@ class ImportRedirector(importlib.abc.MetaPathFinder):
         pass
 
 
+class URLRouter:
+    """
+    finds the plugin for an url by trying only the patterns that can match it.
+
+    Every pattern is reduced to a cheap condition each matching url fulfills: the
+    last two labels of its host, the exact string for patterns like ^name$, or a
+    literal suffix, substring or prefix. Patterns without such a condition are tried
+    for every url. Candidates are tried in the order of the plugin list, so the first
+    plugin matching an url is the same as with a full scan.
+    """
+
+    MAX_STRINGS = 64  #: per pattern, more are handled like patterns without condition
+
+    def __init__(self, plugins):
+        """
+        plugins is a list of (name, compiled regex) in matching order.
+        """
+        self.plugins = plugins
+        self.hosts = {}  #: host key -> positions in plugins
+        self.exact = {}  #: only matching string -> positions in plugins
+        self.suffixes = []  #: (position, suffixes) of patterns anchored at the end
+        self.substrings = {}  #: substring -> positions in plugins
+        self.prefixes = []  #: (position, prefixes)
+        self.fallback = []  #: positions of plugins tried for every url
+
+        for i, (name, regex) in enumerate(plugins):
+            try:
+                self._add(i, regex)
+            except Exception:  #: also for parser internals of other python versions
+                self.fallback.append(i)
+
+        #: finds the longest substring starting at every position of the url, the
+        #: shorter ones starting at the same position are prefixes of it
+        strings = sorted(self.substrings, key=len, reverse=True)
+        self.substrings_re = re.compile(
+            "(?=({}))".format("|".join(map(re.escape, strings)) or "(?!)")
+        )
+        self.substring_prefixes = {
+            string: [other for other in strings if string.startswith(other)]
+            for string in strings
+        }
+
+    def _add(self, i, regex):
+        """
+        files the plugin at position i under the condition its pattern allows.
+        """
+        tokens = list(sre_parse.parse(regex.pattern))
+        alternatives = self._alternatives(tokens)
+        ignorecase = regex.flags & re.IGNORECASE  #: only host keys are lowercase
+
+        strings = None if ignorecase else self._get_exact_strings(alternatives)
+        if strings is not None:
+            for string in strings:
+                self.exact.setdefault(string, []).append(i)
+            return
+
+        keys = self._get_host_keys(alternatives)
+        if keys is not None:
+            for key in keys:
+                self.hosts.setdefault(key, []).append(i)
+            return
+
+        suffixes = None if ignorecase else self._get_suffixes(alternatives)
+        if suffixes is not None:
+            self.suffixes.append((i, tuple(suffixes)))
+            return
+
+        substrings = None if ignorecase else self._get_substrings(alternatives)
+        if substrings is not None:
+            for string in substrings:
+                self.substrings.setdefault(string, []).append(i)
+            return
+
+        prefixes = None if ignorecase else self._get_prefixes(alternatives)
+        if prefixes is not None:
+            self.prefixes.append((i, tuple(prefixes)))
+            return
+
+        self.fallback.append(i)
+
+    def find(self, url):
+        """
+        returns the name of the first plugin matching url or None.
+        """
+        for i in self.get_candidates(url):
+            name, regex = self.plugins[i]
+            if regex.match(url):
+                return name
+
+    def get_candidates(self, url):
+        """
+        returns the positions of the plugins which can match url, in order.
+        """
+        if not isinstance(url, str):
+            return range(len(self.plugins))
+
+        #: $ also matches before a trailing newline
+        end = url[:-1] if url.endswith("\n") else url
+
+        candidates = set(self.fallback)
+        candidates.update(self.hosts.get(self.get_url_key(url), ()))
+        candidates.update(self.exact.get(end, ()))
+        candidates.update(i for i, suffixes in self.suffixes if end.endswith(suffixes))
+        for m in self.substrings_re.finditer(url):
+            for string in self.substring_prefixes[m.group(1)]:
+                candidates.update(self.substrings[string])
+        candidates.update(i for i, prefixes in self.prefixes if url.startswith(prefixes))
+        return sorted(candidates)
+
+    @staticmethod
+    def get_url_key(url):
+        """
+        returns the last two labels of everything before the first slash after the scheme.
+        """
+        start = url.find("/")
+        start = start + 2 if start > 0 and url[start - 1 : start + 2] == "://" else 0
+        end = url.find("/", start)
+        host = url[start:] if end < 0 else url[start:end]
+        return ".".join(host.lower().rsplit(".", 2)[-2:])
+
+    @classmethod
+    def _get_exact_strings(cls, alternatives):
+        strings = set()
+        for tokens in alternatives:
+            if not tokens or tokens[-1] != (sre_constants.AT, sre_constants.AT_END):
+                return None
+            expanded = cls._expand(tokens)
+            if expanded is None:
+                return None
+            strings |= expanded
+        return strings
+
+    @classmethod
+    def _get_host_keys(cls, alternatives):
+        keys = set()
+        for tokens in alternatives:
+            #: host part is between the scheme separator and the first slash
+            start = cls._find_scheme_end(tokens)
+            if any(cls._can_match_slash(token) for token in tokens[: max(start - 3, 0)]):
+                return None
+
+            end = start
+            while end < len(tokens) and tokens[end] != (sre_constants.LITERAL, ord("/")):
+                if cls._can_match_slash(tokens[end]):
+                    return None
+                end += 1
+            if end == len(tokens):
+                return None
+
+            tails, complete = cls._expand_tail(tokens[start:end])
+            if tails is None:
+                return None
+
+            for tail in tails:
+                labels = tail.lower().split(".")
+                #: an incomplete tail may end anywhere in its first label
+                if len(labels) < (2 if complete else 3) or not all(labels[-2:]):
+                    return None
+                keys.add(".".join(labels[-2:]))
+        return keys
+
+    @classmethod
+    def _get_suffixes(cls, alternatives):
+        suffixes = set()
+        for tokens in alternatives:
+            if not tokens or tokens[-1] != (sre_constants.AT, sre_constants.AT_END):
+                return None
+            tails, complete = cls._expand_tail(tokens[:-1])
+            if tails is None or "" in tails:
+                return None
+            suffixes |= tails
+        return suffixes
+
+    @classmethod
+    def _get_substrings(cls, alternatives, min_length=4):
+        """
+        returns the longest literal behind the scheme of each alternative.
+        """
+        substrings = set()
+        for tokens in alternatives:
+            longest = run = ""
+            for op, av in tokens[cls._find_scheme_end(tokens) :]:
+                run = run + chr(av) if op is sre_constants.LITERAL else ""
+                longest = max(longest, run, key=len)
+            if len(longest) < min_length:
+                return None
+            substrings.add(longest)
+        return substrings
+
+    @classmethod
+    def _get_prefixes(cls, alternatives):
+        prefixes = set()
+        for tokens in alternatives:
+            heads = {""}
+            for token in tokens:
+                strings = cls._expand([token])
+                if strings is None:
+                    break
+                heads = {a + b for a in heads for b in strings}
+                if len(heads) > cls.MAX_STRINGS:
+                    return None
+            if "" in heads:
+                return None
+            prefixes |= heads
+        return prefixes
+
+    @classmethod
+    def _alternatives(cls, tokens):
+        """
+        splits a pattern into token lists without branches that can match a slash.
+        """
+        alternatives = [[]]
+        for token in tokens:
+            op, av = token
+            choices = None
+            if cls._can_match_slash(token):
+                if op is sre_constants.SUBPATTERN:
+                    choices = cls._alternatives(av[-1])
+                elif op is sre_constants.BRANCH:
+                    choices = [alt for branch in av[1] for alt in cls._alternatives(branch)]
+                elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[:2] == (0, 1):
+                    choices = [[]] + cls._alternatives(av[2])
+
+            if choices is None:
+                choices = [[token]]
+            alternatives = [a + b for a in alternatives for b in choices]
+            if len(alternatives) > cls.MAX_STRINGS:
+                return [tokens]
+        return alternatives
+
+    @classmethod
+    def _find_scheme_end(cls, tokens):
+        """
+        returns the position after the (optional) scheme part of a pattern.
+        """
+        separator = [(sre_constants.LITERAL, ord(c)) for c in "://"]
+        for i in range(len(tokens)):
+            if tokens[i : i + 3] == separator:
+                return i + 3
+        return 0
+
+    @classmethod
+    def _expand_tail(cls, tokens):
+        """
+        returns the strings the end of tokens matches and whether they are complete,
+        so nothing or a dot is in front of them.
+        """
+        tails = {""}
+        for token in reversed(tokens):
+            strings = cls._expand([token])
+            if strings is None:
+                #: e.g. (?:\w+\.)? in front of the domain still ends a label
+                return tails, cls._ends_with_dot(token)
+            tails = {a + b for a in strings for b in tails}
+            if len(tails) > cls.MAX_STRINGS:
+                return None, False
+        return tails, True
+
+    @classmethod
+    def _expand(cls, tokens):
+        """
+        returns all strings a sequence of tokens can match, None if too many.
+        """
+        strings = {""}
+        for op, av in tokens:
+            if op is sre_constants.LITERAL:
+                choices = {chr(av)}
+            elif op is sre_constants.AT:
+                choices = {""}
+            elif op is sre_constants.IN and all(
+                item_op is sre_constants.LITERAL for item_op, item_av in av
+            ):
+                choices = {chr(item_av) for item_op, item_av in av}
+            elif op is sre_constants.SUBPATTERN:
+                choices = cls._expand(av[-1])
+            elif op is sre_constants.BRANCH:
+                choices = set()
+                for branch in av[1]:
+                    expanded = cls._expand(branch)
+                    if expanded is None:
+                        return None
+                    choices |= expanded
+            elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT) and av[1] <= 1:
+                choices = cls._expand(av[2])
+                if choices is not None and av[0] == 0:
+                    choices.add("")
+            else:
+                return None
+
+            if choices is None:
+                return None
+            strings = {a + b for a in strings for b in choices}
+            if len(strings) > cls.MAX_STRINGS:
+                return None
+        return strings
+
+    @classmethod
+    def _ends_with_dot(cls, token):
+        """
+        whether every non-empty match of token ends with a dot.
+        """
+        op, av = token
+        if op is sre_constants.LITERAL:
+            return av == ord(".")
+        if op is sre_constants.SUBPATTERN:
+            sub = list(av[-1])
+            return bool(sub) and cls._ends_with_dot(sub[-1])
+        if op is sre_constants.BRANCH:
+            return all(branch and cls._ends_with_dot(list(branch)[-1]) for branch in av[1])
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            sub = list(av[2])
+            return bool(sub) and cls._ends_with_dot(sub[-1])
+        return False
+
+    @classmethod
+    def _can_match_slash(cls, token):
+        op, av = token
+        if op is sre_constants.LITERAL:
+            return av == ord("/")
+        if op is sre_constants.NOT_LITERAL:
+            return av != ord("/")
+        if op is sre_constants.AT:
+            return False
+        if op is sre_constants.IN:
+            if av and av[0][0] is sre_constants.NEGATE:
+                return (sre_constants.LITERAL, ord("/")) not in av
+            for item_op, item_av in av:
+                if item_op is sre_constants.LITERAL and item_av == ord("/"):
+                    return True
+                if item_op is sre_constants.RANGE and item_av[0] <= ord("/") <= item_av[1]:
+                    return True
+                if item_op is sre_constants.CATEGORY and item_av not in (
+                    sre_constants.CATEGORY_DIGIT,
+                    sre_constants.CATEGORY_WORD,
+                ):
+                    return True
+            return False
+        if op is sre_constants.SUBPATTERN:
+            return any(cls._can_match_slash(t) for t in av[-1])
+        if op is sre_constants.BRANCH:
+            return any(cls._can_match_slash(t) for b in av[1] for t in b)
+        if op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+            return any(cls._can_match_slash(t) for t in av[2])
+        return True
+
+
+def _to_json(value):
+    """
+    marks tuples, plugin configs are lists of tuples and json knows only lists.
+    """
+    if isinstance(value, tuple):
+        return {"tuple": [_to_json(x) for x in value]}
+    if isinstance(value, list):
+        return [_to_json(x) for x in value]
+    if isinstance(value, dict):
+        return {k: _to_json(v) for k, v in value.items()}
+    return value
+
+
+def _from_json(obj):
+    return tuple(obj["tuple"]) if obj.keys() == {"tuple"} else obj
+
+
 class PluginManager:
     TYPES = (
         "decrypter",
@@ -92,6 +466,9 @@ class PluginManager:
     _RE_CONFIG = re.compile(r"\s*__config__\s*=\s*(\[[^\]]+\])", re.MULTILINE)
     _RE_DESC = re.compile(r'\s*__description__\s*=\s*(?:"|"""|\')([^"\']+)', re.MULTILINE)
 
+    INDEX_CACHE_FILENAME = "plugin_index.json"  #: in the data folder of userdir
+    INDEX_CACHE_VERSION = 2
+
     def __init__(self, core):
         self.pyload = core
         self._ = core._
@@ -106,6 +483,13 @@ class PluginManager:
         self.extractor_plugins = []
         self.base_plugins = []
 
+        self._router = None  #: see get_router
+
+        #: path -> (mtime, size, header) of the plugin files, see get_plugin_header
+        self._index_cache = self._load_index_cache()
+        self._index_cache_used = set()
+        self._index_cache_changed = False
+
         self.import_redirector = ImportRedirector(core)
 
         self.create_index()
@@ -133,6 +517,7 @@ class PluginManager:
                     dst[name] = src[name]
 
         self.pyload.log.debug("Indexing plugins...")
+        self._index_cache_used = set()
 
         self.decrypter_plugins, config = self.parse("decrypters", pattern=True)
         self.plugins["decrypter"] = self.decrypter_plugins
@@ -178,6 +563,8 @@ class PluginManager:
                     stack_info=self.pyload.debug > 2,
                 )
 
+        self._save_index_cache(prune=True)
+
     def parse(self, folder, pattern=False, home={}):
         """
         returns dict with information
@@ -207,8 +594,7 @@ class PluginManager:
                 os.path.isfile(os.path.join(pfolder, entry)) and entry.endswith(".py")
             ) and not entry.startswith("_"):
 
-                with open(os.path.join(pfolder, entry), encoding="utf-8-sig") as data:
-                    content = data.read()
+                header = self.get_plugin_header(os.path.join(pfolder, entry))
 
                 name = entry[:-3]  #: Trim ending ".py"
 
@@ -238,12 +624,11 @@ class PluginManager:
                 #         )
                 #         continue
 
-                m_ver = self._RE_VERSION.search(content)
-                if m_ver is None:
+                if header["version"] is None:
                     self.pyload.log.debug(f"__version__ not found in plugin {name}")
                     version = 0
                 else:
-                    version = float(m_ver.group(1))
+                    version = float(header["version"])
 
                 # home contains plugins from pyload root
                 if isinstance(home, dict) and name in home:
@@ -259,8 +644,9 @@ class PluginManager:
                 plugins[name]["folder"] = folder
 
                 if pattern:
-                    m_pat = self._RE_PATTERN.search(content)
-                    pattern = r"^unmachtable$" if m_pat is None else m_pat.group(1)
+                    pattern = header["pattern"]
+                    if pattern is None:
+                        pattern = r"^unmachtable$"
 
                     plugins[name]["pattern"] = pattern
 
@@ -277,19 +663,13 @@ class PluginManager:
                     self.pyload.config.delete_config(name)
                     continue
 
-                m_desc = self._RE_DESC.search(content)
-                desc = "" if m_desc is None else m_desc.group(1)
-
-                config = self._RE_CONFIG.findall(content)
-                if not config:
+                desc = header["desc"]
+                config = header["config"]
+                if config is None:
                     new_config = {"enabled": ["bool", "Activated", False], "desc": desc}
                     configs[name] = new_config
                     continue
 
-                config = literal_eval(
-                    config[0].strip().replace("\n", "").replace("\r", "")
-                )
-
                 if isinstance(config, list) and all(
                     isinstance(c, tuple) for c in config
                 ):
@@ -313,11 +693,102 @@ class PluginManager:
 
         return plugins, configs
 
+    def get_plugin_header(self, path):
+        """
+        returns version, pattern, description and config of a plugin file, the file
+        is only read if it changed since it was cached.
+        """
+        st = os.stat(path)
+        cached = self._index_cache.get(path)
+        self._index_cache_used.add(path)
+        if cached is not None and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+
+        with open(path, encoding="utf-8-sig") as data:
+            content = data.read()
+
+        m_ver = self._RE_VERSION.search(content)
+        m_pat = self._RE_PATTERN.search(content)
+        m_desc = self._RE_DESC.search(content)
+
+        m_config = self._RE_CONFIG.search(content)
+        if m_config is None:
+            config = None
+        else:
+            config = m_config.group(1).strip().replace("\n", "").replace("\r", "")
+            try:
+                config = literal_eval(config)
+            except (SyntaxError, ValueError):
+                pass  #: reported as invalid config
+
+        header = {
+            "version": None if m_ver is None else m_ver.group(1),
+            "pattern": None if m_pat is None else m_pat.group(1),
+            "desc": "" if m_desc is None else m_desc.group(1),
+            "config": config,
+        }
+        self._index_cache[path] = (st.st_mtime_ns, st.st_size, header)
+        self._index_cache_changed = True
+        return header
+
+    def _load_index_cache(self):
+        """
+        returns the plugin headers cached by the last start.
+        """
+        path = os.path.join(self.pyload.userdir, "data", self.INDEX_CACHE_FILENAME)
+        try:
+            with open(path, encoding="utf-8") as fp:
+                #: written by another user, who could fake the plugin headers
+                owner = os.fstat(fp.fileno()).st_uid
+                if hasattr(os, "getuid") and owner != os.getuid():
+                    self.pyload.log.warning(
+                        self._("Ignoring plugin index cache not owned by this user")
+                    )
+                    return {}
+                version, entries = json.load(fp, object_hook=_from_json)
+        except FileNotFoundError:
+            return {}
+        except Exception as exc:
+            self.pyload.log.debug(f"Unable to load the plugin index cache: {exc}")
+            return {}
+
+        #: another installation has other plugin files at the same paths
+        if version != [self.INDEX_CACHE_VERSION, PKGDIR]:
+            return {}
+        return {path: tuple(entry) for path, entry in entries.items()}
+
+    def _save_index_cache(self, prune=False):
+        """
+        writes the plugin header cache, prune drops the files not indexed since.
+        """
+        if prune:
+            for path in set(self._index_cache) - self._index_cache_used:
+                del self._index_cache[path]
+                self._index_cache_changed = True
+
+        if not self._index_cache_changed:
+            return
+
+        path = os.path.join(self.pyload.userdir, "data", self.INDEX_CACHE_FILENAME)
+        try:
+            data = json.dumps(
+                [[self.INDEX_CACHE_VERSION, PKGDIR], _to_json(self._index_cache)]
+            )
+            with open(path + ".tmp", mode="w", encoding="utf-8") as fp:
+                fp.write(data)
+            os.replace(path + ".tmp", path)
+        except (OSError, TypeError, ValueError) as exc:
+            self.pyload.log.warning(
+                self._("Unable to save the plugin index cache: {}").format(exc)
+            )
+        else:
+            self._index_cache_changed = False
+
     def parse_urls(self, urls):
         """
         parse plugins for given list of urls.
         """
-        last = (None, {})
+        router = self.get_router()
         res = []  #: tuples of (url, plugin)
 
         for url in urls:
@@ -327,28 +798,29 @@ class PluginManager:
                 memoryview,
             ):  #: check memoryview (as py2 buffer)
                 continue
-            found = False
 
-            # NOTE: E1136: Value 'last' is unsubscriptable (unsubscriptable-object)
-            if last != (None, {}) and last[1]["re"].match(url):
-                res.append((url, last[0]))
-                continue
+            res.append((url, router.find(url) or "DefaultPlugin"))
 
+        return res
+
+    def get_router(self):
+        """
+        returns the url router, rebuilt if any pattern was changed since.
+        """
+        plugins = [
+            (name, value["re"])
             for name, value in chain(
                 self.decrypter_plugins.items(),
                 self.downloader_plugins.items(),
                 self.container_plugins.items(),
-            ):
-                if value["re"].match(url):
-                    res.append((url, name))
-                    last = (name, value)
-                    found = True
-                    break
-
-            if not found:
-                res.append((url, "DefaultPlugin"))
-
-        return res
+            )
+        ]
+        if self._router is None or len(plugins) != len(self._router.plugins) or any(
+            a[0] != b[0] or a[1] is not b[1]
+            for a, b in zip(plugins, self._router.plugins)
+        ):
+            self._router = URLRouter(plugins)
+        return self._router
 
     def find_plugin(self, name, pluginlist=("decrypter", "downloader", "container")):
         for ptype in pluginlist:
@@ -506,6 +978,8 @@ class PluginManager:
                     stack_info=self.pyload.debug > 2,
                 )
 
+        self._save_index_cache()
+
         if "account" in as_dict:  #: accounts needs to be reloaded
             self.pyload.account_manager.init_plugins()
             self.pyload.scheduler.add_job(
@@ -11,9 +11,11 @@ from threading import Event, Lock
 # import pycurl
 
 from ..datatypes.pyfile import PyFile
+from ..datatypes.ttl_cache import TTLCache
 from ..network.request_factory import get_url
 from ..threads.decrypter_thread import DecrypterThread
 from ..threads.download_thread import DownloadThread
+from ..threads.info_pool import InfoPool
 from ..threads.info_thread import InfoThread
 from ..utils import fs
 from ..utils.struct.lock import lock
@@ -24,6 +26,8 @@ class ThreadManager:
     manages the download threads, assign jobs, reconnect etc.
     """
 
+    INFO_CACHE_SIZE = 10000  #: link infos kept for later checks
+
     def __init__(self, core):
         """
         Constructor.
@@ -43,8 +47,10 @@ class ThreadManager:
         self.lock = Lock()
 
         # some operations require to fetch url info from hoster, so we caching them so it wont be done twice
-        # contains a timestamp and will be purged after timeout
-        self.info_cache = {}
+        self.info_cache = TTLCache(
+            self.INFO_CACHE_SIZE, timedelta(minutes=10).total_seconds()
+        )
+        self.info_pool = InfoPool()  #: workers checking the links
 
         # pool of ids for online check
         self.result_ids = 0
@@ -151,8 +157,7 @@ class ThreadManager:
             # it may be failed non critical so we try it again
             self.assign_job()
 
-        if (self.info_cache or self.info_results) and self.timestamp < time.time():
-            self.info_cache.clear()
+        if self.info_results and self.timestamp < time.time():
             self.info_results.clear()
             self.pyload.log.debug("Cleared Result cache")
 
@@ -340,12 +345,7 @@ class ThreadManager:
                     job.set_status("starting")
                     thread.put(job)
                 else:
-                    # put job back
-                    if occupied_plugins not in self.pyload.files.job_cache:
-                        self.pyload.files.job_cache[occupied_plugins] = []
-                    self.pyload.files.job_cache[occupied_plugins].append(job.id)
-
-                    # check for decrypt jobs
+                    # job stays queued, check for decrypt jobs
                     job = self.pyload.files.get_decrypt_job()
                     if job:
                         job.init_plugin()
@@ -9,15 +9,18 @@ from .http.http_request import HTTPRequest
 
 
 class Browser:
-    def __init__(self, bucket=None, options={}):
+    def __init__(self, bucket=None, options={}, reactor=None, pool=None):
         self.log = getLogger(APPID)
 
         self.options = options  #: holds pycurl options
         self.bucket = bucket
+        self.reactor = reactor  #: runs the downloads transfers, if set
+        self.pool = pool  #: reuses the curl handles of the http requests, if set
 
         self.cj = None  #: needs to be set later
         self.http = None
         self._size = 0
+        self.checksums = {}  #: of the last download, computed while downloading
 
         self.renew_http_request()
         self.dl = None
@@ -27,7 +30,7 @@ class Browser:
             self.http.close()
         except Exception:
             pass
-        self.http = HTTPRequest(self.cj, self.options)
+        self.http = HTTPRequest(self.cj, self.options, pool=self.pool)
 
     def set_last_url(self, val):
         self.http.last_url = val
@@ -95,11 +98,16 @@ class Browser:
             resume=False,
             status_notify=None,
             disposition=False,
+            bucket=None,
+            checksums=(),
     ):
         """
-        this can also download ftp.
+        this can also download ftp, bucket replaces the bucket of the browser.
+
+        checksums are algorithms to compute while downloading, see `checksums`.
         """
         self._size = 0
+        self.checksums = {}
         self.dl = HTTPDownload(
             url,
             filename,
@@ -108,14 +116,17 @@ class Browser:
             post=post,
             referer=self.last_effective_url if ref else None,
             cj=self.cj if cookies else None,
-            bucket=self.bucket,
+            bucket=self.bucket if bucket is None else bucket,
             options=self.options,
             status_notify=status_notify,
             disposition=disposition,
+            reactor=self.reactor,
+            checksums=checksums,
         )
         name = self.dl.download(chunks, resume)
         self.http.code = self.dl.code
         self._size = self.dl.size
+        self.checksums = self.dl.checksums
 
         self.dl = None
 
@@ -127,6 +138,12 @@ class Browser:
         """
         return self.http.load(*args, **kwargs)
 
+    def load_stream(self, *args, **kwargs):
+        """
+        retrieves page piece by piece, see `HTTPRequest.load_stream`.
+        """
+        return self.http.load_stream(*args, **kwargs)
+
     def put_header(self, name, value):
         """
         add a header to the request.
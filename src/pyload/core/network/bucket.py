@@ -1,23 +1,58 @@
 # -*- coding: utf-8 -*-
 
 import time
+import weakref
 from threading import Lock
 
 from ..utils.struct.lock import lock
 
 
 class Bucket:
+    """
+    token bucket limiting the download speed, buckets form a tree.
+
+    A download consumes from its own bucket and from all buckets above it, like
+    global -> plugin -> account -> package -> file, and has to wait as long as the
+    most exhausted of them requires. While a limited bucket is exhausted, its active
+    children are also held to their share of its rate, so a single greedy child can
+    not starve its siblings. Shares are split by weight, the part a child does not
+    use goes to the others (max-min fairness). A child may use more than its share
+    as long as the parent has tokens left.
+    """
 
     MIN_RATE = 10 << 10  # 10kb minimum rate
+    ACTIVE_TIME = 2  #: seconds a bucket counts as active for the fair share after consuming
+    SHARE_INTERVAL = 0.5  #: seconds between updates of the shares of the children
 
-    def __init__(self):
-        self._rate = 0
+    def __init__(self, parent=None, rate=0, weight=1):
+        self._rate = int(rate)
         self.token = 0
         self.timestamp = time.time()
-        self.lock = Lock()
+        self.parent = parent
+        self.weight = weight
+        #: the whole tree shares one lock, tokens are updated along the path
+        self.lock = Lock() if parent is None else parent.lock
+
+        self.children = weakref.WeakSet()
+        self.last_used = 0
+        self.used = 0  #: bytes consumed since the last update of the shares
+        self.share = None  #: rate granted by the parent, None until first computed
+        self.throttled = False  #: held to its share since the last update of the shares
+        self.share_token = 0
+        self.share_timestamp = self.timestamp
+        self.shares_timestamp = self.timestamp
+
+        if parent is not None:
+            with self.lock:
+                parent.children.add(self)
 
     def __bool__(self):
-        return self._rate >= self.MIN_RATE
+        bucket = self
+        while bucket is not None:
+            if bucket._rate >= self.MIN_RATE:
+                return True
+            bucket = bucket.parent
+        return False
 
     @lock
     def set_rate(self, rate):
@@ -41,9 +76,66 @@ class Bucket:
         """
         Return time the process have to sleep, after consumed specified amount.
         """
-        if self.rate < self.MIN_RATE:
-            return 0  # NOTE: May become unresponsive otherwise
-        self._calc_token()
-        self.token -= amount
-        consumed = -self.token // self._rate if self.token < 0 else 0
-        return consumed
+        now = time.time()
+        delay = 0
+        bucket = self
+        while bucket is not None:
+            delay = max(delay, bucket._consume(amount, now))
+            bucket = bucket.parent
+        return delay
+
+    def _consume(self, amount, now):
+        self.last_used = now
+        self.used += amount
+        delay = 0
+
+        if self._rate >= self.MIN_RATE:  # NOTE: May become unresponsive otherwise
+            self._calc_token()
+            self.token -= amount
+            if self.token < 0:
+                delay = -self.token / self._rate
+
+        parent = self.parent
+        if parent is not None and parent._rate >= self.MIN_RATE:
+            if now - parent.shares_timestamp >= self.SHARE_INTERVAL or self.share is None:
+                parent._update_shares(now)
+            share = max(self.share, self.MIN_RATE)
+            delta = share * (now - self.share_timestamp)
+            self.share_token = min(share, self.share_token + delta) - amount
+            #: shares change, never hold back longer than until the next update
+            self.share_token = max(self.share_token, -share * self.SHARE_INTERVAL)
+            self.share_timestamp = now
+            if parent.token < 0 and self.share_token < 0:
+                delay = max(delay, -self.share_token / share)
+                self.throttled = True
+
+        return delay
+
+    def _update_shares(self, now):
+        """
+        splits the rate among the active children by weight, children which used
+        less than their part without being throttled get what they used plus some
+        room to grow.
+        """
+        elapsed = max(now - self.shares_timestamp, self.SHARE_INTERVAL)
+        self.shares_timestamp = now
+
+        active = []
+        for child in self.children:
+            if now - child.last_used < self.ACTIVE_TIME:
+                demand = float("inf") if child.throttled else child.used / elapsed
+                active.append((demand / child.weight, child))
+            child.used = 0
+            child.throttled = False
+        active.sort(key=lambda x: x[0])
+
+        rate = self._rate
+        weight = sum(child.weight for _, child in active)
+        for i, (demand, child) in enumerate(active):
+            fair = rate * child.weight / weight
+            if i < len(active) - 1:
+                child.share = min(fair, demand * child.weight * 1.25 + self.MIN_RATE)
+            else:
+                child.share = rate
+            rate -= child.share
+            weight -= child.weight
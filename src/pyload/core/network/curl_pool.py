@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+from threading import Lock
+
+import pycurl
+
+from ..utils.struct.lock import lock
+
+
+class CurlPool:
+    """
+    keeps used curl handles warm, so later requests can reuse their connections.
+
+    All handles share the DNS cache, the TLS session ids and the connection cache,
+    idle handles are kept apart by the options their connections depend on.
+    """
+
+    MAX_IDLE_HANDLES = 8  #: per options key
+
+    def __init__(self):
+        self.lock = Lock()
+        self.handles = {}  #: options key -> list of idle curl handles
+
+        self.share = pycurl.CurlShare()
+        self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_DNS)
+        self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_SSL_SESSION)
+        if hasattr(pycurl, "LOCK_DATA_CONNECT"):
+            self.share.setopt(pycurl.SH_SHARE, pycurl.LOCK_DATA_CONNECT)
+
+    @staticmethod
+    def get_key(options):
+        if not options:
+            return None, (), False
+        proxies = options.get("proxies") or {}
+        return (
+            options.get("interface"),
+            tuple(sorted(proxies.items())),
+            bool(options.get("ipv6")),
+        )
+
+    @lock
+    def get_handle(self, options):
+        """
+        returns an idle handle for these options or a new one.
+        """
+        idle = self.handles.get(self.get_key(options))
+        if idle:
+            return idle.pop()
+
+        c = pycurl.Curl()
+        c.setopt(pycurl.SHARE, self.share)
+        return c
+
+    def put_handle(self, c, options):
+        """
+        takes a handle back, it must not be used by the caller anymore.
+        """
+        #: never hand cookies or options of a request over to the next one
+        c.setopt(pycurl.COOKIELIST, "ALL")
+        c.reset()  #: keeps the connections and the share
+
+        with self.lock:
+            idle = self.handles.setdefault(self.get_key(options), [])
+            if len(idle) < self.MAX_IDLE_HANDLES:
+                idle.append(c)
+                return
+
+        c.close()
+
+    @lock
+    def clear(self):
+        """
+        closes all idle handles.
+        """
+        for idle in self.handles.values():
+            for c in idle:
+                c.close()
+        self.handles.clear()
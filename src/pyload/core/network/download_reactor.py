@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+import selectors
+import socket
+import time
+from concurrent.futures import Future
+from logging import getLogger
+from threading import Lock, Thread
+
+import pycurl
+from pyload import APPID
+
+
+class DownloadReactor:
+    """
+    runs the transfers of all HTTPDownloads on one curl multi handle in one thread.
+
+    The downloading threads submit their HTTPDownload and block on the returned
+    future, which is resolved as soon as all chunks are loaded or the transfer
+    failed. Writing the chunks to the final file is left to the waiting thread.
+    """
+
+    def __init__(self):
+        self.log = getLogger(APPID)
+        self.lock = Lock()
+
+        self.m = pycurl.CurlMulti()
+        self.m.setopt(pycurl.M_SOCKETFUNCTION, self._watch_socket)
+        self.thread = None  #: only running while there are downloads
+
+        self.jobs = []  #: submitted, but not yet started downloads
+        self.downloads = {}  #: running downloads mapped to their future
+
+        #: lets `submit` interrupt the select call
+        self.wakeup_r, self.wakeup_w = socket.socketpair()
+        self.wakeup_r.setblocking(False)
+        self.wakeup_w.setblocking(False)
+
+        #: not select, which fails for file descriptors above 1023
+        self.selector = selectors.DefaultSelector()
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ)
+
+    def submit(self, dl, chunks, resume):
+        """
+        starts loading a HTTPDownload, returns a future resolved when it is done.
+        """
+        future = Future()
+        with self.lock:
+            self.jobs.append((dl, chunks, resume, future))
+            if self.thread is None:
+                self.thread = Thread(target=self.run, name="DownloadReactor", daemon=True)
+                self.thread.start()
+        try:
+            self.wakeup_w.send(b"\0")
+        except BlockingIOError:  #: already woken up
+            pass
+        return future
+
+    def run(self):
+        ready = []  #: sockets with activity, as (fd, curl event mask)
+        try:
+            while True:
+                with self.lock:
+                    jobs, self.jobs = self.jobs, []
+                    if not jobs and not self.downloads:
+                        self.thread = None
+                        return
+                ready = self._step(jobs, ready)
+
+        except Exception as exc:
+            self.log.error(f"Download reactor failed: {exc}")
+            self._fail(exc)
+
+    def _step(self, jobs, ready):
+        """
+        starts the submitted jobs and runs the transfers, returns the sockets with
+        activity.
+        """
+        for dl, chunks, resume, future in jobs:
+            dl.m = dl.manager = self.m
+            self.downloads[dl] = future
+            self._call(dl, dl._start, chunks, resume)
+
+        t = time.time()
+        for dl in list(self.downloads):
+            self._call(dl, dl._prepare, t)
+
+        self._perform(ready)
+
+        finished = {dl: ([], []) for dl in self.downloads}
+        while True:
+            num_queued, ok_list, err_list = self.m.info_read()
+            for c in ok_list:
+                dl = self._find_download(c)
+                if dl is not None:
+                    finished[dl][0].append(c)
+            for c, errno, msg in err_list:
+                dl = self._find_download(c)
+                if dl is not None:
+                    finished[dl][1].append((c, errno, msg))
+            if num_queued == 0:  #: no more infos to get
+                break
+
+        for dl, (ok_list, err_list) in finished.items():
+            if dl in self.downloads and self._call(dl, dl._process, t, ok_list, err_list):
+                self._done(dl)
+
+        return self._select()
+
+    def _fail(self, exc):
+        """
+        ends all downloads with an error, the next submit starts a new thread.
+        """
+        for dl in list(self.downloads):
+            try:
+                self._done(dl, exc)
+            except Exception:
+                pass
+        with self.lock:
+            jobs, self.jobs = self.jobs, []
+            self.thread = None
+        for dl, chunks, resume, future in jobs:
+            future.set_exception(exc)
+
+    def _call(self, dl, func, *args):
+        """
+        calls a step of a download, a raised exception ends it.
+        """
+        try:
+            return func(*args)
+        except Exception as exc:
+            if dl in self.downloads:
+                self._done(dl, exc)
+            return False
+
+    def _done(self, dl, exc=None):
+        future = self.downloads.pop(dl)
+        try:
+            dl.detach()
+        finally:
+            if exc is None:
+                future.set_result(None)
+            else:
+                future.set_exception(exc)
+
+    def _find_download(self, handle):
+        for dl in self.downloads:
+            if dl.find_chunk(handle) is not None:
+                return dl
+
+    def _perform(self, ready):
+        """
+        lets curl handle the sockets with activity and the expired timeouts.
+        """
+        for fd, mask in ready:
+            self.m.socket_action(fd, mask)
+        #: also set off by added or unpaused transfers
+        if self.m.timeout() == 0:
+            self.m.socket_action(pycurl.SOCKET_TIMEOUT, 0)
+
+    def _select(self):
+        """
+        waits for socket activity of any transfer or for a new submitted download,
+        returns the sockets with activity.
+        """
+        timeout = 1.0
+        curl_timeout = self.m.timeout()
+        if curl_timeout >= 0:
+            timeout = min(timeout, curl_timeout / 1000)
+        for dl in self.downloads:
+            if dl.paused_chunks:
+                timeout = min(timeout, min(dl.paused_chunks.values()) - time.time())
+
+        try:
+            events = self.selector.select(max(timeout, 0))
+        except OSError as exc:
+            self.log.debug(f"Error waiting for sockets: {exc}")
+            time.sleep(max(timeout, 0))
+            return []
+
+        ready = []
+        for key, mask in events:
+            if key.fileobj is not self.wakeup_r:
+                ready.append(
+                    (
+                        key.fd,
+                        (pycurl.CSELECT_IN if mask & selectors.EVENT_READ else 0)
+                        | (pycurl.CSELECT_OUT if mask & selectors.EVENT_WRITE else 0),
+                    )
+                )
+                continue
+
+            try:
+                while self.wakeup_r.recv(1024):
+                    pass
+            except BlockingIOError:
+                pass
+        return ready
+
+    def _watch_socket(self, what, fd, multi, data):
+        """
+        called by curl with the events to wait for on one of its sockets.
+        """
+        try:
+            self.selector.unregister(fd)
+        except (KeyError, ValueError, OSError):  #: not watched or already closed
+            pass
+
+        if what != pycurl.POLL_REMOVE:
+            events = {
+                pycurl.POLL_IN: selectors.EVENT_READ,
+                pycurl.POLL_OUT: selectors.EVENT_WRITE,
+                pycurl.POLL_INOUT: selectors.EVENT_READ | selectors.EVENT_WRITE,
+            }[what]
+            try:
+                self.selector.register(fd, events)
+            except (ValueError, OSError) as exc:
+                self.log.debug(f"Error watching socket {fd}: {exc}")
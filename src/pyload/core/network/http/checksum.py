@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import zlib
+
+#: checksums of consecutive pieces can be combined into the one of the whole
+COMBINABLE = ("crc32", "adler32")
+
+
+def _gf2_times(mat, vec):
+    s = 0
+    i = 0
+    while vec:
+        if vec & 1:
+            s ^= mat[i]
+        vec >>= 1
+        i += 1
+    return s
+
+
+def _gf2_square(mat):
+    return [_gf2_times(mat, mat[n]) for n in range(32)]
+
+
+def crc32_combine(crc1, crc2, len2):
+    """
+    crc32 of two pieces from their crc32s and the length of the second one, like zlib
+    does it.
+    """
+    if len2 <= 0:
+        return crc1
+
+    odd = [0xEDB88320] + [1 << n for n in range(31)]  #: operator for one zero bit
+    even = _gf2_square(odd)  #: two zero bits
+    odd = _gf2_square(even)  #: four zero bits
+
+    #: apply len2 zero bytes to crc1, squaring gives the operator for twice the zeros
+    while True:
+        even = _gf2_square(odd)
+        if len2 & 1:
+            crc1 = _gf2_times(even, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+
+        odd = _gf2_square(even)
+        if len2 & 1:
+            crc1 = _gf2_times(odd, crc1)
+        len2 >>= 1
+        if not len2:
+            break
+
+    return crc1 ^ crc2
+
+
+def adler32_combine(adler1, adler2, len2):
+    """
+    adler32 of two pieces from their adler32s and the length of the second one, like
+    zlib does it.
+    """
+    base = 65521
+    rem = len2 % base
+    sum1 = adler1 & 0xFFFF
+    sum2 = (rem * sum1) % base
+    sum1 += (adler2 & 0xFFFF) + base - 1
+    sum2 += (adler1 >> 16) + (adler2 >> 16) + base - rem
+    return (sum1 % base) | ((sum2 % base) << 16)
+
+
+class StreamChecksum:
+    """
+    computes checksums of data passed piece by piece, as it is written.
+    """
+
+    def __init__(self, algorithms):
+        self.size = 0
+        self.hashers = {}  #: algorithm -> hashlib object
+        self.values = {}  #: combinable algorithm -> running value
+        for algorithm in algorithms:
+            if algorithm in COMBINABLE:
+                self.values[algorithm] = getattr(zlib, algorithm)(b"")
+            elif algorithm in hashlib.algorithms_available:
+                self.hashers[algorithm] = hashlib.new(algorithm)
+
+    def update(self, data):
+        for hasher in self.hashers.values():
+            hasher.update(data)
+        for algorithm, value in self.values.items():
+            self.values[algorithm] = getattr(zlib, algorithm)(data, value)
+        self.size += len(data)
+
+    def digests(self):
+        """
+        algorithm -> hex digest of the data so far.
+        """
+        digests = {x: h.hexdigest() for x, h in self.hashers.items()}
+        digests.update((x, f"{v:08x}") for x, v in self.values.items())
+        return digests
+
+    @staticmethod
+    def combine(parts):
+        """
+        hex digests of the combinable checksums of consecutive parts.
+        """
+        combine = {"crc32": crc32_combine, "adler32": adler32_combine}
+        algorithms = set(COMBINABLE).intersection(*(x.values for x in parts))
+
+        digests = {}
+        for algorithm in algorithms:
+            value = parts[0].values[algorithm]
+            for part in parts[1:]:
+                value = combine[algorithm](value, part.values[algorithm], part.size)
+            digests[algorithm] = f"{value:08x}"
+        return digests
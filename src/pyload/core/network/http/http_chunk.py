@@ -3,7 +3,6 @@
 import codecs
 import os
 import re
-import time
 import urllib.parse
 from cgi import parse_header as parse_header_line
 from email.header import decode_header as parse_mime_header
@@ -13,6 +12,7 @@ from posixpath import basename as posixpath_basename
 import pycurl
 from pyload.core.utils import purge, parse
 
+from .checksum import COMBINABLE, StreamChecksum
 from .http_request import HTTPRequest
 
 
@@ -25,6 +25,7 @@ class ChunkInfo:
         self.name = os.fsdecode(name)
         self.size = 0
         self.resume = False
+        self.preallocated = False  #: all chunks are written in place into one file
         self.chunks = []
 
     def __repr__(self):
@@ -37,8 +38,8 @@ class ChunkInfo:
     def set_size(self, size):
         self.size = int(size)
 
-    def add_chunk(self, name, range):
-        self.chunks.append((name, range))
+    def add_chunk(self, name, range, arrived=0):
+        self.chunks.append((name, range, arrived))
 
     def clear(self):
         self.chunks = []
@@ -50,18 +51,26 @@ class ChunkInfo:
         current = 0
         for i in range(chunks):
             end = self.size - 1 if (i == chunks - 1) else current + chunk_size
-            self.add_chunk(f"{self.name}.chunk{i}", (current, end))
+            #: preallocated chunks share the file of the initial chunk
+            index = 0 if self.preallocated else i
+            self.add_chunk(f"{self.name}.chunk{index}", (current, end))
             current += chunk_size + 1
 
     def save(self):
         fs_name = f"{self.name}.chunks"
-        with open(fs_name, mode="w", encoding="utf-8", newline="\n") as fh:
+        tmp_name = f"{fs_name}.tmp"
+        with open(tmp_name, mode="w", encoding="utf-8", newline="\n") as fh:
             fh.write(f"name:{self.name}\n")
             fh.write(f"size:{self.size}\n")
+            if self.preallocated:
+                fh.write("preallocated:1\n")
             for i, c in enumerate(self.chunks):
                 fh.write(f"#{i}:\n")
                 fh.write(f"\tname:{c[0]}\n")
                 fh.write(f"\trange:{c[1][0]}-{c[1][1]}\n")
+                if self.preallocated:
+                    fh.write(f"\tarrived:{c[2]}\n")
+        os.replace(tmp_name, fs_name)  #: never leave a truncated info file behind
 
     @staticmethod
     def load(name):
@@ -80,18 +89,28 @@ class ChunkInfo:
             ci = ChunkInfo(name)
             ci.loaded = True
             ci.set_size(size)
-            while True:
-                if not fh.readline():  #: skip line
-                    break
-                name = fh.readline()[1:-1]
-                range = fh.readline()[1:-1]
-                if name.startswith("name:") and range.startswith("range:"):
-                    name = name[5:]
-                    range = range[6:].split("-")
+
+            chunks = []
+            for line in fh:
+                key, sep, value = line.rstrip("\n").lstrip("\t").partition(":")
+                if not sep:
+                    raise WrongFormat
+                elif key == "preallocated":
+                    ci.preallocated = value == "1"
+                elif key.startswith("#"):
+                    chunks.append({})
+                elif chunks and key in ("name", "range", "arrived"):
+                    chunks[-1][key] = value
                 else:
                     raise WrongFormat
 
-                ci.add_chunk(name, (int(range[0]), int(range[1])))
+            for c in chunks:
+                if "name" not in c or "range" not in c:
+                    raise WrongFormat
+                range = c["range"].split("-")
+                ci.add_chunk(
+                    c["name"], (int(range[0]), int(range[1])), int(c.get("arrived", 0))
+                )
 
         return ci
 
@@ -109,6 +128,25 @@ class ChunkInfo:
     def get_chunk_range(self, index):
         return self.chunks[index][1]
 
+    def get_chunk_arrived(self, index):
+        return self.chunks[index][2]
+
+    def set_chunk_arrived(self, index, arrived):
+        name, range, _ = self.chunks[index]
+        self.chunks[index] = (name, range, arrived)
+
+    def split_chunk(self, index, offset):
+        """
+        moves the range from offset on of a chunk into a new one, returns its index.
+        """
+        name, range, arrived = self.chunks[index]
+        self.chunks[index] = (name, (range[0], offset - 1), arrived)
+
+        new_index = len(self.chunks)
+        new_name = name if self.preallocated else f"{self.name}.chunk{new_index}"
+        self.add_chunk(new_name, (offset, range[1]))
+        return new_index
+
 
 class HTTPChunk(HTTPRequest):
     def __init__(self, id, parent, range=None, resume=False):
@@ -132,6 +170,7 @@ class HTTPChunk(HTTPRequest):
         self.header_parsed = False  #: indicates if the header has been processed
 
         self.fp = None  #: file handle
+        self.checksum = None  #: StreamChecksum of the data written, if requested
 
         self.init_handle()
         self.c.setopt(pycurl.ENCODING, None)  #: avoid pycurl error 61
@@ -141,9 +180,6 @@ class HTTPChunk(HTTPRequest):
 
         self.rep = None
 
-        self.sleep = 0.0
-        self.last_size = 0
-
     def __repr__(self):
         return f"<HTTPChunk id={self.id}, size={self.size}, arrived={self.arrived}>"
 
@@ -152,7 +188,7 @@ class HTTPChunk(HTTPRequest):
         return self.p.cj
 
     def format_range(self):
-        if self.id == len(self.p.info.chunks) - 1:  #: as last chunk don't set end range, so we get everything
+        if self.range[1] >= self.p.size - 1:  #: as last chunk don't set end range, so we get everything
             end = ""
             if self.resume:
                 start = self.arrived + self.range[0]
@@ -182,10 +218,14 @@ class HTTPChunk(HTTPRequest):
 
         fs_name = self.p.info.get_chunk_filename(self.id)
         if self.resume:
-            self.fp = open(fs_name, mode="ab")
-            self.arrived = self.fp.tell()
-            if not self.arrived:
-                self.arrived = os.stat(fs_name).st_size
+            if self.p.preallocate:
+                self.fp = self.open_target(fs_name)
+                self.arrived = self.p.info.get_chunk_arrived(self.id)
+            else:
+                self.fp = open(fs_name, mode="ab")
+                self.arrived = self.fp.tell()
+                if not self.arrived:
+                    self.arrived = os.stat(fs_name).st_size
 
             if self.range:
                 #: do nothing if chunk already finished
@@ -207,10 +247,29 @@ class HTTPChunk(HTTPRequest):
                 self.log.debug(f"Chunk {self.id + 1} chunked with range {range}")
                 self.c.setopt(pycurl.RANGE, range)
 
-            self.fp = open(fs_name, mode="wb")
+            if self.p.preallocate:
+                self.fp = self.open_target(fs_name)
+            else:
+                self.fp = open(fs_name, mode="wb")
+
+        if self.p.checksum_algorithms and not self.arrived:
+            #: only the initial chunk may end up holding the whole file in order
+            algorithms = self.p.checksum_algorithms
+            if self.id:
+                algorithms = [x for x in algorithms if x in COMBINABLE]
+            self.checksum = StreamChecksum(algorithms)
 
         return self.c
 
+    def open_target(self, fs_name):
+        """
+        opens the preallocated file shared by all chunks, without truncating it.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0)
+        if self.id == 0 and not self.resume:
+            flags |= os.O_TRUNC
+        return open(os.open(fs_name, flags, 0o666), mode="wb", buffering=0)
+
     def write_header(self, buf):
         self.response_header += buf
         # TODO: forward headers?, this is possibly unneeded, when we just parse valid 200 headers
@@ -228,37 +287,76 @@ class HTTPChunk(HTTPRequest):
 
     def write_body(self, buf):
         #: ignore BOM, it confuses unrar
+        #: (not when writing in place, it would shift the other chunks offsets)
         if not self.BOMChecked:
-            if buf[:3] == codecs.BOM_UTF8:
+            if buf[:3] == codecs.BOM_UTF8 and not (self.p.preallocate and self.p.chunk_support):
                 buf = buf[3:]
             self.BOMChecked = True
 
         size = len(buf)
 
-        self.arrived += size
-
-        self.fp.write(buf)
-
-        if self.p.bucket:
-            time.sleep(self.p.bucket.consumed(size))
+        if self.p.preallocate:
+            self.write_at(buf)
         else:
-            # Avoid small buffers, increasing sleep time slowly if buffer size gets smaller
-            # otherwise reduce sleep time percentual (values are based on tests)
-            # So in general cpu time is saved without reducing bandwidth too much
-
-            if size < self.last_size:
-                self.sleep += 0.002
-            else:
-                self.sleep *= 0.7
-
-            self.last_size = size
-
-            time.sleep(self.sleep)
+            if self.checksum is not None:
+                self.update_checksum(buf)
+            self.arrived += size
+            self.fp.write(buf)
 
         if self.range and self.arrived > self.size:
             self.aborted = True  #: tell parent to ignore the pycurl Exception
             return 0  #: close if chunk has enough data
 
+        if self.p.bucket:
+            delay = self.p.bucket.consumed(size)
+            if delay:
+                self.p.pause_chunk(self, delay)
+
+    def write_at(self, buf):
+        """
+        writes buf directly at the chunk offset in the preallocated file.
+        """
+        offset = self.arrived + (self.range[0] if self.range else 0)
+        data = memoryview(buf)
+        if self.range:
+            #: never write past the chunk range, next chunk owns those bytes
+            data = data[: max(0, self.range[1] + 1 - offset)]
+
+        if self.checksum is not None:
+            self.update_checksum(data)
+
+        fd = self.fp.fileno()
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data = data[written:]
+            offset += written
+            self.arrived += written
+
+    def update_checksum(self, buf):
+        """
+        hashes the data of the chunk range, the rest is overwritten when merging.
+        """
+        size = self.get_checksum_size()
+        if size is not None:
+            buf = buf[: max(0, size - self.checksum.size)]
+        self.checksum.update(buf)
+
+    def get_checksum_size(self):
+        """
+        returns how many bytes the checksum may cover, None for all.
+        """
+        if self.range:
+            return self.range[1] - self.range[0] + 1
+
+        #: the initial chunk gets its range only when the chunks are created, data
+        #: hashed past it until then could not be taken out of the checksum again
+        p = self.p
+        if p.chunk_support and p.size and not p.chunks_created:
+            if p.info.get_count() > 1:  #: resumed, the chunks are known already
+                start, end = p.info.get_chunk_range(0)
+                return end - start + 1
+            return min(p.size // p.connections + 1, p.size)  #: see create_chunks
+
     def parse_header(self):
         """
         parse data from received header.
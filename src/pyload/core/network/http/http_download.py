@@ -8,6 +8,7 @@ import pycurl
 from pyload import APPID
 
 from ..exceptions import Abort
+from .checksum import StreamChecksum
 from .http_chunk import ChunkInfo, HTTPChunk
 from .http_request import BadHeader
 
@@ -17,6 +18,8 @@ class HTTPDownload:
     loads a url http + ftp.
     """
 
+    MIN_SPLIT_SIZE = 1 << 20  #: never hand over ranges smaller than 1 MiB
+
     def __init__(
         self,
         url,
@@ -30,6 +33,8 @@ class HTTPDownload:
         options={},
         status_notify=None,
         disposition=False,
+        reactor=None,
+        checksums=(),
     ):
         self.url = url
         self.filename = filename  #: complete file destination, not only name
@@ -59,9 +64,19 @@ class HTTPDownload:
             self.info_saved = True
         except IOError:
             self.info = ChunkInfo(filename)
+            self.info_saved = False
+
+        #: write all chunks in place into one preallocated file instead of merging them
+        self.preallocate = bool(options.get("preallocate")) and hasattr(os, "pwrite")
 
         self.chunk_support = None
-        self.m = self.manager = pycurl.CurlMulti()
+        self.reactor = reactor  #: shared reactor running the transfer, if any
+        #: the reactor attaches its own multi handle
+        self.m = self.manager = None if reactor else pycurl.CurlMulti()
+
+        #: chunks paused by the bucket, mapped to the time they may continue
+        self.paused_chunks = {}
+        self.chunks_done = set()  #: list of curl handles that are finished
 
         #: needed for speed calculation
         self.last_arrived = []
@@ -70,6 +85,10 @@ class HTTPDownload:
         #: notifications callback
         self.status_notify = status_notify
 
+        #: algorithms to hash the data with while it is written, e.g. "md5" or "crc32"
+        self.checksum_algorithms = tuple(checksums)
+        self.checksums = {}  #: algorithm -> hex digest of the downloaded file
+
     @property
     def speed(self):
         #: bytes per second
@@ -88,13 +107,29 @@ class HTTPDownload:
     def _copy_chunks(self):
         init = self.info.get_chunk_filename(0)  #: initial chunk name
 
-        if self.info.get_count() > 1:
+        if self.preallocate:
+            #: chunks were written in place, just make sure none is missing data
+            self._sync_progress()
+            for i in range(self.info.get_count()):
+                start, end = self.info.get_chunk_range(i)
+                if start + self.info.get_chunk_arrived(i) < end:
+                    os.remove(init)
+                    self.info.remove()
+                    raise Exception(
+                        "Downloaded content was smaller than expected. Try to reduce download connections."
+                    )
+
+        elif self.info.get_count() > 1:
+            #: split chunks are appended to the info, so merge them by offset
+            order = sorted(
+                range(self.info.get_count()), key=lambda i: self.info.get_chunk_range(i)[0]
+            )
             with open(init, mode="rb+") as fo:  #: first chunk file
-                for i in range(1, self.info.get_count()):
+                for prev, i in zip(order, order[1:]):
                     #: input file
                     #: seek to beginning of chunk, to get rid of overlapping chunks
-                    fo.seek(self.info.get_chunk_range(i - 1)[1] + 1)
-                    fname = f"{self.filename}.chunk{i}"
+                    fo.seek(self.info.get_chunk_range(prev)[1] + 1)
+                    fname = self.info.get_chunk_filename(i)
                     with open(fname, mode="rb") as fi:
                         buffer_size = 32 << 10
                         while True:  #: copy in chunks, consumes less memory
@@ -123,6 +158,74 @@ class HTTPDownload:
         os.rename(init, self.filename)
         self.info.remove()  #: os.remove info file
 
+    def _preallocate(self, chunk):
+        """
+        reserves the whole file on disk, so chunks can be written at their offsets.
+        """
+        fd = chunk.fp.fileno()
+        try:
+            os.posix_fallocate(fd, 0, self.size)
+        except (AttributeError, OSError):  #: not supported by platform or filesystem
+            os.ftruncate(fd, self.size)
+
+    def _sync_progress(self):
+        for chunk in self.chunks:
+            self.info.set_chunk_arrived(chunk.id, chunk.arrived)
+
+    def _save_progress(self):
+        """
+        preallocated files cannot tell how much was loaded, so keep it in the info file.
+        """
+        if not self.preallocate or not self.info_saved:
+            return
+        self._sync_progress()
+        self.info.save()
+
+    def _split_chunks(self, speeds):
+        """
+        work stealing: for every idle connection, split the remaining range of the
+        chunk which will need the longest to finish and load its second half with
+        a new connection.
+        """
+        running = [c for c in self.chunks if c.c not in self.chunks_done and c.range]
+        for _ in range(self.connections - len(running)):
+            slowest = None
+            time_left = 0
+            for chunk in running:
+                remaining = chunk.range[1] - chunk.range[0] - chunk.arrived + 1
+                if remaining < 2 * self.MIN_SPLIT_SIZE:
+                    continue
+
+                speed = speeds.get(chunk.id, 0)
+                chunk_time_left = remaining / speed if speed else float("inf")
+                if chunk_time_left > time_left:
+                    slowest = chunk
+                    time_left = chunk_time_left
+
+            if slowest is None:
+                break
+
+            remaining = slowest.range[1] - slowest.range[0] - slowest.arrived + 1
+            offset = slowest.range[0] + slowest.arrived + remaining // 2
+
+            self._sync_progress()
+            index = self.info.split_chunk(slowest.id, offset)
+            self.info.save()  #: atomically, so resume always sees consistent ranges
+            self.info_saved = True
+
+            slowest.set_range(self.info.get_chunk_range(slowest.id))
+
+            c = HTTPChunk(index, self, self.info.get_chunk_range(index), False)
+            self.log.debug(
+                f"Chunk {slowest.id + 1} split, chunk {index + 1} loads the remaining range"
+            )
+            self.chunks.append(c)
+            self.m.add_handle(c.get_handle())
+
+            #: until measured, expect the new connection to be as fast as the old one
+            speeds[index] = speeds.get(slowest.id, 0)
+            running.append(c)
+
     def download(self, chunks=1, resume=False):
         """
         returns new filename or None.
@@ -145,7 +248,11 @@ class HTTPDownload:
 
                 return self._download(chunks, False)
             else:
+                self._save_progress()
                 raise
+        except Exception:
+            self._save_progress()
+            raise
         finally:
             self.close()
 
@@ -155,12 +262,92 @@ class HTTPDownload:
             return None
 
     def _download(self, chunks, resume):
+        if self.reactor is not None:
+            #: the shared reactor drives the transfer, just wait until it is done
+            self.reactor.submit(self, chunks, resume).result()
+        else:
+            self._start(chunks, resume)
+            while True:
+                t = time.time()
+                self._prepare(t)
+
+                while True:
+                    ret, num_handles = self.m.perform()
+                    if ret != pycurl.E_CALL_MULTI_PERFORM:
+                        break
+
+                ok_list = []
+                err_list = []
+                while True:
+                    num_queued, ok, err = self.m.info_read()
+                    ok_list.extend(ok)
+                    err_list.extend(err)
+                    if num_queued == 0:  #: no more infos to get
+                        break
+
+                if self._process(t, ok_list, err_list):
+                    break  #: all chunks loaded
+
+                self.m.select(self._select_timeout())
+
+        for chunk in self.chunks:
+            chunk.flush_file()  #: make sure downloads are written to disk
+
+        self._copy_chunks()
+
+        self.code = self.chunks[0].code
+        self.size = self.arrived  #: set size to actual downloaded size
+        self.checksums = self._get_checksums()
+
+    def _get_checksums(self):
+        """
+        digests of the downloaded file, from the data the chunks hashed while writing.
+
+        Checksums of several chunks can only be combined for crc32 and adler32, and
+        only if every chunk hashed exactly its range, e.g. not after resuming.
+        """
+        if not self.checksum_algorithms:
+            return {}
+
+        chunks = sorted(self.chunks, key=lambda c: c.range[0] if c.range else 0)
+        if any(c.checksum is None for c in chunks):
+            return {}
+
+        size = os.path.getsize(self.filename)
+        if len(chunks) == 1:
+            checksum = chunks[0].checksum
+            return checksum.digests() if checksum.size == size else {}
+
+        start = 0
+        for c in chunks:
+            if (
+                not c.range
+                or c.range[0] != start
+                or c.checksum.size != c.range[1] - c.range[0] + 1
+            ):
+                return {}
+            start = c.range[1] + 1
+
+        if start != size:
+            return {}
+        return StreamChecksum.combine([c.checksum for c in chunks])
+
+    def _start(self, chunks, resume):
+        """
+        sets up the initial chunk, the transfer is driven by `_prepare` and `_process`.
+        """
+        self.connections = chunks  #: maximum number of concurrent chunks
         if not resume:
             self.info.clear()
+            self.info_saved = False
+            self.info.preallocated = self.preallocate
             self.info.add_chunk(
                 f"{self.filename}.chunk0", (0, 0)
             )  #: create an initial entry)
+        else:
+            self.preallocate = self.info.preallocated  #: keep the mode it was started with
 
+        self.resume = resume
         self.chunks = []
 
         #: initial chunk that will load complete file (if needed)
@@ -169,157 +356,173 @@ class HTTPDownload:
         self.chunks.append(init)
         self.m.add_handle(init.get_handle())
 
-        last_finish_check = 0
-        last_time_check = 0
-        chunks_done = set()  #: list of curl handles that are finished
-        chunks_created = False
-        done = False
+        self.last_time_check = 0
+        self.chunks_done = set()  #: list of curl handles that are finished
+        self.chunks_created = False
         if (
             self.info.get_count() > 1
         ):  #: This is a resume, if we were chunked originally assume still can
             self.chunk_support = True
 
-        while True:
-            #: do we need to create chunks?
-            if (
-                not chunks_created and self.chunk_support and self.size
-            ):  #: will be set later by first chunk
+    def _prepare(self, t):
+        """
+        creates the chunks as soon as possible and continues paused ones.
+        """
+        init = self.chunks[0]
 
-                if not resume:
-                    self.info.set_size(self.size)
-                    self.info.create_chunks(chunks)
-                    self.info.save()
+        #: do we need to create chunks?
+        if (
+            not self.chunks_created and self.chunk_support and self.size
+        ):  #: will be set later by first chunk
 
-                chunks = self.info.get_count()
+            if not self.resume:
+                self.info.set_size(self.size)
+                self.info.create_chunks(self.connections)
+                self.info.save()
+                self.info_saved = True
+                if self.preallocate:
+                    self._preallocate(init)
 
-                init.set_range(self.info.get_chunk_range(0))
+            init.set_range(self.info.get_chunk_range(0))
 
-                for i in range(1, chunks):
-                    c = HTTPChunk(i, self, self.info.get_chunk_range(i), resume)
+            for i in range(1, self.info.get_count()):
+                c = HTTPChunk(i, self, self.info.get_chunk_range(i), self.resume)
 
-                    handle = c.get_handle()
-                    if handle:
-                        self.chunks.append(c)
-                        self.m.add_handle(handle)
-                    else:
-                        #: close immediately
-                        self.log.debug("Invalid curl handle -> closed")
-                        c.close()
+                handle = c.get_handle()
+                if handle:
+                    self.chunks.append(c)
+                    self.m.add_handle(handle)
+                else:
+                    #: close immediately
+                    self.log.debug("Invalid curl handle -> closed")
+                    c.close()
 
-                chunks_created = True
+            self.chunks_created = True
 
-            while True:
-                ret, num_handles = self.m.perform()
-                if ret != pycurl.E_CALL_MULTI_PERFORM:
-                    break
-
-            t = time.time()
-
-            #: reduce these calls
-            while last_finish_check + 0.5 < t:
-                #: list of failed curl handles
-                failed = []
-                ex = None  #: save only last exception, we can only raise one anyway
-
-                num_queued, ok_list, err_list = self.m.info_read()
-                for c in ok_list:
-                    chunk = self.find_chunk(c)
-                    try:  #: check if the header implies success, else add it to failed list
-                        chunk.code = chunk.verify_header()
-                    except BadHeader as exc:
-                        self.log.debug(f"Chunk {chunk.id + 1} failed: {exc}")
-                        chunk.code = exc.code
-                        failed.append(chunk)
-                        ex = exc
-                    else:
-                        self.log.debug(f"Chunk {chunk.id + 1} download finished")
-                        chunks_done.add(c)
-
-                for c, errno, msg in err_list:
-                    chunk = self.find_chunk(c)
-                    #: test if chunk was finished
-                    if errno != pycurl.E_WRITE_ERROR or not chunk.aborted:
-                        failed.append(chunk)
-                        ex = pycurl.error(errno, msg)
-                        self.log.debug(f"Chunk {chunk.id + 1} failed: {ex}")
-                        continue
-
-                    try:  #: check if the header implies success, else add it to failed list
-                        chunk.code = chunk.verify_header()
-                    except BadHeader as exc:
-                        self.log.debug(f"Chunk {chunk.id + 1} failed: {exc}")
-                        chunk.code = exc.code
-                        failed.append(chunk)
-                        ex = exc
-                    else:
-                        self.log.debug(f"Chunk {chunk.id + 1} download finished")
-                        chunks_done.add(c)
-
-                if num_queued == 0:  #: no more infos to get
-
-                    #: check if init is not finished, so we reset download connections
-                    #: note that other chunks are closed and downloaded with init too
-                    if failed and init not in failed and init.c not in chunks_done:
-                        self.log.error(
-                            f"Download chunks failed, fallback to single connection | {ex}"
-                        )
+        self._continue_chunks(t)
 
-                        #: list of chunks to clean and os.remove
-                        to_clean = [x for x in self.chunks if x is not init]
-                        for chunk in to_clean:
-                            self.close_chunk(chunk)
-                            self.chunks.remove(chunk)
-                            os.remove(self.info.get_chunk_filename(chunk.id))
-
-                        #: let first chunk load the rest and update the info file
-                        init.reset_range()
-                        self.info.clear()
-                        self.info.add_chunk(f"{self.filename}.chunk0", (0, self.size))
-                        self.info.save()
-                    elif failed:
-                        raise ex or Exception
-
-                    last_finish_check = t
-
-                    if len(chunks_done) >= len(self.chunks):
-                        if len(chunks_done) > len(self.chunks):
-                            self.log.warning(
-                                "Finished download chunks size incorrect, please report bug."
-                            )
-                        done = True  #: all chunks loaded
-
-                    break
-
-            if done:
-                break  #: all chunks loaded
-
-            #: calc speed once per second, averaging over 3 seconds
-            if last_time_check + 1 < t:
-                arrived_delta = (
-                    chunk.arrived - (self.last_arrived[i] if len(self.last_arrived) > i else 0)
-                    for i, chunk in enumerate(self.chunks)
+    def _process(self, t, ok_list, err_list):
+        """
+        handles the finished curl handles, returns True when all chunks are loaded.
+        """
+        init = self.chunks[0]
+
+        #: list of failed curl handles
+        failed = []
+        ex = None  #: save only last exception, we can only raise one anyway
+
+        for c in ok_list:
+            chunk = self.find_chunk(c)
+            try:  #: check if the header implies success, else add it to failed list
+                chunk.code = chunk.verify_header()
+            except BadHeader as exc:
+                self.log.debug(f"Chunk {chunk.id + 1} failed: {exc}")
+                chunk.code = exc.code
+                failed.append(chunk)
+                ex = exc
+            else:
+                self.log.debug(f"Chunk {chunk.id + 1} download finished")
+                self.chunks_done.add(c)
+
+        for c, errno, msg in err_list:
+            chunk = self.find_chunk(c)
+            #: test if chunk was finished
+            if errno != pycurl.E_WRITE_ERROR or not chunk.aborted:
+                failed.append(chunk)
+                ex = pycurl.error(errno, msg)
+                self.log.debug(f"Chunk {chunk.id + 1} failed: {ex}")
+                continue
+
+            try:  #: check if the header implies success, else add it to failed list
+                chunk.code = chunk.verify_header()
+            except BadHeader as exc:
+                self.log.debug(f"Chunk {chunk.id + 1} failed: {exc}")
+                chunk.code = exc.code
+                failed.append(chunk)
+                ex = exc
+            else:
+                self.log.debug(f"Chunk {chunk.id + 1} download finished")
+                self.chunks_done.add(c)
+
+        #: check if init is not finished, so we reset download connections
+        #: note that other chunks are closed and downloaded with init too
+        if failed and init not in failed and init.c not in self.chunks_done:
+            self.log.error(
+                f"Download chunks failed, fallback to single connection | {ex}"
+            )
+
+            #: list of chunks to clean and os.remove
+            to_clean = [x for x in self.chunks if x is not init]
+            for chunk in to_clean:
+                self.close_chunk(chunk)
+                self.chunks.remove(chunk)
+                if not self.preallocate:
+                    os.remove(self.info.get_chunk_filename(chunk.id))
+
+            #: let first chunk load the rest and update the info file
+            init.reset_range()
+            self.info.clear()
+            self.info.add_chunk(f"{self.filename}.chunk0", (0, self.size))
+            self.info.save()
+        elif failed:
+            raise ex or Exception
+
+        if len(self.chunks_done) >= len(self.chunks):
+            if len(self.chunks_done) > len(self.chunks):
+                self.log.warning(
+                    "Finished download chunks size incorrect, please report bug."
                 )
-                self.last_speeds = [
-                    sum(float(delta) / (t - last_time_check) for delta in arrived_delta)
-                ] + self.last_speeds[:2]
+            return True  #: all chunks loaded
 
-                self.last_arrived = [c.arrived for c in self.chunks]
-                last_time_check = t
-                self.update_progress()
+        #: calc speed once per second, averaging over 3 seconds
+        if self.last_time_check + 1 < t:
+            chunk_speeds = {
+                chunk.id: float(
+                    chunk.arrived - (self.last_arrived[i] if len(self.last_arrived) > i else 0)
+                ) / (t - self.last_time_check)
+                for i, chunk in enumerate(self.chunks)
+            }
+            self.last_speeds = [sum(chunk_speeds.values())] + self.last_speeds[:2]
 
-            if self.abort:
-                raise Abort
+            self.last_arrived = [c.arrived for c in self.chunks]
+            self.last_time_check = t
+            self.update_progress()
 
-            # time.sleep(0.003)  #: suppress busy waiting - limits dl speed to  (1 / x) * buffersize
-            self.m.select(1)
+            if self.chunks_created:
+                self._split_chunks(chunk_speeds)
+                self._save_progress()
 
-        for chunk in self.chunks:
-            chunk.flush_file()  #: make sure downloads are written to disk
+        if self.abort:
+            raise Abort
 
-        self._copy_chunks()
+        return False
 
-        self.code = init.code
-        self.size = self.arrived  #: set size to actual downloaded size
+    def pause_chunk(self, chunk, delay):
+        """
+        stops receiving data for a chunk, instead of sleeping in its callback.
+        """
+        chunk.c.pause(pycurl.PAUSE_RECV)
+        self.paused_chunks[chunk] = time.time() + delay
+
+    def _continue_chunks(self, t):
+        for chunk, until in list(self.paused_chunks.items()):
+            if until <= t:
+                #: unpausing may call the write callback again, which can pause it anew
+                del self.paused_chunks[chunk]
+                if chunk.c not in self.chunks_done:
+                    chunk.c.pause(pycurl.PAUSE_CONT)
+
+    def _select_timeout(self):
+        """
+        wait for socket activity as long as curl and the paused chunks allow.
+        """
+        timeout = 1.0
+        curl_timeout = self.m.timeout()
+        if curl_timeout >= 0:
+            timeout = min(timeout, curl_timeout / 1000)
+        if self.paused_chunks:
+            timeout = min(timeout, min(self.paused_chunks.values()) - time.time())
+        return max(timeout, 0)
 
     def update_progress(self):
         if self.status_notify:
@@ -342,13 +545,27 @@ class HTTPDownload:
                 return chunk
 
     def close_chunk(self, chunk):
+        self.paused_chunks.pop(chunk, None)
         try:
-            self.m.remove_handle(chunk.c)
+            if self.m is not None:
+                self.m.remove_handle(chunk.c)
         except pycurl.error as exc:
             self.log.debug(f"Error removing chunk: {exc}")
         finally:
             chunk.close()
 
+    def detach(self):
+        """
+        removes all curl handles from the multi handle, the chunks stay usable.
+        """
+        for chunk in self.chunks:
+            try:
+                self.m.remove_handle(chunk.c)
+            except pycurl.error as exc:
+                self.log.debug(f"Error removing chunk: {exc}")
+        self.paused_chunks.clear()
+        self.m = self.manager = None
+
     def close(self):
         """
         cleanup.
@@ -358,7 +575,8 @@ class HTTPDownload:
 
         self.chunks = []
         if hasattr(self, "m"):
-            self.m.close()
+            if self.m is not None and self.reactor is None:
+                self.m.close()
             del self.m
         if hasattr(self, "cj"):
             del self.cj
@@ -64,11 +64,13 @@ class FormFile:
 
 
 class HTTPRequest:
-    def __init__(self, cookies=None, options=None, limit=2_000_000):
+    def __init__(self, cookies=None, options=None, limit=2_000_000, pool=None):
         self.exception = None
         self.limit = limit
 
-        self.c = pycurl.Curl()
+        self.options = options
+        self.pool = pool  #: hands out reused curl handles, if set
+        self.c = pool.get_handle(options) if pool else pycurl.Curl()
         self.rep = None
 
         self.cj = cookies  #: cookiejar
@@ -349,6 +351,115 @@ class HTTPRequest:
 
         return ret
 
+    def load_stream(
+        self,
+        url,
+        get={},
+        post={},
+        referer=True,
+        cookies=True,
+        multipart=False,
+        decode=True,
+        follow_location=True,
+        save_cookies=True,
+    ):
+        """
+        loads a given page and yields its body piece by piece as it arrives.
+
+        The body is never held in memory as a whole and the `limit` does not apply.
+        With `decode` the pieces are decoded incrementally, so a multibyte character
+        split between two pieces is yielded once complete. Bad status codes raise
+        BadHeader once the whole (error) response is loaded, even if it is empty.
+        """
+        self.set_request_context(url, get, post, referer, cookies, multipart, decode)
+        self.rep.close()
+        self.rep = None
+
+        self.response_header = b""
+        self.c.setopt(pycurl.HTTPHEADER, self.request_headers)
+
+        if not follow_location:
+            self.c.setopt(pycurl.FOLLOWLOCATION, 0)
+
+        pieces = []
+
+        def write_piece(buf):
+            if self.abort:
+                self.exception = Abort()
+                return pycurl.E_WRITE_ERROR
+            pieces.append(buf)
+
+        self.c.setopt(pycurl.WRITEFUNCTION, write_piece)
+
+        m = pycurl.CurlMulti()
+        m.add_handle(self.c)
+
+        decoder = None
+        bad_status = False
+        try:
+            while True:
+                while True:
+                    ret, num_handles = m.perform()
+                    if ret != pycurl.E_CALL_MULTI_PERFORM:
+                        break
+
+                if pieces and not bad_status:
+                    #: the headers are complete as soon as body data arrives
+                    if self.c.getinfo(pycurl.RESPONSE_CODE) in BAD_STATUS_CODES:
+                        bad_status = True
+
+                    else:
+                        buf = b"".join(pieces)
+                        del pieces[:]
+
+                        if decode:
+                            if decoder is None:
+                                decoder = self.get_decoder() or codecs.getincrementaldecoder("iso-8859-1")()
+                            buf = decoder.decode(buf)
+
+                        if buf:
+                            yield buf
+
+                if not num_handles:
+                    break
+
+                m.select(1.0)
+
+            num_queued, ok_list, err_list = m.info_read()
+            for c, errno, msg in err_list:
+                if errno == pycurl.E_WRITE_ERROR and self.exception:
+                    raise self.exception from None
+                raise pycurl.error(errno, msg)
+
+            if decoder is not None:
+                buf = decoder.decode(b"", True)
+                if buf:
+                    yield buf
+
+        finally:
+            m.remove_handle(self.c)
+            m.close()
+
+            self.c.setopt(pycurl.WRITEFUNCTION, self.write_body)
+            if not follow_location:
+                self.c.setopt(pycurl.FOLLOWLOCATION, 1)
+            self.c.setopt(pycurl.POSTFIELDS, b"")
+
+        self.last_effective_url = self.c.getinfo(pycurl.EFFECTIVE_URL)
+
+        if save_cookies:
+            self.add_cookies()
+
+        #: checked here too, an error without body never sets bad_status
+        self.code = int(self.c.getinfo(pycurl.RESPONSE_CODE))
+        if self.code in BAD_STATUS_CODES:
+            response = b"".join(pieces)
+            header = self.response_header
+            if decode:
+                response = self.decode_response(response)
+                header = to_str(header, encoding="iso-8859-1")
+            raise BadHeader(self.code, header, response)
+
     def verify_header(self):
         """
         raise an exceptions on bad headers.
@@ -380,9 +491,9 @@ class HTTPRequest:
         else:
             return self.rep.getvalue()
 
-    def decode_response(self, response):
+    def get_encoding(self):
         """
-        decode with correct encoding, relies on header.
+        returns the charset of the response, relies on header.
         """
         header = self.response_header.splitlines()
         encoding = "utf-8"  #: default encoding
@@ -398,6 +509,28 @@ class HTTPRequest:
                 if charset:
                     encoding = to_str(charset[0])
 
+        return encoding
+
+    def get_decoder(self):
+        """
+        returns an incremental decoder for the response, None if there is no codec.
+        """
+        encoding = self.get_encoding()
+        try:
+            if codecs.lookup(encoding).name == "utf-8":
+                encoding = "utf-8-sig"  #: strips a leading bom only
+
+            return codecs.getincrementaldecoder(encoding)("replace")
+
+        except LookupError:
+            self.log.debug(f"No Decoder found for {encoding}")
+
+    def decode_response(self, response):
+        """
+        decode with correct encoding, relies on header.
+        """
+        encoding = self.get_encoding()
+
         try:
             # self.log.debug(f"Decoded {encoding}")
             if codecs.lookup(encoding).name == "utf-8" and response.startswith(
@@ -461,5 +594,8 @@ class HTTPRequest:
             del self.cj
 
         if hasattr(self, "c"):
-            self.c.close()
+            if self.pool:
+                self.pool.put_handle(self.c, self.options)
+            else:
+                self.c.close()
             del self.c
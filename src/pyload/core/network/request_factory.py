@@ -1,11 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import weakref
 from threading import Lock
 
 from ..utils.struct.lock import lock
 from .browser import Browser
 from .bucket import Bucket
 from .cookie_jar import CookieJar
+from .curl_pool import CurlPool
+from .download_reactor import DownloadReactor
 from .http.http_request import HTTPRequest
 from .xdcc.request import XDCCRequest
 
@@ -18,7 +21,12 @@ class RequestFactory:
         self.pyload = core
         self._ = core._
         self.bucket = Bucket()
+        #: (plugin, account, package) prefixes -> buckets below the global one
+        self.buckets = weakref.WeakValueDictionary()
+        self.speed_rules = {}  #: plugin, plugin@account or #package -> (rate, weight)
         self.update_bucket()
+        self.reactor = DownloadReactor()
+        self.pool = CurlPool()
         self.cookiejars = {}
 
         # TODO: Rewrite...
@@ -38,7 +46,12 @@ class RequestFactory:
             req = XDCCRequest(self.bucket, options)
 
         else:
-            req = Browser(self.bucket, options)
+            reactor = (
+                self.reactor
+                if self.pyload.config.get("download", "shared_reactor")
+                else None
+            )
+            req = Browser(self.bucket, options, reactor, self.pool)
 
             if account:
                 cj = self.get_cookie_jar(plugin_name, account)
@@ -49,19 +62,42 @@ class RequestFactory:
 
         return req
 
+    @lock
+    def get_bucket(self, plugin_name, account=None, package=None):
+        """
+        returns a new bucket for one download, below the buckets of its plugin, account
+        and package.
+        """
+        keys = [plugin_name]
+        if account:
+            keys.append(f"{plugin_name}@{account}")
+        if package is not None:
+            keys.append(f"#{package}")
+
+        parent = self.bucket
+        for i, key in enumerate(keys):
+            path = tuple(keys[: i + 1])
+            bucket = self.buckets.get(path)
+            if bucket is None:
+                rate, weight = self.speed_rules.get(key, (0, 1))
+                bucket = self.buckets[path] = Bucket(parent, rate, weight)
+            parent = bucket
+
+        return Bucket(parent)
+
     def get_http_request(self, **kwargs):
         """
         returns a http request, dont forget to close it !
         """
         options = self.get_options()
         options.update(kwargs)  #: submit kwargs as additional options
-        return HTTPRequest(CookieJar(None), options)
+        return HTTPRequest(CookieJar(None), options, pool=self.pool)
 
     def get_url(self, *args, **kwargs):
         """
         see HTTPRequest for argument list.
         """
-        with HTTPRequest(None, self.get_options()) as h:
+        with HTTPRequest(None, self.get_options(), pool=self.pool) as h:
             rep = h.load(*args, **kwargs)
         return rep
 
@@ -109,6 +145,7 @@ class RequestFactory:
             "proxies": self.get_proxies(),
             "ipv6": self.pyload.config.get("download", "ipv6"),
             "ssl_verify": self.pyload.config.get("general", "ssl_verify"),
+            "preallocate": self.pyload.config.get("download", "preallocate"),
         }
 
     def update_bucket(self):
@@ -120,6 +157,32 @@ class RequestFactory:
         else:
             self.bucket.set_rate(self.pyload.config.get("download", "max_speed") << 10)
 
+        limits = self._parse_speed_rules("speed_limits")
+        weights = self._parse_speed_rules("speed_weights")
+        self.speed_rules = {
+            key: (limits.get(key, 0) << 10, weights.get(key, 1) or 1)
+            for key in set(limits) | set(weights)
+        }
+        for path, bucket in list(self.buckets.items()):
+            bucket.rate, bucket.weight = self.speed_rules.get(path[-1], (0, 1))
+
+    def _parse_speed_rules(self, option):
+        """
+        returns the values of a "name = number, ..." download option.
+        """
+        rules = {}
+        for rule in self.pyload.config.get("download", option).split(","):
+            if not rule.strip():
+                continue
+            try:
+                key, value = rule.split("=")
+                rules[key.strip()] = max(0, int(value))
+            except ValueError:
+                self.pyload.log.warning(
+                    self._("Invalid {} entry: {}").format(option, rule.strip())
+                )
+        return rules
+
 
 def get_url(*args, **kwargs):
     return DEFAULT_REQUEST.get_url(*args, **kwargs)
@@ -1,12 +1,10 @@
 # -*- coding: utf-8 -*-
 
 import time
-from heapq import heappop, heappush
-from threading import Lock
-
-from _thread import start_new_thread
-
-from .utils.struct.lock import lock
+from concurrent.futures import ThreadPoolExecutor
+from heapq import heapify, heappop, heappush
+from itertools import count
+from threading import Condition, Thread
 
 
 class AlreadyCalled(Exception):
@@ -28,20 +26,44 @@ class Deferred:
         for f, cargs, ckwargs in self.call:
             args += tuple(cargs)
             kwargs.update(ckwargs)
-            f(*args ** kwargs)
+            f(*args, **kwargs)
 
 
 class Scheduler:
+    """
+    runs jobs at their time on a timer thread, threaded jobs on a pool of workers.
+
+    Jobs are kept in a heap ordered by time. Removing a job only marks it, marked jobs
+    are skipped and dropped from the heap once they make up half of it.
+    """
+
+    WORKERS = 8  #: threads for threaded jobs, further jobs wait for a free one
+
     def __init__(self, core):
         self.pyload = core
         self._ = core._
-        self.queue = PriorityQueue()
+        self.condition = Condition()
+        self.queue = []  #: heap of (time, sequence number, job)
+        self.jobs = {}  #: deferred -> job waiting to run
+        self.cancelled = 0  #: removed jobs still in the heap
+        self.counter = count()
+        self.thread = None
+        self.executor = ThreadPoolExecutor(self.WORKERS, thread_name_prefix="Scheduler")
+
+        self.executed = 0
+        self.active = 0  #: threaded jobs waiting for or running on a worker
+        self.lag = 0.0  #: seconds the last job started late
+        self.max_lag = 0.0
 
     def add_job(self, t, call, args=[], kwargs={}, threaded=True):
         d = Deferred()
         t += time.time()
         j = Job(t, call, args, kwargs, d, threaded)
-        self.queue.put((t, j))
+        with self.condition:
+            heappush(self.queue, (t, next(self.counter), j))
+            self.jobs[d] = j
+            if self.queue[0][2] is j:
+                self.condition.notify()
         return d
 
     def remove_job(self, d):
@@ -49,29 +71,106 @@ class Scheduler:
         :param d: deferred object
         :return: if job was deleted
         """
-        index = -1
-
-        for i, j in enumerate(self.queue):
-            if j[1].deferred == d:
-                index = i
-
-        if index >= 0:
-            del self.queue[index]
+        with self.condition:
+            j = self.jobs.pop(d, None)
+            if j is None:
+                return False
+
+            j.cancelled = True
+            self.cancelled += 1
+            if self.cancelled > len(self.queue) // 2:
+                self.queue = [x for x in self.queue if not x[2].cancelled]
+                heapify(self.queue)
+                self.cancelled = 0
             return True
 
-        return False
+    def start(self):
+        """
+        starts the timer thread.
+        """
+        self.thread = Thread(target=self._loop, name="Scheduler", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.thread = None
+            self.condition.notify()
+        self.executor.shutdown(wait=False)
 
     def run(self):
+        """
+        starts the jobs which are due.
+        """
+        with self.condition:
+            jobs = self._pop_jobs(time.time())
+        for j in jobs:
+            self._start_job(j)
+
+    def stats(self):
+        with self.condition:
+            return {
+                "jobs": len(self.jobs),
+                "active": self.active,
+                "workers": self.WORKERS,
+                "executed": self.executed,
+                "lag": self.lag,
+                "max_lag": self.max_lag,
+            }
+
+    def _loop(self):
+        thread = self.thread
         while True:
-            t, j = self.queue.get()
-            if not j:
-                break
-            else:
-                if t <= time.time():
-                    j.start()
+            with self.condition:
+                while self.thread is thread:
+                    timeout = self.queue[0][0] - time.time() if self.queue else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self.condition.wait(timeout)
                 else:
-                    self.queue.put((t, j))
-                    break
+                    return
+                jobs = self._pop_jobs(time.time())
+
+            for j in jobs:
+                self._start_job(j)
+
+    def _pop_jobs(self, now):
+        jobs = []
+        while self.queue and self.queue[0][0] <= now:
+            j = heappop(self.queue)[2]
+            if j.cancelled:
+                self.cancelled -= 1
+            else:
+                del self.jobs[j.deferred]
+                jobs.append(j)
+        return jobs
+
+    def _start_job(self, j):
+        lag = max(time.time() - j.time, 0)
+        with self.condition:
+            self.executed += 1
+            self.lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if j.threaded:
+                self.active += 1
+
+        if j.threaded:
+            self.executor.submit(self._run_job, j)
+        else:
+            self._run_job(j)
+
+    def _run_job(self, j):
+        try:
+            j.run()
+        except Exception as exc:
+            self.pyload.log.error(
+                self._("Scheduled job {} failed: {}").format(j.call, exc),
+                exc_info=self.pyload.debug > 1,
+                stack_info=self.pyload.debug > 2,
+            )
+        finally:
+            if j.threaded:
+                with self.condition:
+                    self.active -= 1
 
 
 class Job:
@@ -82,9 +181,7 @@ class Job:
         self.kwargs = kwargs
         self.deferred = deferred
         self.threaded = threaded
-
-    def __lt__(self, other):
-        return id(self) < id(other)
+        self.cancelled = False
 
     def run(self):
         ret = self.call(*self.args, **self.kwargs)
@@ -93,39 +190,3 @@ class Job:
         else:
             self.deferred.callback(ret)
 
-    def start(self):
-        if self.threaded:
-            start_new_thread(self.run, ())
-        else:
-            self.run()
-
-
-class PriorityQueue:
-    """
-    a non blocking priority queue.
-    """
-
-    def __init__(self):
-        self.queue = []
-        self.lock = Lock()
-
-    def __iter__(self):
-        return iter(self.queue)
-
-    def __delitem__(self, key):
-        del self.queue[key]
-
-    @lock
-    def put(self, element):
-        heappush(self.queue, element)
-
-    @lock
-    def get(self):
-        """
-        return element or None.
-        """
-        try:
-            el = heappop(self.queue)
-            return el
-        except IndexError:
-            return None, None
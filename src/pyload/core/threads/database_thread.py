@@ -6,15 +6,16 @@ import shutil
 import sqlite3
 
 from contextlib import closing
-from queue import Queue
-from threading import Event, Thread
+from pathlib import Path
+from queue import Empty, LifoQueue, Queue
+from threading import Event, Lock, Thread
 
 from ... import exc_logger
 from ..database import FileDatabaseMethods, StorageDatabaseMethods, UserDatabaseMethods
 from ..utils.struct.style import style
 
 # DATABASE VERSION
-__version__ = 4
+__version__ = 5
 
 # TODO: rewrite using peewee
 class DatabaseJob:
@@ -48,19 +49,56 @@ class DatabaseJob:
         return f"DataBase Job {self.f.__name__}:{self.args[1:]}\n{output} Result: {self.result}"
 
     def process_job(self):
+        try:
+            self.run_job()
+        finally:
+            self.done.set()
+
+    def run_job(self):
+        """
+        executes the job without signaling it as done.
+        """
         try:
             self.result = self.f(*self.args, **self.kwargs)
         except Exception as exc:
             msg = f"Database Error @ {self.f.__name__} {self.args[1:]} {self.kwargs}"
             exc_logger.exception(msg)
             self.exception = exc
-        finally:
-            self.done.set()
+
+    @property
+    def coalesce_key(self):
+        """
+        jobs with the same key only need to run once, e.g. updates of the same link.
+        """
+        if getattr(self.f, "coalesce", False):
+            return self.f, self.args[1].id
 
     def wait(self):
         self.done.wait()
 
 
+class DatabaseReader:
+    """
+    read only connection, runs read jobs in the calling thread.
+
+    Acts like the DatabaseThread for the job, but with its own cursor.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        #: as uri, with characters like ? and # in the path escaped
+        uri = Path(db.db_path).resolve().as_uri() + "?mode=ro"
+        self.conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        self.c = self.conn.cursor()
+
+    def __getattr__(self, attr):
+        return getattr(self.db, attr)
+
+    def close(self):
+        self.c.close()
+        self.conn.close()
+
+
 class DatabaseThread(Thread):
 
     subs = []
@@ -68,6 +106,9 @@ class DatabaseThread(Thread):
     DB_FILENAME = "pyload.db"
     VERSION_FILENAME = "db.version"
 
+    MAX_BATCH_SIZE = 500  #: jobs run in one transaction
+    MAX_READERS = 4  #: read only connections for concurrent reads
+
     def __init__(self, core):
         super().__init__()
         self.daemon = True
@@ -82,6 +123,11 @@ class DatabaseThread(Thread):
 
         self.jobs = Queue()
 
+        self.readers = LifoQueue()  #: idle read only connections
+        self.reader_count = 0
+        self.reader_lock = Lock()
+        self.closed = False  #: shut down, no more reads
+
         self.setuplock = Event()
 
         style.set_db(self)
@@ -99,6 +145,10 @@ class DatabaseThread(Thread):
         self.conn = sqlite3.connect(self.db_path, isolation_level=None)
         os.chmod(self.db_path, 0o600)
 
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        synchronous = self.pyload.config.get("general", "db_synchronous")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+
         self.c = self.conn.cursor()  #: compatibility
 
         if convert is not None:
@@ -111,18 +161,123 @@ class DatabaseThread(Thread):
         self.setuplock.set()
 
         while True:
-            j = self.jobs.get()
-            if j == "quit":
+            jobs = self._get_batch()
+            quit = jobs[-1] == "quit"
+            if quit:
+                jobs.pop()
+
+            self._process_batch(jobs)
+
+            if quit:
                 self.c.close()
                 self.conn.close()
                 break
-            j.process_job()
+
+    def _get_batch(self):
+        """
+        waits for a job and returns it together with all queued ones.
+        """
+        jobs = [self.jobs.get()]
+        while jobs[-1] != "quit" and len(jobs) < self.MAX_BATCH_SIZE:
+            try:
+                jobs.append(self.jobs.get_nowait())
+            except Empty:
+                break
+        return jobs
+
+    def _process_batch(self, jobs):
+        """
+        runs the jobs in one transaction, waiting callers are released after the commit.
+
+        Of consecutive jobs with the same coalesce key only the last one is run. Each job
+        runs in a savepoint, so a failing job is undone without the others. If the
+        transaction fails, the jobs not committed yet are run again one transaction each.
+        """
+        skipped = set()
+        pending = set()  #: keys seen in the current run of coalescable jobs
+        for j in reversed(jobs):
+            key = j.coalesce_key
+            if key is None:
+                pending.clear()
+            elif key in pending:
+                skipped.add(j)
+            else:
+                pending.add(key)
+
+        jobs_to_run = [j for j in jobs if j not in skipped]
+        committed = 0  #: jobs committed by a job calling commit itself
+        try:
+            self.conn.execute("BEGIN")
+            for i, j in enumerate(jobs_to_run):
+                if not self._run_savepoint(j):
+                    committed = i + 1
+            if self.conn.in_transaction:
+                self.conn.commit()
+
+        except Exception:
+            exc_logger.exception("Database Error @ committing jobs, running them singly")
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            for j in jobs_to_run[committed:]:
+                self._run_single(j)
+
+        finally:
+            for j in jobs:
+                j.done.set()
+
+    def _run_savepoint(self, job):
+        """
+        runs the job in a savepoint of the current transaction, returns False if the
+        job committed the transaction.
+        """
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")  #: the previous job committed
+        self.conn.execute("SAVEPOINT job")
+        job.run_job()
+
+        if not self.conn.in_transaction:
+            if job.exception:  #: rolled back by sqlite, with the jobs before
+                raise job.exception
+            return False
+
+        if job.exception:
+            self.conn.execute("ROLLBACK TO job")
+        self.conn.execute("RELEASE job")
+        return True
+
+    def _run_single(self, job):
+        """
+        runs the job in its own transaction.
+        """
+        job.result = None
+        job.exception = False
+        try:
+            self.conn.execute("BEGIN")
+            job.run_job()
+            if self.conn.in_transaction:
+                if job.exception:
+                    self.conn.rollback()
+                else:
+                    self.conn.commit()
+
+        except Exception as exc:
+            exc_logger.exception(f"Database Error @ {job.f.__name__}")
+            job.result = None
+            job.exception = exc
+            if self.conn.in_transaction:
+                self.conn.rollback()
 
     @style.queue
     def shutdown(self):
         self.conn.commit()
         self.jobs.put("quit")
 
+        with self.reader_lock:
+            self.closed = True
+            while not self.readers.empty():
+                self.readers.get().close()
+            self.readers.put(None)  #: wakes up the readers waiting for a connection
+
     def _check_version(self):
         """
         check db version and delete it if needed.
@@ -166,6 +321,18 @@ class DatabaseThread(Thread):
             'CREATE TABLE IF NOT EXISTS "users" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "name" TEXT NOT NULL, "email" TEXT DEFAULT "" NOT NULL, "password" TEXT NOT NULL, "role" INTEGER DEFAULT 0 NOT NULL, "permission" INTEGER DEFAULT 0 NOT NULL, "template" TEXT DEFAULT "default" NOT NULL)'
         )
         self.pyload.log.info(self._("Database was converted from v3 to v4."))
+        self._convertV4()
+
+    def _convertV4(self):
+        self.c.execute('DROP VIEW IF EXISTS "pstats"')
+        self._create_package_stats()
+        self.c.execute(
+            'INSERT OR REPLACE INTO "pstats" (id, sizetotal, linkstotal, sizedone, linksdone) \
+            SELECT package, SUM(size), COUNT(id), \
+            SUM(CASE WHEN status IN (0,4,13) THEN size ELSE 0 END), SUM(status IN (0,4,13)) \
+            FROM links GROUP BY package'
+        )
+        self.pyload.log.info(self._("Database was converted from v4 to v5."))
 
     # --convert scripts end
 
@@ -186,15 +353,14 @@ class DatabaseThread(Thread):
         self.c.execute(
             'CREATE TABLE IF NOT EXISTS "users" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "name" TEXT NOT NULL, "email" TEXT DEFAULT "" NOT NULL, "password" TEXT NOT NULL, "role" INTEGER DEFAULT 0 NOT NULL, "permission" INTEGER DEFAULT 0 NOT NULL, "template" TEXT DEFAULT "default" NOT NULL)'
         )
+        self.c.execute(
+            'CREATE TABLE IF NOT EXISTS "tokens" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "user" INTEGER NOT NULL, "token" TEXT NOT NULL UNIQUE, FOREIGN KEY(user) REFERENCES users(id))'
+        )
 
         self.c.execute(
-            'CREATE VIEW IF NOT EXISTS "pstats" AS \
-        SELECT p.id AS id, SUM(l.size) AS sizetotal, COUNT(l.id) AS linkstotal, linksdone, sizedone\
-        FROM packages p JOIN links l ON p.id = l.package LEFT OUTER JOIN\
-        (SELECT p.id AS id, COUNT(*) AS linksdone, SUM(l.size) AS sizedone \
-        FROM packages p JOIN links l ON p.id = l.package AND l.status in (0,4,13) GROUP BY p.id) s ON s.id = p.id \
-        GROUP BY p.id'
+            'CREATE INDEX IF NOT EXISTS "p_status_size_index" ON links(package, status, size)'
         )
+        self._create_package_stats()
 
         # try to lower ids
         self.c.execute("SELECT max(id) FROM LINKS")
@@ -220,6 +386,36 @@ class DatabaseThread(Thread):
 
         self.c.execute("VACUUM")
 
+    def _create_package_stats(self):
+        """
+        create the pstats table, kept up to date by triggers on the links table.
+        """
+        self.c.execute(
+            'CREATE TABLE IF NOT EXISTS "pstats" ("id" INTEGER PRIMARY KEY, "sizetotal" INTEGER DEFAULT 0 NOT NULL, "linkstotal" INTEGER DEFAULT 0 NOT NULL, "sizedone" INTEGER DEFAULT 0 NOT NULL, "linksdone" INTEGER DEFAULT 0 NOT NULL)'
+        )
+
+        # links with status finished, skipped or processing count as done
+        add = 'INSERT OR IGNORE INTO pstats (id) VALUES (NEW.package); \
+            UPDATE pstats SET sizetotal=sizetotal+NEW.size, linkstotal=linkstotal+1, \
+            sizedone=sizedone+(CASE WHEN NEW.status IN (0,4,13) THEN NEW.size ELSE 0 END), \
+            linksdone=linksdone+(NEW.status IN (0,4,13)) WHERE id=NEW.package;'
+        remove = 'UPDATE pstats SET sizetotal=sizetotal-OLD.size, linkstotal=linkstotal-1, \
+            sizedone=sizedone-(CASE WHEN OLD.status IN (0,4,13) THEN OLD.size ELSE 0 END), \
+            linksdone=linksdone-(OLD.status IN (0,4,13)) WHERE id=OLD.package;'
+
+        self.c.execute(
+            f'CREATE TRIGGER IF NOT EXISTS "pstats_insert" AFTER INSERT ON links BEGIN {add} END'
+        )
+        self.c.execute(
+            f'CREATE TRIGGER IF NOT EXISTS "pstats_delete" AFTER DELETE ON links BEGIN {remove} END'
+        )
+        self.c.execute(
+            f'CREATE TRIGGER IF NOT EXISTS "pstats_update" AFTER UPDATE OF size, status, package ON links BEGIN {remove} {add} END'
+        )
+        self.c.execute(
+            'CREATE TRIGGER IF NOT EXISTS "pstats_package_delete" AFTER DELETE ON packages BEGIN DELETE FROM pstats WHERE id=OLD.id; END'
+        )
+
     def create_cursor(self):
         return self.conn.cursor()
 
@@ -247,6 +443,45 @@ class DatabaseThread(Thread):
         job.wait()
         return job.result
 
+    def read(self, f, *args, **kwargs):
+        """
+        runs a read only job right away on a pooled connection, instead of queueing it.
+
+        Only sees committed data, so it never waits for the pending writes.
+        """
+        if not self.setuplock.is_set():
+            return self.queue(f, *args, **kwargs)
+
+        reader = self._get_reader()
+        try:
+            return f(reader, *args, **kwargs)
+        except Exception:
+            exc_logger.exception(f"Database Error @ {f.__name__} {args} {kwargs}")
+            raise
+        finally:
+            self._put_reader(reader)
+
+    def _get_reader(self):
+        with self.reader_lock:
+            if self.closed:
+                raise RuntimeError("Database was shut down")
+            if self.readers.empty() and self.reader_count < self.MAX_READERS:
+                self.reader_count += 1
+                return DatabaseReader(self)
+
+        reader = self.readers.get()
+        if reader is None:
+            self.readers.put(None)  #: for the next waiting reader
+            raise RuntimeError("Database was shut down")
+        return reader
+
+    def _put_reader(self, reader):
+        with self.reader_lock:
+            if self.closed:
+                reader.close()
+            else:
+                self.readers.put(reader)
+
     @classmethod
     def register_sub(cls, klass):
         cls.subs.append(klass)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import queue
+from collections import Counter, OrderedDict, deque
+from threading import Condition, Thread
+
+
+class InfoPool:
+    """
+    checks the online status of links on a bounded number of worker threads.
+
+    Links are checked in batches through the get_info function of their plugin. Every
+    plugin has its own queue, shared by all requests, and at most HOST_WORKERS of
+    its batches run at once, so hosts are not flooded and a large paste of one host
+    does not hold back the links of others. Workers quit after IDLE_TIME seconds
+    without work.
+    """
+
+    WORKERS = 16
+    HOST_WORKERS = 4  #: batches of one plugin checked at once
+    BATCH_SIZE = 10
+    IDLE_TIME = 60
+
+    def __init__(self):
+        self.condition = Condition()
+        self.queues = OrderedDict()  #: plugin name -> deque of (plugin, urls, results)
+        self.running = Counter()  #: plugin name -> batches in work
+        self.workers = 0
+        self.idle = 0
+
+    def check(self, pluginname, plugin, urls):
+        """
+        queues urls for plugin.get_info, returns an iterator of (urls, results,
+        exception) for every batch as soon as it is done.
+        """
+        results = queue.Queue()
+        batches = [
+            urls[i : i + self.BATCH_SIZE] for i in range(0, len(urls), self.BATCH_SIZE)
+        ]
+
+        with self.condition:
+            jobs = self.queues.setdefault(pluginname, deque())
+            jobs.extend((plugin, batch, results) for batch in batches)
+            self._start_workers()
+            self.condition.notify_all()
+
+        return (results.get() for _ in batches)
+
+    def _start_workers(self):
+        queued = sum(len(jobs) for jobs in self.queues.values())
+        while self.idle < queued and self.workers < self.WORKERS:
+            self.workers += 1
+            self.idle += 1
+            Thread(target=self._run, daemon=True).start()
+
+    def _next_job(self):
+        """
+        takes the next batch of the first plugin below its limit and moves the plugin
+        to the end, so plugins take turns.
+        """
+        for name, jobs in self.queues.items():
+            if jobs and self.running[name] < self.HOST_WORKERS:
+                self.queues.move_to_end(name)
+                self.running[name] += 1
+                return name, jobs.popleft()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                job = self._next_job()
+                while job is None:
+                    timeout = not self.condition.wait(self.IDLE_TIME)
+                    job = self._next_job()
+                    if job is None and timeout:
+                        self.workers -= 1
+                        self.idle -= 1
+                        return
+                self.idle -= 1
+
+            name, (plugin, urls, results) = job
+            try:
+                result = []
+                for res in plugin.get_info(urls):
+                    #: [ .. (name, size, status, url) .. ]
+                    result.extend(res if isinstance(res, list) else [res])
+                results.put((urls, result, None))
+
+            except Exception as exc:
+                results.put((urls, [], exc))
+
+            finally:
+                with self.condition:
+                    self.idle += 1
+                    self.running[name] -= 1
+                    if not self.running[name]:
+                        del self.running[name]
+                        if not self.queues[name]:
+                            del self.queues[name]
+                    self.condition.notify_all()
@@ -24,6 +24,7 @@ class InfoThread(PluginThread):
         self.add = add  #: add packages instead of return result
 
         self.cache = []  #: accumulated data
+        self.fetching = {}  #: plugin name -> (cached results, pending batches)
 
         self.start()
 
@@ -49,6 +50,7 @@ class InfoThread(PluginThread):
 
         # directly write to database
         if self.pid > -1:
+            self.start_fetching(plugins)
             for pluginname, urls in plugins.items():
                 plugin = self.pyload.plugin_manager.get_plugin(pluginname, True)
                 if hasattr(plugin, "get_info"):
@@ -56,6 +58,7 @@ class InfoThread(PluginThread):
                     self.pyload.files.save()
 
         elif self.add:
+            self.start_fetching(plugins)
             for pluginname, urls in plugins.items():
                 plugin = self.pyload.plugin_manager.get_plugin(pluginname, True)
                 if hasattr(plugin, "get_info"):
@@ -101,6 +104,7 @@ class InfoThread(PluginThread):
 
             self.m.info_results[self.rid] = {}
 
+            self.start_fetching(plugins)
             for pluginname, urls in plugins.items():
                 plugin = self.pyload.plugin_manager.get_plugin(pluginname, True)
                 if hasattr(plugin, "get_info"):
@@ -152,15 +156,37 @@ class InfoThread(PluginThread):
     def update_cache(self, plugin, result):
         self.cache.extend(result)
 
+    def start_fetching(self, plugins):
+        """
+        queues the urls of all plugins at once, so the hosts are checked in parallel.
+        """
+        for pluginname, urls in plugins.items():
+            plugin = self.pyload.plugin_manager.get_plugin(pluginname, True)
+            if hasattr(plugin, "get_info"):
+                self.fetching[pluginname] = self._start_fetch(pluginname, plugin, urls)
+
+    def _start_fetch(self, pluginname, plugin, urls):
+        result = []  #: result loaded from cache
+        process = []  #: urls to process
+        for url in urls:
+            res = self.m.info_cache.get(url)
+            if res is None:
+                process.append(url)
+            else:
+                result.append(res)
+
+        if not process:
+            return result, ()
+
+        self.pyload.log.debug(f"Run Info Fetching for {pluginname}")
+        return result, self.m.info_pool.check(pluginname, plugin, process)
+
     def fetch_for_plugin(self, pluginname, plugin, urls, cb, err=None):
         try:
-            result = []  #: result loaded from cache
-            process = []  #: urls to process
-            for url in urls:
-                if url in self.m.info_cache:
-                    result.append(self.m.info_cache[url])
-                else:
-                    process.append(url)
+            fetch = self.fetching.pop(pluginname, None)
+            if fetch is None:
+                fetch = self._start_fetch(pluginname, plugin, urls)
+            result, batches = fetch
 
             if result:
                 self.pyload.log.debug(
@@ -168,17 +194,25 @@ class InfoThread(PluginThread):
                 )
                 cb(pluginname, result)
 
-            if process:
-                self.pyload.log.debug(f"Run Info Fetching for {pluginname}")
-                for result in plugin.get_info(process):
-                    # result = [ .. (name, size, status, url) .. ]
-                    if not isinstance(result, list):
-                        result = [result]
+            for urls, result, exc in batches:
+                if exc is not None:
+                    self.pyload.log.warning(
+                        self._("Info Fetching for {name} failed | {err}").format(
+                            name=pluginname, err=exc
+                        ),
+                        exc_info=self.pyload.debug > 1,
+                        stack_info=self.pyload.debug > 2,
+                    )
+                    # generate default results
+                    if err:
+                        cb(pluginname, [(url, 0, 3, url) for url in urls])
+                    continue
 
-                    for res in result:
-                        self.m.info_cache[res[3]] = res
+                # result = [ .. (name, size, status, url) .. ]
+                for res in result:
+                    self.m.info_cache.set(res[3], res)
 
-                    cb(pluginname, result)
+                cb(pluginname, result)
 
             self.pyload.log.debug(f"Finished Info Fetching for {pluginname}")
         except Exception as exc:
@@ -190,11 +224,6 @@ class InfoThread(PluginThread):
                 stack_info=self.pyload.debug > 2,
             )
 
-            # generate default results
-            if err:
-                result = [(url, 0, 3, url) for url in urls]
-                cb(pluginname, result)
-
     def decrypt_container(self, plugin, url):
         data = []
         # only works on container plugins
@@ -3,10 +3,6 @@
 import random
 import string
 
-import js2py
-
-js2py.disable_pyimport()
-
 
 def random_string(length):
     seq = string.ascii_letters + string.digits + string.punctuation
@@ -23,6 +19,9 @@ def is_plural(value):
 
 def eval_js(script, es6=False):
     # return requests_html.HTML().render(script=script, reload=False)
+    import js2py  #: slow to import, only a few plugins need it
+
+    js2py.disable_pyimport()
     return (js2py.eval_js6 if es6 else js2py.eval_js)(script)
 
 
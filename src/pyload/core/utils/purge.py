@@ -40,8 +40,7 @@ _WINBADWORDS = (
 
 def name(text, sep="_", allow_whitespaces=True):
     """Remove invalid characters."""
-    bc = uniquify(_WINBADCHARS + _MACBADCHARS + _UNIXBADCHARS)
-    repl = r"".join(bc)
+    repl = _NAMEBADCHARS
     if not allow_whitespaces:
         repl += " "
     res = chars(text, repl, sep).strip()
@@ -74,3 +73,6 @@ def uniquify(seq):
     seen = set()
     seen_add = seen.add
     return type(seq)(x for x in seq if x not in seen and not seen_add(x))
+
+
+_NAMEBADCHARS = r"".join(uniquify(_WINBADCHARS + _MACBADCHARS + _UNIXBADCHARS))
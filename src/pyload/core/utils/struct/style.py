@@ -31,3 +31,19 @@ class style:
             return cls.db.async_(fn, *args, **kwargs)
 
         return x
+
+    @classmethod
+    def read(cls, fn):
+        @staticmethod
+        def x(*args, **kwargs):
+            return cls.db.read(fn, *args, **kwargs)
+
+        return x
+
+    @classmethod
+    def coalesce(cls, fn):
+        """
+        queued calls for the same object may be merged into the last one.
+        """
+        fn.coalesce = True
+        return fn
@@ -7,6 +7,7 @@ import time
 import zlib
 from threading import Event
 
+from pyload.core.datatypes.ttl_cache import TTLCache
 from pyload.core.utils import format
 
 from ..base.addon import BaseAddon, threaded
@@ -44,7 +45,7 @@ def compute_checksum(local_file, algorithm, progress_notify=None, abort=None):
             last = 0
 
             with open(local_file, mode="rb") as fp:
-                for chunk in iter(lambda: fp.read(8192), ""):
+                for chunk in iter(lambda: fp.read(8192), b""):
                     if abort and abort():
                         return False
 
@@ -55,7 +56,7 @@ def compute_checksum(local_file, algorithm, progress_notify=None, abort=None):
                         progress_notify(processed * 100 // file_size)
 
             #: zlib sometimes return negative value
-            return "{:x}".format((2 ** 32 + last) & 0xFFFFFFFF)
+            return "{:08x}".format((2 ** 32 + last) & 0xFFFFFFFF)
 
         else:
             return None
@@ -68,7 +69,7 @@ def compute_checksum(local_file, algorithm, progress_notify=None, abort=None):
 class Checksum(BaseAddon):
     __name__ = "Checksum"
     __type__ = "addon"
-    __version__ = "0.36"
+    __version__ = "0.37"
     __status__ = "testing"
 
     __config__ = [
@@ -83,6 +84,12 @@ class Checksum(BaseAddon):
         ("max_tries", "int", "Number of retries", 2),
         ("retry_action", "fail;nothing", "What to do if all retries fail?", "fail"),
         ("wait_time", "int", "Time to wait before each retry (seconds)", 1),
+        (
+            "inline_checksum",
+            "bool",
+            "Compute checksums while downloading instead of reading the file again",
+            True,
+        ),
     ]
 
     __description__ = """Verify downloaded file size and checksum"""
@@ -125,32 +132,77 @@ class Checksum(BaseAddon):
 
         self.retries = {}
 
-    def download_finished(self, pyfile):
-        """
-        Compute checksum for the downloaded file and compare it with the hash provided
-        by the downloader.
+        #: file id -> (size, mtime, checksums) computed while downloading, kept
+        #: for the hash files of the package
+        self.checksums = TTLCache(10000, 24 * 60 * 60)
 
-        pyfile.plugin.check_data should be a dictionary which can
-        contain: a) if known, the exact filesize in bytes (e.g. 'size':
-        123456789) b) hexadecimal hash string with algorithm name as key
-        (e.g. 'md5': "d76505d0869f9f928a17d42d66326307")
-        """
+    def get_check_data(self, pyfile):
         if hasattr(pyfile.plugin, "check_data") and isinstance(
             pyfile.plugin.check_data, dict
         ):
-            data = pyfile.plugin.check_data.copy()
+            return pyfile.plugin.check_data.copy()
 
         elif hasattr(pyfile.plugin, "api_data") and isinstance(
             pyfile.plugin.api_data, dict
         ):
-            data = pyfile.plugin.api_data.copy()
+            return pyfile.plugin.api_data.copy()
 
         elif hasattr(pyfile.plugin, "info") and isinstance(pyfile.plugin.info, dict):
             data = pyfile.plugin.info.copy()
             # NOTE: Don't check file size until a similarity matcher will be implemented
             data.pop("size", None)
+            return data
 
-        else:
+    def download_start(self, pyfile, url, filename):
+        """
+        Let the downloader hash the file while writing it, crc32 is always computed
+        for the hash files of the package.
+        """
+        if (
+            not self.is_activated()
+            or not self.config.get("check_checksum")
+            or not self.config.get("inline_checksum")
+            or not hasattr(pyfile.plugin, "checksum_algorithms")
+        ):
+            return
+
+        algorithms = {"crc32"}
+        data = self.get_check_data(pyfile) or {}
+        for key in self.algorithms:
+            if data.get(key) or key in data.get("hash", {}):
+                algorithms.add(key.replace("-", "").lower())
+        pyfile.plugin.checksum_algorithms.update(algorithms)
+
+    def get_checksum(self, fid, local_file, algorithm, **kwargs):
+        """
+        checksum computed while downloading, if the file did not change since, else
+        computed from the file.
+        """
+        entry = self.checksums.get(fid)
+        if entry is not None and algorithm in entry[2]:
+            st = os.stat(local_file)
+            if (st.st_size, st.st_mtime_ns) == entry[:2]:
+                return entry[2][algorithm]
+
+        return compute_checksum(local_file, algorithm, **kwargs)
+
+    def download_finished(self, pyfile):
+        """
+        Compute checksum for the downloaded file and compare it with the hash provided
+        by the downloader.
+
+        pyfile.plugin.check_data should be a dictionary which can
+        contain: a) if known, the exact filesize in bytes (e.g. 'size':
+        123456789) b) hexadecimal hash string with algorithm name as key
+        (e.g. 'md5': "d76505d0869f9f928a17d42d66326307")
+        """
+        checksums = getattr(pyfile.plugin, "last_checksums", None)
+        if checksums and pyfile.plugin.last_download:
+            st = os.stat(pyfile.plugin.last_download)
+            self.checksums.set(pyfile.id, (st.st_size, st.st_mtime_ns, checksums))
+
+        data = self.get_check_data(pyfile)
+        if data is None:
             return
 
         pyfile.set_status("processing")
@@ -192,7 +244,8 @@ class Checksum(BaseAddon):
                     if key in data["hash"]:
                         pyfile.set_custom_status(self._("checksum verifying"))
                         try:
-                            checksum = compute_checksum(
+                            checksum = self.get_checksum(
+                                pyfile.id,
                                 local_file,
                                 key.replace("-", "").lower(),
                                 progress_notify=pyfile.set_progress,
@@ -308,7 +361,8 @@ class Checksum(BaseAddon):
                         pyfile.set_custom_status(self._("checksum verifying"))
                         thread.add_active(pyfile)
                         try:
-                            checksum = compute_checksum(
+                            checksum = self.get_checksum(
+                                fid,
                                 local_file,
                                 algorithm,
                                 progress_notify=pyfile.set_progress,
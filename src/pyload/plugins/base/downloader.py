@@ -16,7 +16,7 @@ from .hoster import BaseHoster
 class BaseDownloader(BaseHoster):
     __name__ = "BaseDownloader"
     __type__ = "downloader"
-    __version__ = "0.84"
+    __version__ = "0.86"
     __status__ = "stable"
 
     __pattern__ = r"^unmatchable$"
@@ -55,6 +55,12 @@ class BaseDownloader(BaseHoster):
         #: Location where the last call to download was saved
         self._last_download = ""
 
+        #: Checksums to compute while downloading, e.g. "md5" or "crc32"
+        self.checksum_algorithms = set()
+
+        #: Checksums of the last download computed while downloading, by algorithm
+        self.last_checksums = {}
+
         #: Re match of the last call to `check_download`
         self.last_check = None
 
@@ -66,6 +72,8 @@ class BaseDownloader(BaseHoster):
 
     def setup_base(self):
         self._last_download = ""
+        self.checksum_algorithms = set()
+        self.last_checksums = {}
         self.last_check = None
         self.restart_free = False
         self.no_fallback = False
@@ -236,6 +244,13 @@ class BaseDownloader(BaseHoster):
         else:
             chunks = min(dl_chunks, chunk_limit)
 
+        #: limited and shared by plugin, account and package
+        bucket = self.pyload.request_factory.get_bucket(
+            self.classname,
+            self.account.user if self.account else None,
+            self.pyfile.packageid,
+        )
+
         try:
             newname = self.req.http_download(
                 url,
@@ -249,6 +264,8 @@ class BaseDownloader(BaseHoster):
                 resume=resume,
                 status_notify=self._on_notification,
                 disposition=disposition,
+                bucket=bucket,
+                checksums=self.checksum_algorithms,
             )
 
         except IOError as exc:
@@ -269,6 +286,7 @@ class BaseDownloader(BaseHoster):
                 return ""
             else:
                 self.log_info(self._("File saved"))
+                self.last_checksums = self.req.checksums
 
             return newname
 
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 
 import inspect
+import logging
 import os
 import sys
 
@@ -80,7 +81,9 @@ class BasePlugin:
         )
 
     def log_debug(self, *args, **kwargs):
-        self._log("debug", self.__type__, self.__name__, args, kwargs)
+        #: skips hiding credentials and building the message when it is not logged
+        if self.pyload.log.isEnabledFor(logging.DEBUG):
+            self._log("debug", self.__type__, self.__name__, args, kwargs)
 
     def log_info(self, *args, **kwargs):
         self._log("info", self.__type__, self.__name__, args, kwargs)
@@ -260,6 +263,35 @@ class BasePlugin:
         else:
             return html
 
+    def load_stream(
+        self, url, get={}, post={}, ref=True, cookies=True, decode=True, req=None
+    ):
+        """
+        Load content at url and yield it piece by piece, for big pages or api responses.
+
+        Unlike `load` the content is neither unescaped nor kept in `last_html`.
+        """
+        if self.pyload.debug:
+            self.log_debug(f"LOAD STREAM {url}")
+
+        url = fixurl(url, unquote=True)  #: Recheck in 0.6.x
+
+        if req is False:
+            req = get_request()
+
+        elif not req:
+            req = self.req
+
+        if isinstance(cookies, list):
+            set_cookies(req.cj, cookies)
+
+        if isinstance(ref, str):
+            req.last_url = ref
+
+        return req.load_stream(
+            url, get, post, bool(ref), bool(cookies), decode=decode is True
+        )
+
     def upload(
         self,
         path,
@@ -24,14 +24,24 @@ log = getLogger(APPID)
 def rpc(func, args=""):
     api = flask.current_app.config["PYLOAD_API"]
 
-    if flask.request.authorization:
+    token = ""
+    auth_header = flask.request.headers.get("Authorization", "")
+    if auth_header[:7].lower() == "bearer ":
+        user = ""
+        token = auth_header[7:].strip()
+    elif flask.request.authorization:
         user = flask.request.authorization.get("username", "")
         password = flask.request.authorization.get("password", "")
     else:
         user = flask.request.form.get("u", "")
         password = flask.request.form.get("p", "")
 
-    if user:
+    if token:
+        user_info = api.check_token(token)
+        if not user_info:
+            return jsonify({'error': "Unauthorized"}), 401
+        s = set_session(user_info)
+    elif user:
         user_info = api.check_auth(user, password)
         s = set_session(user_info)
     else:
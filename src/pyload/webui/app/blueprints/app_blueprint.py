@@ -366,55 +366,43 @@ def logs(start_line=-1):
 
         # s.modified = True
 
-    log_entries = api.get_log()
-    if not per_page:
-        start_line = 0
-
-    if start_line < 1:
-        start_line = (
-            1 if len(log_entries) - per_page + 1 < 1 or per_page == 0 else len(log_entries) - per_page + 1
-        )
-
+    log_length = api.get_log_length()
     if isinstance(fro, datetime.datetime):  #: we will search for datetime.datetime
-        start_line = -1
+        start_line = api.find_log_line(fro.strftime("%Y-%m-%d %H:%M:%S")) + 1
+    elif not per_page:
+        start_line = 1
+    elif start_line < 1:
+        start_line = max(log_length - per_page + 1, 1)
 
     data = []
-    inpage_counter = 0
-    for counter, logline in enumerate(log_entries, start=1):
-        if counter >= start_line:
-            try:
-                date, time, level, source, message = _RE_LOGLINE.match(logline).groups()
-                dtime = datetime.datetime.strptime(
-                    date + " " + time, "%Y-%m-%d %H:%M:%S"
-                )
-                message = message.strip()
-            except (AttributeError, IndexError):
-                dtime = None
-                date = "?"
-                time = " "
-                level = "?"
-                source = "?"
-                message = logline
-            if start_line == -1 and dtime is not None and fro <= dtime:
-                start_line = counter  #: found our datetime.datetime
-
-            if start_line >= 0:
-                data.append(
-                    {
-                        "line": counter,
-                        "date": date + " " + time,
-                        "level": level,
-                        "source": source,
-                        "message": message.rstrip('\n'),
-                    }
-                )
-                inpage_counter += 1
-                if (
-                    fro is None and dtime is not None
-                ):  #: if fro not set, set it to first showed line
-                    fro = dtime
-            if inpage_counter >= per_page > 0:
-                break
+    log_entries = api.get_log(start_line - 1, per_page)
+    for counter, logline in enumerate(log_entries, start=start_line):
+        try:
+            date, time, level, source, message = _RE_LOGLINE.match(logline).groups()
+            dtime = datetime.datetime.strptime(
+                date + " " + time, "%Y-%m-%d %H:%M:%S"
+            )
+            message = message.strip()
+        except (AttributeError, IndexError):
+            dtime = None
+            date = "?"
+            time = " "
+            level = "?"
+            source = "?"
+            message = logline
+        data.append(
+            {
+                "line": counter,
+                "date": date + " " + time,
+                "level": level,
+                "source": source,
+                "message": message.rstrip('\n'),
+            }
+        )
+        if (
+            fro is None and dtime is not None
+        ):  #: if fro not set, set it to first showed line
+            fro = dtime
 
     if fro is None:  #: still not set, empty log?
         fro = datetime.datetime.now()
@@ -430,7 +418,7 @@ def logs(start_line=-1):
         "perpage": per_page,
         "perpage_p": sorted(per_page_selection),
         "iprev": max(start_line - per_page, 1),
-        "inext": (start_line + per_page) if start_line + per_page <= len(log_entries) else start_line,
+        "inext": (start_line + per_page) if start_line + per_page <= log_length else start_line,
     }
     return render_template("logs.html", **context)
 
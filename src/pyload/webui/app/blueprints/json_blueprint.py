@@ -1,17 +1,29 @@
 # -*- coding: utf-8 -*-
 
 import os
+import threading
+import time
 
 import flask
 from flask.json import jsonify
 
-from pyload.core.api import Role
+from pyload.core.api import Destination, Role
 from pyload.core.utils import format
 
 from ..helpers import get_permission, login_required, permlist, render_template, set_permission
 
 bp = flask.Blueprint("json", __name__)
 
+#: every open event stream holds a server thread
+MAX_EVENT_STREAMS = 12
+STREAM_TIME = 60  #: seconds until a stream is closed, browsers reconnect on their own
+STATUS_INTERVAL = 2  #: seconds between checks of status and links for changes
+KEEPALIVE_TIME = 15
+
+SNAPSHOT_PAGE = 100  #: packages loaded at once by /json/packages
+
+event_streams = threading.BoundedSemaphore(MAX_EVENT_STREAMS)
+
 
 @bp.route("/json/status", methods=["GET", "POST"], endpoint="status")
 # @apiver_check
@@ -28,42 +40,52 @@ def status():
 def links():
     api = flask.current_app.config["PYLOAD_API"]
     try:
-        links = api.status_downloads()
-        ids = []
-        for link in links:
-            ids.append(link["fid"])
-
-            if link["status"] == 12:  #: downloading
-                formatted_eta = link["format_eta"]
-                formatted_speed = format.speed(link["speed"])
-                link["info"] = f"{formatted_eta} @ {formatted_speed}"
-
-            elif link["status"] == 5:  #: waiting
-                link["percent"] = 0
-                link["size"] = 0
-                link["bleft"] = 0
-                link["info"] = api._("waiting {}").format(link["format_wait"])
-            else:
-                link["info"] = ""
-
-        return jsonify(links=links, ids=ids)
+        return jsonify(get_links(api))
 
     except Exception as exc:
         return jsonify(False), 500
 
 
+def get_links(api):
+    links = api.status_downloads()
+    ids = []
+    for link in links:
+        ids.append(link["fid"])
+
+        if link["status"] == 12:  #: downloading
+            formatted_eta = link["format_eta"]
+            formatted_speed = format.speed(link["speed"])
+            link["info"] = f"{formatted_eta} @ {formatted_speed}"
+
+        elif link["status"] == 5:  #: waiting
+            link["percent"] = 0
+            link["size"] = 0
+            link["bleft"] = 0
+            link["info"] = api._("waiting {}").format(link["format_wait"])
+        else:
+            link["info"] = ""
+
+    return {"links": links, "ids": ids}
+
+
 @bp.route("/json/packages", endpoint="packages")
 # @apiver_check
 @login_required("LIST")
 def packages():
     api = flask.current_app.config["PYLOAD_API"]
     try:
-        data = api.get_queue()
-
-        for package in data:
-            package["links"] = []
-            for file in api.get_package_files(package["id"]):
-                package["links"].append(api.get_file_info(file))
+        offset = int(flask.request.args.get("offset", 0))
+        limit = int(flask.request.args.get("limit", 0))  #: 0 for all packages
+
+        #: links are loaded per page, not per package
+        data = []
+        while True:
+            snapshot = api.get_queue_snapshot(
+                Destination.QUEUE, offset + len(data), limit or SNAPSHOT_PAGE
+            )
+            data.extend(snapshot.packages)
+            if limit or not snapshot.packages or offset + len(data) >= snapshot.total:
+                break
 
         return jsonify(data)
 
@@ -419,3 +441,71 @@ def update_users():
         api.set_user_permission(name, data["permission"], data["role"])
 
     return jsonify(True)
+
+
+@bp.route("/json/events", endpoint="events")
+# @apiver_check
+@login_required("LIST")
+def events():
+    """
+    server-sent events replacing the polling of status, links and events.
+
+    Sends "status" and, with links=1, "links" whenever they change and "events"
+    with the queue events, each with its cursor as id to resume from.
+    """
+    api = flask.current_app.config["PYLOAD_API"]
+    with_links = flask.request.args.get("links") == "1"
+    try:
+        cursor = int(
+            flask.request.headers.get("Last-Event-ID") or flask.request.args["cursor"]
+        )
+    except (KeyError, ValueError):
+        cursor = None
+
+    if not event_streams.acquire(blocking=False):
+        return "Too many event streams", 503
+
+    def generate(cursor):
+        cursor, events = api.wait_events(cursor, 0)
+        yield f"retry: {STATUS_INTERVAL * 1000}\nid: {cursor}\n\n"
+
+        sent = {}
+        now = time.time()
+        closing = now + STREAM_TIME
+        last_check = last_write = 0
+        while True:
+            if events:
+                last_write = now
+                yield f"id: {cursor}\nevent: events\ndata: {flask.json.dumps(events)}\n\n"
+
+            if now - last_check >= STATUS_INTERVAL:
+                last_check = now
+                messages = [("status", api.status_server())]
+                if with_links:
+                    messages.append(("links", get_links(api)))
+
+                for name, data in messages:
+                    data = flask.json.dumps(data)
+                    if sent.get(name) != data:
+                        sent[name] = data
+                        last_write = now
+                        yield f"event: {name}\ndata: {data}\n\n"
+
+            if now - last_write >= KEEPALIVE_TIME:
+                last_write = now
+                yield ": keepalive\n\n"
+
+            if now >= closing:
+                break
+
+            timeout = max(0, last_check + STATUS_INTERVAL - time.time())
+            cursor, events = api.wait_events(cursor, timeout)
+            now = time.time()
+
+    response = flask.Response(
+        flask.stream_with_context(generate(cursor)),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+    response.call_on_close(event_streams.release)
+    return response
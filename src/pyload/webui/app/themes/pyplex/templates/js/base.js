@@ -286,6 +286,24 @@ $(function() {
     $("#cap_box #cap_positional").click(submit_positional_captcha);
 
     if (thisScript.getAttribute('nopoll') !== "1") {
+        if (window.EventSource) {
+            startEventStream();
+        } else {
+            startStatusPolling();
+        }
+    }
+});
+
+function startStatusPolling() {
+    $.ajax({
+        method: "post",
+        url: "{{url_for('json.status')}}",
+        async: true,
+        timeout: 3000,
+        success: LoadJsonToContent
+    });
+
+    setInterval(function () {
         $.ajax({
             method: "post",
             url: "{{url_for('json.status')}}",
@@ -293,18 +311,34 @@ $(function() {
             timeout: 3000,
             success: LoadJsonToContent
         });
+    }, 4000);
 
-        setInterval(function () {
-            $.ajax({
-                method: "post",
-                url: "{{url_for('json.status')}}",
-                async: true,
-                timeout: 3000,
-                success: LoadJsonToContent
-            });
-        }, 4000);
+    $(document).trigger("pyload:polling");
+}
+
+function startEventStream() {
+    let url = "{{url_for('json.events')}}";
+    if ($("#links_active").length) {
+        url += "?links=1";
     }
-});
+
+    const source = new EventSource(url);
+    source.addEventListener("status", function (e) {
+        LoadJsonToContent(JSON.parse(e.data));
+    });
+    source.addEventListener("links", function (e) {
+        $(document).trigger("pyload:links", [JSON.parse(e.data)]);
+    });
+    source.addEventListener("events", function (e) {
+        $(document).trigger("pyload:events", [JSON.parse(e.data)]);
+    });
+    source.onerror = function () {
+        // the stream was refused, fall back to polling
+        if (source.readyState === EventSource.CLOSED) {
+            startStatusPolling();
+        }
+    };
+}
 
 function LoadJsonToContent(a) {
     var notification;
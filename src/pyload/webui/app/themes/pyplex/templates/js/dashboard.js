@@ -34,18 +34,29 @@ function EntryManager(){
             timeout: 30000,
             success: thisObject.update
         });
-        setInterval(function() {
-        $.ajax({
-            method:"post",
-            url: "{{url_for('json.links')}}",
-            async: true,
-            timeout: 30000,
-            success: thisObject.update,
-            error: function () {
-                thisObject.update({ids:[], links:[]})
-            }
-        });
-    }, 2500);
+        var poll = function() {
+            setInterval(function() {
+            $.ajax({
+                method:"post",
+                url: "{{url_for('json.links')}}",
+                async: true,
+                timeout: 30000,
+                success: thisObject.update,
+                error: function () {
+                    thisObject.update({ids:[], links:[]})
+                }
+            });
+        }, 2500);
+        };
+        // links are pushed by the event stream of base.js, unless it falls back to polling
+        if (window.EventSource) {
+            $(document).on("pyload:links", function(event, data) {
+                thisObject.update(data);
+            });
+            $(document).one("pyload:polling", poll);
+        } else {
+            poll();
+        }
 
         ids = [{% for link in content %}
         {% if forloop.last %}
@@ -7,6 +7,7 @@ from cheroot import wsgi
 from cheroot.ssl.builtin import BuiltinSSLAdapter
 
 from .app import App
+from .app.blueprints.json_blueprint import MAX_EVENT_STREAMS
 
 
 # TODO: make configurable to serve API
@@ -43,7 +44,13 @@ class WebServerThread(threading.Thread):
         bind_path = "/"
         bind_addr = (self.host, self.port)
         wsgi_app = wsgi.PathInfoDispatcher({bind_path: self.app})
-        self.server = wsgi.Server(bind_addr, wsgi_app, request_queue_size=512)
+        #: event streams hold their thread, keep the default 10 for the requests
+        self.server = wsgi.Server(
+            bind_addr,
+            wsgi_app,
+            numthreads=10 + MAX_EVENT_STREAMS,
+            request_queue_size=512,
+        )
 
         if self.use_ssl:
             try:
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Measures HTTPDownload throughput against a local HTTP server.
+
+Usage: python tests/benchmarks/bench_http_download.py [size in MiB]
+"""
+
+import http.server
+import os
+import re
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+from pyload.core.network.http.http_download import HTTPDownload
+
+OPTIONS = {"interface": None, "proxies": {}, "ipv6": False}
+
+
+class RangeRequestHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    data = b""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        start, end = 0, len(self.data) - 1
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if m is not None:
+            start = int(m.group(1))
+            end = min(int(m.group(2) or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(self.data)}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        view = memoryview(self.data)[start : end + 1]
+        try:
+            for i in range(0, len(view), 1 << 16):
+                self.wfile.write(view[i : i + (1 << 16)])
+        except OSError:  #: chunks close their connection once they got their range
+            pass
+
+
+class Server(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  #: aborted chunks reset their connections
+
+
+def run(url, chunks, preallocate=False):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filename = os.path.join(tmpdir, "bench.bin")
+        options = dict(OPTIONS, preallocate=preallocate)
+        start = time.perf_counter()
+        dl = HTTPDownload(url, filename, options=options)
+        dl.download(chunks=chunks)
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(filename)
+    return size / elapsed / (1 << 20)
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    RangeRequestHandler.data = os.urandom(size << 20)
+
+    server = Server(("127.0.0.1", 0), RangeRequestHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/bench.bin"
+
+    print(f"{size} MiB file")
+    for preallocate in (False, True):
+        for chunks in (1, 4, 16):
+            speed = run(url, chunks, preallocate)
+            print(f"chunks={chunks:<3} preallocate={preallocate!s:<5} {speed:8.1f} MiB/s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Measures PluginManager.parse_urls against a full scan of all plugin patterns.
+
+Usage: python tests/benchmarks/bench_parse_urls.py [number of links]
+"""
+
+import logging
+import random
+import string
+import sys
+import tempfile
+import time
+from itertools import chain
+from types import SimpleNamespace
+
+from pyload.core.managers.plugin_manager import PluginManager
+
+#: links as they are pasted from forums and link lists
+TEMPLATES = (
+    "https://rapidgator.net/file/{id}/{name}.part1.rar.html",
+    "https://1fichier.com/?{id}",
+    "https://mega.nz/file/{id}#{id}",
+    "https://mega.nz/folder/{id}#{id}",
+    "https://nitroflare.com/view/{ID}/{name}.rar",
+    "https://turbobit.net/{id}.html",
+    "https://ddownload.com/{id}/{name}.rar",
+    "https://katfile.com/{id}/{name}.rar.html",
+    "https://uploaded.net/file/{id}",
+    "https://www.mediafire.com/file/{id}/{name}.zip/file",
+    "https://www.youtube.com/watch?v={id}",
+    "https://drive.google.com/file/d/{id}/view",
+    "https://filecrypt.cc/Container/{ID}.html",
+    "https://www.example.org/forum/thread-{id}.html",
+    "https://cdn.example.com/files/{name}.zip",
+)
+
+
+def random_links(count):
+    random.seed(0)
+    chars = string.ascii_letters + string.digits
+    links = []
+    for _ in range(count):
+        template = random.choice(TEMPLATES)
+        links.append(
+            template.format(
+                id="".join(random.choices(chars, k=12)),
+                ID="".join(random.choices(string.ascii_uppercase, k=10)),
+                name="".join(random.choices(string.ascii_lowercase, k=8)),
+            )
+        )
+    return links
+
+
+def create_plugin_manager(userdir):
+    core = SimpleNamespace(
+        userdir=userdir,
+        tempdir=userdir,
+        _=lambda x: x,
+        log=logging.getLogger(),
+        debug=0,
+    )
+    manager = PluginManager.__new__(PluginManager)
+    manager.pyload = core
+    manager._ = core._
+    manager._router = None
+    manager._index_cache = {}
+    manager._index_cache_used = set()
+    manager.decrypter_plugins = manager.parse("decrypters", pattern=True)[0]
+    manager.downloader_plugins = manager.parse("downloaders", pattern=True)[0]
+    manager.container_plugins = manager.parse("containers", pattern=True)[0]
+    return manager
+
+
+def full_scan(manager, urls):
+    plugins = list(
+        chain(
+            manager.decrypter_plugins.items(),
+            manager.downloader_plugins.items(),
+            manager.container_plugins.items(),
+        )
+    )
+    res = []
+    for url in urls:
+        for name, value in plugins:
+            if value["re"].match(url):
+                res.append((url, name))
+                break
+        else:
+            res.append((url, "DefaultPlugin"))
+    return res
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    links = random_links(count)
+
+    with tempfile.TemporaryDirectory() as userdir:
+        manager = create_plugin_manager(userdir)
+
+        start = time.perf_counter()
+        expected = full_scan(manager, links)
+        scan_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        manager.get_router()
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = manager.parse_urls(links)
+        parse_time = time.perf_counter() - start
+
+    router = manager.get_router()
+    print(f"{count} links, {len(router.plugins)} plugins, {len(router.fallback)} always tried")
+    print(f"full scan    {scan_time * 1000:8.1f} ms")
+    print(f"router build {build_time * 1000:8.1f} ms")
+    print(f"parse_urls   {parse_time * 1000:8.1f} ms")
+    print(f"mismatches   {sum(a != b for a, b in zip(actual, expected)):8d}")
+
+
+if __name__ == "__main__":
+    main()
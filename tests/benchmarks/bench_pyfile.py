@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+Measures memory and serialisation speed of PyFile and PyPackage objects.
+
+Usage: python tests/benchmarks/bench_pyfile.py [number of links]
+"""
+
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from pyload.core.datatypes.pyfile import PyFile
+from pyload.core.datatypes.pypackage import PyPackage
+
+
+def create_manager():
+    return SimpleNamespace(cache={}, package_cache={}, status_msg=["queued"] * 15)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    manager = create_manager()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for i in range(count):
+        PyFile(
+            manager,
+            i,
+            f"https://example.com/file/{i}",
+            f"file{i}.rar",
+            i * 1024,
+            3,
+            "",
+            "ExampleCom",
+            i // 100,
+            i % 100,
+        )
+    for i in range(count // 100):
+        PyPackage(manager, i, f"package{i}", f"package{i}", "", "", 1, i)
+    create_time = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    pyfiles = list(manager.cache.values())
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        for pyfile in pyfiles:
+            pyfile.to_db_dict()
+        times.append(time.perf_counter() - start)
+
+    print(f"{count} links, {count // 100} packages")
+    print(f"create         {create_time * 1000:8.1f} ms")
+    print(f"memory         {memory / 2 ** 20:8.1f} MiB ({memory / count:.0f} bytes per link)")
+    print(f"to_db_dict 1st {times[0] * 1000:8.1f} ms")
+    print(f"to_db_dict     {min(times[1:]) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Measures Api.get_queue_data on a synthetic database, alone and while the
+database thread is busy with status updates.
+
+Usage: python tests/benchmarks/bench_queue_data.py [number of links]
+"""
+
+import logging
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+from pyload.core.api import Api
+from pyload.core.managers.file_manager import FileManager
+from pyload.core.threads.database_thread import DatabaseThread
+
+LINKS_PER_PACKAGE = 100
+
+
+class Config:
+    def get(self, section, option):
+        return {"db_synchronous": "NORMAL"}[option]
+
+
+def create_core(userdir, links):
+    core = SimpleNamespace(
+        userdir=userdir, _=lambda x: x, config=Config(), log=logging.getLogger()
+    )
+    core.db = DatabaseThread(core)
+    core.db.setup()
+    core.files = FileManager(core)
+    core.api = Api(core)
+
+    for n in range(links // LINKS_PER_PACKAGE):
+        pid = core.db.add_package(f"package {n}", f"folder {n}", 1)
+        core.db.add_links(
+            [
+                (f"http://example.com/{n}/{i}", "BasePlugin")
+                for i in range(LINKS_PER_PACKAGE)
+            ],
+            pid,
+        )
+    return core
+
+
+def measure(func, rounds=5):
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    links = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    with tempfile.TemporaryDirectory() as userdir:
+        core = create_core(userdir, links)
+        print(f"{links} links")
+
+        elapsed = measure(core.api.get_queue_data)
+        print(f"get_queue_data idle          {elapsed * 1000:8.1f} ms")
+
+        #: status updates of running downloads and link checks, 4000 per second
+        stop = threading.Event()
+        latencies = []
+
+        def write():
+            pyfile = SimpleNamespace(
+                id=1, url="", name="", size=0, status=3, error="", packageid=1
+            )
+            while not stop.is_set():
+                for i in range(200):
+                    pyfile.id = i + 1
+                    core.db.update_link(pyfile)
+                start = time.perf_counter()
+                core.db.sync_save()
+                latencies.append(time.perf_counter() - start)
+                stop.wait(0.05)
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        elapsed = measure(core.api.get_queue_data)
+        stop.set()
+        writer.join()
+
+        print(f"get_queue_data under writes  {elapsed * 1000:8.1f} ms")
+        print(f"writer round trip (median)   {statistics.median(latencies) * 1000:8.1f} ms")
+
+        core.db.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import logging
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from pyload.core.api import Api
+from pyload.core.threads.database_thread import DatabaseThread
+
+
+class Config:
+    def get(self, section, option):
+        return "NORMAL"
+
+
+class TestAuthCache(unittest.TestCase):
+    def setUp(self):
+        self.userdir = tempfile.mkdtemp()
+        core = SimpleNamespace(
+            userdir=self.userdir,
+            _=lambda x: x,
+            config=Config(),
+            log=logging.getLogger(),
+        )
+        core.db = DatabaseThread(core)
+        core.db.setup()
+        self.api = Api(core)
+        self.api.add_user("user", "secret", 1, 0)
+
+    def tearDown(self):
+        shutil.rmtree(self.userdir)
+
+    def test_check_auth(self):
+        db = self.api.pyload.db
+        with mock.patch.object(db, "check_auth", wraps=db.check_auth) as check_auth:
+            for _ in range(3):
+                self.assertEqual(self.api.check_auth("user", "secret")["name"], "user")
+            self.assertEqual(self.api.check_auth("user", "wrong"), {})
+            self.assertEqual(check_auth.call_count, 2)
+
+            self.api.set_user_permission("user", 7, 1)
+            self.assertEqual(self.api.check_auth("user", "secret")["permission"], 7)
+
+            self.api.change_password("user", "secret", "other")
+            self.assertEqual(self.api.check_auth("user", "secret"), {})
+
+    def test_api_tokens(self):
+        self.assertEqual(self.api.generate_api_token("user", "wrong"), "")
+        token = self.api.generate_api_token("user", "secret")
+        self.assertEqual(self.api.check_token(token)["name"], "user")
+        self.assertEqual(self.api.check_token(token + "x"), {})
+
+        self.assertTrue(self.api.revoke_api_tokens("user", "secret"))
+        self.assertEqual(self.api.check_token(token), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
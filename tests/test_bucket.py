@@ -0,0 +1,70 @@
+import heapq
+import unittest
+from unittest import mock
+
+from pyload.core.network import bucket
+from pyload.core.network.bucket import Bucket
+
+PIECE = 16 << 10
+
+
+class TestBucket(unittest.TestCase):
+    def setUp(self):
+        self.now = 0.0
+        patcher = mock.patch.object(bucket.time, "time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def download(self, buckets, max_speeds={}, seconds=20, connections=4):
+        """
+        simulates greedy downloads, returns their average speed in KiB/s.
+        """
+        received = dict.fromkeys(buckets, 0)
+        queue = [(0.0, i, name) for name in buckets for i in range(connections)]
+        while queue:
+            self.now, i, name = heapq.heappop(queue)
+            if self.now > seconds:
+                break
+            delay = buckets[name].consumed(PIECE)
+            received[name] += PIECE
+            delay = max(delay, PIECE / max_speeds.get(name, 20 << 20))
+            heapq.heappush(queue, (self.now + delay, i, name))
+
+        return {name: size / seconds / 1024 for name, size in received.items()}
+
+    def test_weighted_share(self):
+        root = Bucket(rate=1000 << 10)
+        speeds = self.download(
+            {
+                "a": Bucket(Bucket(root, weight=1)),
+                "b": Bucket(Bucket(root, weight=3)),
+            }
+        )
+        self.assertAlmostEqual(speeds["a"], 250, delta=30)
+        self.assertAlmostEqual(speeds["b"], 750, delta=30)
+
+    def test_unused_share_is_redistributed(self):
+        root = Bucket(rate=1000 << 10)
+        speeds = self.download(
+            {"a": Bucket(Bucket(root)), "b": Bucket(Bucket(root))},
+            max_speeds={"b": 50 << 10},
+        )
+        self.assertAlmostEqual(speeds["a"], 800, delta=30)
+        self.assertAlmostEqual(speeds["b"], 200, delta=30)
+
+    def test_limit_of_child(self):
+        root = Bucket(rate=1000 << 10)
+        speeds = self.download(
+            {"a": Bucket(Bucket(root, rate=200 << 10)), "b": Bucket(Bucket(root))}
+        )
+        self.assertAlmostEqual(speeds["a"], 200, delta=30)
+        self.assertAlmostEqual(speeds["b"], 800, delta=30)
+
+    def test_unlimited(self):
+        self.assertFalse(Bucket(Bucket()))
+        self.assertTrue(Bucket(Bucket(Bucket(rate=1 << 20))))
+        self.assertEqual(Bucket(Bucket()).consumed(PIECE), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
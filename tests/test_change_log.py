@@ -0,0 +1,47 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from pyload.core.datatypes.change_log import ChangeLog
+from pyload.core.managers.file_manager import FileManager
+
+
+class TestChangeLog(unittest.TestCase):
+    def setUp(self):
+        self.changes = ChangeLog()
+
+    def test_since(self):
+        self.changes.add(("file", 1), ("pack", 1))
+        revision, keys = self.changes.since(0)
+        self.assertEqual(revision, 2)
+        self.assertCountEqual(keys, [("file", 1), ("pack", 1)])
+
+        self.changes.add(("file", 1))
+        self.assertEqual(self.changes.since(2), (3, [("file", 1)]))
+        self.assertEqual(self.changes.since(3), (3, []))
+        self.assertEqual(len(self.changes.changes), 2)
+
+    def test_unknown_revisions(self):
+        self.changes.MAX_CHANGES = 2
+        self.changes.add(("file", 1), ("file", 2), ("file", 3))
+        self.assertEqual(self.changes.since(0), (3, None))
+        self.assertEqual(self.changes.since(1), (3, [("file", 3), ("file", 2)]))
+        self.assertEqual(self.changes.since(4), (3, None))
+
+        self.changes.reset()
+        self.assertEqual(self.changes.since(3), (4, None))
+        self.assertEqual(self.changes.since(4), (4, []))
+
+    def test_unchanged_poll(self):
+        db = mock.Mock()
+        files = FileManager(SimpleNamespace(_=lambda x: x, db=db))
+        files.changes.add(("file", 1))
+
+        revision, changes = files.get_changes(1)
+        self.assertEqual(revision, 1)
+        self.assertEqual(changes["packages"], {})
+        self.assertFalse(db.method_calls)  #: nothing loaded without changes
+
+
+if __name__ == "__main__":
+    unittest.main()
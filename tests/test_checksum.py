@@ -0,0 +1,136 @@
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unittest
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from pyload.core.network.download_reactor import DownloadReactor
+from pyload.core.network.http.checksum import (
+    StreamChecksum,
+    adler32_combine,
+    crc32_combine,
+)
+from pyload.core.network.http.http_download import HTTPDownload
+
+OPTIONS = {"interface": None, "proxies": {}, "ipv6": False}
+
+DATA = os.urandom(4 << 20)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        start, end = 0, len(DATA) - 1
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if m is not None:
+            start = int(m.group(1))
+            end = min(int(m.group(2) or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        try:
+            self.wfile.write(DATA[start : end + 1])
+        except OSError:
+            pass
+
+
+class TestChecksum(unittest.TestCase):
+    def test_combine(self):
+        for first, second in ((0, 0), (1, 0), (0, 5), (100, 1), (3000, 70000)):
+            a = os.urandom(first)
+            b = os.urandom(second)
+            self.assertEqual(
+                crc32_combine(zlib.crc32(a), zlib.crc32(b), len(b)), zlib.crc32(a + b)
+            )
+            self.assertEqual(
+                adler32_combine(zlib.adler32(a), zlib.adler32(b), len(b)),
+                zlib.adler32(a + b),
+            )
+
+    def test_stream_checksum(self):
+        data = os.urandom(100000)
+        parts = []
+        for start, end in ((0, 10), (10, 40000), (40000, len(data))):
+            checksum = StreamChecksum(["md5", "crc32", "adler32", "unknown"])
+            checksum.update(data[start : start + 7])
+            checksum.update(memoryview(data)[start + 7 : end])
+            parts.append(checksum)
+
+        whole = StreamChecksum(["md5", "crc32"])
+        whole.update(data)
+        self.assertEqual(
+            whole.digests(),
+            {"md5": hashlib.md5(data).hexdigest(), "crc32": f"{zlib.crc32(data):08x}"},
+        )
+        self.assertEqual(
+            StreamChecksum.combine(parts),
+            {"crc32": f"{zlib.crc32(data):08x}", "adler32": f"{zlib.adler32(data):08x}"},
+        )
+
+
+class TestDownloadChecksum(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        cls.server.daemon_threads = True
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}/file"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_chunks(self):
+        expected = {
+            "crc32": f"{zlib.crc32(DATA):08x}",
+            "adler32": f"{zlib.adler32(DATA):08x}",
+        }
+        for reactor in (None, DownloadReactor()):
+            for preallocate in (False, True):
+                with self.subTest(reactor=reactor, preallocate=preallocate):
+                    filename = os.path.join(self.dir, "file.bin")
+                    dl = HTTPDownload(
+                        self.url,
+                        filename,
+                        options=dict(OPTIONS, preallocate=preallocate),
+                        reactor=reactor,
+                        checksums=["crc32", "adler32", "md5"],
+                    )
+                    with mock.patch.object(
+                        StreamChecksum,
+                        "update",
+                        autospec=True,
+                        side_effect=StreamChecksum.update,
+                    ) as update:
+                        dl.download(chunks=8)
+
+                    #: all data was hashed once, while it was written, md5 is left
+                    #: out since it cannot be combined from several chunks
+                    self.assertEqual(
+                        sum(len(c.args[1]) for c in update.call_args_list), len(DATA)
+                    )
+                    self.assertEqual(dl.checksums, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
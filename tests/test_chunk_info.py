@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from pyload.core.network.http.http_chunk import ChunkInfo
+
+
+class TestChunkInfo(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.name = os.path.join(self.tmpdir.name, "file.bin")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_save_load(self):
+        info = ChunkInfo(self.name)
+        info.set_size(1000)
+        info.create_chunks(3)
+        info.save()
+
+        actual = ChunkInfo.load(self.name)
+        self.assertEqual(actual.size, 1000)
+        self.assertFalse(actual.preallocated)
+        self.assertEqual(actual.get_count(), 3)
+        self.assertEqual(actual.get_chunk_filename(2), f"{self.name}.chunk2")
+        self.assertEqual(actual.get_chunk_range(2), (668, 999))
+
+    def test_save_load_preallocated(self):
+        info = ChunkInfo(self.name)
+        info.preallocated = True
+        info.set_size(1000)
+        info.create_chunks(2)
+        info.set_chunk_arrived(1, 123)
+        info.save()
+
+        actual = ChunkInfo.load(self.name)
+        self.assertTrue(actual.preallocated)
+        self.assertEqual(actual.get_chunk_filename(1), f"{self.name}.chunk0")
+        self.assertEqual(actual.get_chunk_arrived(0), 0)
+        self.assertEqual(actual.get_chunk_arrived(1), 123)
+        self.assertFalse(os.path.exists(f"{self.name}.chunks.tmp"))
+
+    def test_split_chunk(self):
+        info = ChunkInfo(self.name)
+        info.set_size(1000)
+        info.create_chunks(2)
+        index = info.split_chunk(0, 200)
+
+        self.assertEqual(index, 2)
+        self.assertEqual(info.get_chunk_range(0), (0, 199))
+        self.assertEqual(info.get_chunk_range(2), (200, 500))
+        self.assertEqual(info.get_chunk_filename(2), f"{self.name}.chunk2")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import shutil
+import tempfile
+import unittest
+from threading import Event
+from unittest import mock
+
+from pyload.core import Core
+from pyload.core.config.parser import ConfigParser
+
+
+class TestConfigParser(unittest.TestCase):
+    def setUp(self):
+        self.userdir = tempfile.mkdtemp()
+        self.config = ConfigParser(self.userdir)
+        self.config.save()
+
+    def tearDown(self):
+        self.config.flush()
+        shutil.rmtree(self.userdir)
+
+    def test_changes_saved_together(self):
+        with mock.patch.object(
+            self.config, "save_config", wraps=self.config.save_config
+        ) as save_config:
+            for i in range(20):
+                self.config.set("download", "max_downloads", i)
+            self.assertEqual(self.config.get("download", "max_downloads"), 19)
+            self.assertEqual(save_config.call_count, 0)
+
+            self.config.flush()
+            self.assertEqual(save_config.call_count, 1)
+
+        config = ConfigParser(self.userdir)
+        self.assertEqual(config.get("download", "max_downloads"), 19)
+        self.assertEqual(
+            sorted(os.listdir(os.path.dirname(self.config.configpath))),
+            ["plugins.cfg", "pyload.cfg"],
+        )
+
+    def test_failed_save_is_retried(self):
+        self.config.set("download", "max_downloads", 5)
+        with mock.patch("os.replace", side_effect=OSError):
+            self.assertRaises(OSError, self.config.flush)
+
+        self.config.flush()
+        config = ConfigParser(self.userdir)
+        self.assertEqual(config.get("download", "max_downloads"), 5)
+
+    def test_failed_save_on_stop(self):
+        core = Core.__new__(Core)
+        core.config = self.config
+        core._ = lambda x: x
+        core._debug = 0
+        core._running = Event()
+        core._running.set()
+        for name in ("log", "thread_manager", "scheduler", "files", "addon_manager"):
+            setattr(core, name, mock.Mock())
+        core.thread_manager.threads = []
+        core.files.cache = {}
+
+        self.config.set("download", "max_downloads", 5)
+        with mock.patch("os.replace", side_effect=OSError):
+            core.stop()
+        self.assertFalse(core._running.is_set())
+        core.log.error.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
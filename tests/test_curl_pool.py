@@ -0,0 +1,127 @@
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+
+import pycurl
+
+from pyload.core.network.curl_pool import CurlPool
+from pyload.core.network.http.http_request import HTTPRequest
+
+OPTIONS = {"interface": None, "proxies": {}, "ipv6": False}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        #: echoes the cookies and the test header of the request
+        body = "{}|{}".format(
+            self.headers.get("Cookie", ""), self.headers.get("X-Test", "")
+        ).encode()
+        self.send_response(200)
+        if self.path == "/set-cookie":
+            self.send_header("Set-Cookie", "session=secret; Path=/")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestCurlPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.server.daemon_threads = True
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.pool = CurlPool()
+
+    def tearDown(self):
+        self.pool.clear()
+
+    def perform(self, c, path):
+        body = BytesIO()
+        c.setopt(pycurl.URL, f"{self.url}{path}")
+        c.setopt(pycurl.COOKIEFILE, "")
+        c.setopt(pycurl.WRITEFUNCTION, body.write)
+        c.perform()
+        return body.getvalue().decode()
+
+    def test_reset(self):
+        c = self.pool.get_handle(OPTIONS)
+        c.setopt(pycurl.HTTPHEADER, ["X-Test: 1"])
+        self.assertEqual(self.perform(c, "/set-cookie"), "|1")
+        self.assertEqual(self.perform(c, "/"), "session=secret|1")
+        self.pool.put_handle(c, OPTIONS)
+
+        self.assertIs(self.pool.get_handle(OPTIONS), c)
+        self.assertEqual(c.getinfo(pycurl.INFO_COOKIELIST), [])
+        self.assertEqual(self.perform(c, "/"), "|")
+        #: the connection was kept
+        self.assertEqual(c.getinfo(pycurl.NUM_CONNECTS), 0)
+        self.pool.put_handle(c, OPTIONS)
+
+    def test_requests(self):
+        req = HTTPRequest(None, OPTIONS, pool=self.pool)
+        c = req.c
+        self.assertEqual(req.load(f"{self.url}/set-cookie"), "|")
+        req.close()
+
+        with HTTPRequest(None, OPTIONS, pool=self.pool) as req:
+            self.assertIs(req.c, c)
+            self.assertEqual(req.load(f"{self.url}/"), "|")
+
+    def test_keys(self):
+        others = [
+            dict(OPTIONS, interface="127.0.0.1"),
+            dict(OPTIONS, proxies={"type": "http", "host": "127.0.0.1", "port": 1}),
+            dict(OPTIONS, ipv6=True),
+        ]
+        c = self.pool.get_handle(OPTIONS)
+        self.pool.put_handle(c, OPTIONS)
+        for options in others:
+            self.assertIsNot(self.pool.get_handle(options), c)
+
+        #: the order of the proxy options does not matter
+        proxies = {"type": "http", "host": "127.0.0.1", "port": 1}
+        self.assertEqual(
+            CurlPool.get_key(dict(OPTIONS, proxies=proxies)),
+            CurlPool.get_key(dict(OPTIONS, proxies=dict(reversed(proxies.items())))),
+        )
+        #: no options are the defaults
+        self.assertEqual(CurlPool.get_key(None), CurlPool.get_key(OPTIONS))
+        self.assertIs(self.pool.get_handle(dict(OPTIONS)), c)
+
+    def test_max_idle(self):
+        handles = [
+            self.pool.get_handle(OPTIONS)
+            for _ in range(CurlPool.MAX_IDLE_HANDLES + 2)
+        ]
+        for c in handles:
+            self.pool.put_handle(c, OPTIONS)
+
+        key = CurlPool.get_key(OPTIONS)
+        self.assertEqual(self.pool.handles[key], handles[: CurlPool.MAX_IDLE_HANDLES])
+        #: the others were closed
+        for c in handles[CurlPool.MAX_IDLE_HANDLES :]:
+            with self.assertRaises(pycurl.error):
+                c.setopt(pycurl.URL, self.url)
+
+        self.pool.clear()
+        self.assertEqual(self.pool.handles, {})
+        with self.assertRaises(pycurl.error):
+            handles[0].setopt(pycurl.URL, self.url)
+
+
+if __name__ == "__main__":
+    unittest.main()
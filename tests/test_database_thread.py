@@ -0,0 +1,203 @@
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+from pyload.core.threads.database_thread import DatabaseJob, DatabaseThread
+from pyload.core.utils.struct.style import style
+
+
+class Config:
+    def get(self, section, option):
+        return "NORMAL"
+
+
+def insert(db, key):
+    db.c.execute(
+        "INSERT INTO storage (identifier, key, value) VALUES ('test', ?, '')", (key,)
+    )
+    return db.c.lastrowid
+
+
+def fail(db):
+    insert(db, "partial")
+    raise ValueError("failed")
+
+
+def lose_transaction(db):
+    db.conn.rollback()
+    raise ValueError("lost")
+
+
+@style.coalesce
+def update(db, item):
+    db.c.execute("UPDATE storage SET value=? WHERE id=?", (item.value, item.id))
+    db.updates.append(item.value)
+
+
+def get_rows(db):
+    db.c.execute("SELECT id, key, value FROM storage WHERE identifier='test'")
+    return {key: (id, value) for id, key, value in db.c}
+
+
+class TestDatabaseThread(unittest.TestCase):
+    def setUp(self):
+        self.userdir = tempfile.mkdtemp()
+        core = SimpleNamespace(
+            userdir=self.userdir,
+            _=lambda x: x,
+            config=Config(),
+            log=logging.getLogger(),
+        )
+        self.db = DatabaseThread(core)
+        self.db.setup()
+        self.db.updates = []
+
+    def tearDown(self):
+        if self.db.is_alive():
+            self.db.shutdown()
+            self.db.join()
+        shutil.rmtree(self.userdir)
+
+    def batch(self, *calls):
+        """
+        runs the calls as jobs of one batch and returns the jobs.
+        """
+        gate = threading.Event()
+        self.db.async_(lambda db: gate.wait())
+        jobs = []
+        for f, *args in calls:
+            jobs.append(DatabaseJob(f, self.db, *args))
+            self.db.jobs.put(jobs[-1])
+        gate.set()
+        for j in jobs:
+            j.wait()
+        return jobs
+
+    def test_results(self):
+        jobs = self.batch((insert, "a"), (insert, "b"))
+        rows = self.db.queue(get_rows)
+        self.assertEqual([j.result for j in jobs], [rows["a"][0], rows["b"][0]])
+
+    def test_coalesce(self):
+        (job,) = self.batch((insert, "a"))
+        self.batch(
+            (update, SimpleNamespace(id=job.result, value="1")),
+            (update, SimpleNamespace(id=job.result, value="2")),
+            (insert, "b"),
+            (update, SimpleNamespace(id=job.result, value="3")),
+        )
+        self.assertEqual(self.db.updates, ["2", "3"])
+        self.assertEqual(self.db.queue(get_rows)["a"], (job.result, "3"))
+
+    def test_failing_job(self):
+        first, failed, last = self.batch((insert, "a"), (fail,), (insert, "b"))
+        rows = self.db.queue(get_rows)
+        self.assertIsInstance(failed.exception, ValueError)
+        self.assertNotIn("partial", rows)
+        self.assertEqual(first.result, rows["a"][0])
+        self.assertEqual(last.result, rows["b"][0])
+
+    def test_lost_transaction(self):
+        first, failed, last = self.batch(
+            (insert, "a"), (lose_transaction,), (insert, "b")
+        )
+        rows = self.db.queue(get_rows)
+        self.assertIsInstance(failed.exception, ValueError)
+        self.assertEqual(first.result, rows["a"][0])
+        self.assertEqual(last.result, rows["b"][0])
+
+    def test_read_committed(self):
+        gate = threading.Event()
+        inserted = threading.Event()
+        self.db.async_(insert, "a")
+        self.db.async_(lambda db: (inserted.set(), gate.wait()))
+
+        inserted.wait()
+        self.assertNotIn("a", self.db.read(get_rows))
+        gate.set()
+        self.db.queue(get_rows)
+        self.assertIn("a", self.db.read(get_rows))
+
+        self.assertRaises(ZeroDivisionError, self.db.read, lambda db: 1 / 0)
+
+    def test_special_path(self):
+        self.db.shutdown()
+        self.db.join()
+        core = SimpleNamespace(
+            userdir=os.path.join(self.userdir, "a?b#c%20d e"),
+            _=lambda x: x,
+            config=Config(),
+            log=logging.getLogger(),
+        )
+        self.db = DatabaseThread(core)
+        self.db.setup()
+        self.db.queue(insert, "a")
+        self.assertIn("a", self.db.read(get_rows))
+
+    def test_reader_pool(self):
+        self.db.MAX_READERS = 2
+        gate = threading.Event()
+        started = threading.Semaphore(0)
+        readers = []
+
+        def wait(db):
+            started.release()
+            gate.wait()
+            return db
+
+        def read():
+            readers.append(self.db.read(wait))
+
+        threads = [threading.Thread(target=read) for _ in range(3)]
+        for t in threads:
+            t.start()
+        started.acquire()
+        started.acquire()
+        self.assertFalse(started.acquire(timeout=0.2))  #: waits for a connection
+        gate.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(set(map(id, readers))), 2)
+        self.assertEqual(self.db.reader_count, 2)
+
+    def test_shutdown(self):
+        self.db.MAX_READERS = 1
+        gate = threading.Event()
+        started = threading.Event()
+        errors = []
+
+        def read(f):
+            try:
+                self.db.read(f)
+            except RuntimeError as exc:
+                errors.append(exc)
+
+        def wait(db):
+            started.set()
+            gate.wait()
+
+        first = threading.Thread(target=read, args=(wait,))
+        first.start()
+        started.wait()
+        second = threading.Thread(target=read, args=(get_rows,))
+        second.start()
+
+        self.db.shutdown()
+        self.db.join()
+        second.join(1)
+        self.assertFalse(second.is_alive())
+        self.assertEqual(len(errors), 1)
+
+        gate.set()
+        first.join()
+        self.assertEqual(len(errors), 1)
+        self.assertRaises(RuntimeError, self.db.read, get_rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import re
+import resource
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from pyload.core.network.bucket import Bucket
+from pyload.core.network.download_reactor import DownloadReactor
+from pyload.core.network.http.http_download import HTTPDownload
+
+OPTIONS = {"interface": None, "proxies": {}, "ipv6": False}
+
+DATA = os.urandom(4 << 20)
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        start, end = 0, len(DATA) - 1
+        m = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if m is not None:
+            start = int(m.group(1))
+            end = min(int(m.group(2) or end), end)
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        else:
+            self.send_response(200)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        try:
+            self.wfile.write(DATA[start : end + 1])
+        except OSError:
+            pass
+
+
+class TestDownloadReactor(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/file"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.dir)
+
+    def test_high_file_descriptors(self):
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if hard != resource.RLIM_INFINITY and hard < 2048:
+            self.skipTest("not enough file descriptors")
+        resource.setrlimit(resource.RLIMIT_NOFILE, (2048, hard))
+        self.addCleanup(resource.setrlimit, resource.RLIMIT_NOFILE, (soft, hard))
+
+        #: all sockets of the transfers get numbers above what select handles
+        files = [open(os.devnull) for _ in range(1100)]
+        self.addCleanup(lambda: [fp.close() for fp in files])
+
+        reactor = DownloadReactor()
+        bucket = Bucket(rate=6 << 20)  #: keeps the reactor waiting most of the time
+        errors = []
+
+        def download(i):
+            filename = os.path.join(self.dir, f"{i}.bin")
+            try:
+                HTTPDownload(
+                    self.url, filename, bucket=bucket, options=OPTIONS, reactor=reactor
+                ).download(chunks=3)
+                with open(filename, mode="rb") as fp:
+                    self.assertEqual(fp.read(), DATA)
+            except Exception as exc:
+                errors.append(exc)
+
+        start = time.time()
+        cpu = time.process_time()
+        threads = [threading.Thread(target=download, args=(i,)) for i in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(30)
+
+        self.assertEqual(errors, [])
+        #: no busy waiting
+        self.assertLess(time.process_time() - cpu, (time.time() - start) / 2)
+
+    def test_failure(self):
+        reactor = DownloadReactor()
+        filename = os.path.join(self.dir, "file.bin")
+        perform = reactor._perform
+
+        def fail(ready):
+            raise RuntimeError("broken")
+
+        reactor._perform = fail
+        dl = HTTPDownload(self.url, filename, options=OPTIONS, reactor=reactor)
+        errors = []
+
+        def download():
+            try:
+                dl.download(chunks=2)
+            except Exception as exc:
+                errors.append(exc)
+
+        t = threading.Thread(target=download, daemon=True)
+        t.start()
+        t.join(10)
+        self.assertFalse(t.is_alive())
+        self.assertIsInstance(errors[0], RuntimeError)
+        for _ in range(50):
+            if reactor.thread is None:
+                break
+            time.sleep(0.1)
+        self.assertIsNone(reactor.thread)
+
+        #: the next download starts a new thread
+        reactor._perform = perform
+        HTTPDownload(self.url, filename, options=OPTIONS, reactor=reactor).download(
+            chunks=2
+        )
+        with open(filename, mode="rb") as fp:
+            self.assertEqual(fp.read(), DATA)
+
+
+if __name__ == "__main__":
+    unittest.main()
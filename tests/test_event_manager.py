@@ -0,0 +1,40 @@
+import unittest
+from types import SimpleNamespace
+
+from pyload.core.managers.event_manager import EventManager, InsertEvent, UpdateEvent
+
+RELOAD = [["reload", "queue"], ["reload", "collector"]]
+
+
+class TestEventManager(unittest.TestCase):
+    def setUp(self):
+        self.events = EventManager(SimpleNamespace(_=None))
+
+    def test_new_client_reloads(self):
+        self.assertEqual(self.events.get_events("uuid"), RELOAD)
+        self.assertEqual(self.events.get_events("uuid"), [])
+
+    def test_updates_are_coalesced(self):
+        cursor, _ = self.events.get_events_since(None)
+        self.events.add_event(UpdateEvent("file", 1, "queue"))
+        self.events.add_event(InsertEvent("file", 2, 1, "queue"))
+        self.events.add_event(UpdateEvent("file", 1, "queue"))
+
+        cursor, events = self.events.get_events_since(cursor)
+        self.assertEqual(
+            events, [["insert", "queue", "file", 2, 1], ["update", "queue", "file", 1]]
+        )
+        self.assertEqual(self.events.get_events_since(cursor), (cursor, []))
+
+    def test_missed_events_reload(self):
+        cursor, _ = self.events.get_events_since(None)
+        for i in range(self.events.MAX_EVENTS + 1):
+            self.events.add_event(InsertEvent("file", i, 0, "queue"))
+
+        self.assertEqual(len(self.events.events), self.events.MAX_EVENTS)
+        self.assertEqual(self.events.get_events_since(cursor)[1], RELOAD)
+        self.assertEqual(self.events.wait_events(cursor + 1, 0)[1][0][3], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from pyload.core.network.browser import Browser
+from pyload.core.network.http.exceptions import BadHeader
+from pyload.core.network.http.http_request import HTTPRequest
+from pyload.plugins.base.plugin import BasePlugin
+
+OPTIONS = {"interface": None, "proxies": {}, "ipv6": False}
+
+BODY = "".join(f"line {i} äöü €\n" for i in range(20000)).encode()
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, code, length):
+        self.send_response(code)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(length))
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path == "/body":
+            self.send(200, len(BODY))
+            self.wfile.write(BODY)
+
+        elif self.path == "/empty-error":
+            self.send(503, 0)
+
+        elif self.path == "/split":
+            char = "€".encode()
+            self.send(200, len(char) + 1)
+            self.wfile.write(b"a" + char[:1])
+            self.wfile.flush()
+            time.sleep(0.2)  #: arrives as two pieces
+            self.wfile.write(char[1:])
+
+
+class TestLoadStream(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        cls.url = f"http://127.0.0.1:{cls.server.server_port}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.req = HTTPRequest(options=OPTIONS, limit=1000)
+
+    def tearDown(self):
+        self.req.close()
+
+    def test_stream(self):
+        pieces = list(self.req.load_stream(f"{self.url}/body"))
+        self.assertEqual("".join(pieces), BODY.decode())
+        self.assertEqual(self.req.code, 200)
+
+        pieces = list(self.req.load_stream(f"{self.url}/body", decode=False))
+        self.assertEqual(b"".join(pieces), BODY)
+
+    def test_empty_error(self):
+        with self.assertRaises(BadHeader) as cm:
+            list(self.req.load_stream(f"{self.url}/empty-error"))
+        self.assertEqual(cm.exception.code, 503)
+        self.assertEqual(self.req.code, 503)
+
+    def test_split_character(self):
+        pieces = list(self.req.load_stream(f"{self.url}/split"))
+        self.assertEqual(pieces, ["a", "€"])
+
+    def test_wrappers(self):
+        browser = Browser(options=OPTIONS)
+        pieces = browser.load_stream(f"{self.url}/body")
+        self.assertEqual("".join(pieces), BODY.decode())
+
+        core = SimpleNamespace(
+            _=lambda x: x,
+            debug=0,
+            log=logging.getLogger(),
+            request_factory=SimpleNamespace(get_request=lambda name: browser),
+        )
+        plugin = BasePlugin(core)
+        pieces = plugin.load_stream(f"{self.url}/body")
+        self.assertEqual("".join(pieces), BODY.decode())
+        with self.assertRaises(BadHeader):
+            list(plugin.load_stream(f"{self.url}/empty-error"))
+        browser.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from pyload.core.datatypes import ttl_cache
+from pyload.core.datatypes.ttl_cache import TTLCache
+from pyload.core.threads.info_pool import InfoPool
+
+
+class Plugin:
+    def __init__(self, fail=()):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.fail = fail
+
+    def get_info(self, urls):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(0.02)
+        with self.lock:
+            self.running -= 1
+        if urls[0] in self.fail:
+            raise ValueError(urls[0])
+        for url in urls:
+            yield (url, 0, 2, url)
+
+
+class TestInfoPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = InfoPool()
+
+    def test_limits_and_results(self):
+        plugins = {"A": Plugin(), "B": Plugin()}
+        results = {}
+
+        def check(name, urls):
+            for _, result, exc in self.pool.check(name, plugins[name], urls):
+                results.setdefault(name, []).extend(res[3] for res in result)
+
+        urls = [f"http://host/{i}" for i in range(100)]
+        threads = [
+            threading.Thread(target=check, args=(name, urls))
+            for name in ("A", "A", "B")
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results["A"]), sorted(urls * 2))
+        self.assertEqual(sorted(results["B"]), sorted(urls))
+        self.assertEqual(plugins["A"].max_running, self.pool.HOST_WORKERS)
+        self.assertLessEqual(self.pool.workers, self.pool.WORKERS)
+        self.assertFalse(self.pool.queues)
+
+    def test_failed_batch(self):
+        urls = [f"http://host/{i}" for i in range(15)]
+        plugin = Plugin(fail=(urls[0],))
+        batches = {x[0][0]: x for x in self.pool.check("A", plugin, urls)}
+
+        self.assertEqual(batches[urls[0]], (urls[:10], [], mock.ANY))
+        self.assertIsInstance(batches[urls[0]][2], ValueError)
+        self.assertEqual(len(batches[urls[10]][1]), 5)
+
+
+class TestTTLCache(unittest.TestCase):
+    def test_expiry_and_size(self):
+        now = [0]
+        with mock.patch.object(ttl_cache.time, "time", lambda: now[0]):
+            cache = TTLCache(2, 10)
+            cache.set("a", 1)
+            now[0] = 5
+            cache.set("b", 2)
+            self.assertEqual(cache.get("a"), 1)
+
+            now[0] = 11
+            self.assertNotIn("a", cache)
+            cache.set("c", 3)
+            cache.set("d", 4)
+            self.assertEqual(list(cache.entries), ["c", "d"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+
+from pyload.core.datatypes.job_index import JobIndex
+
+
+def accept_all(plugin, queue):
+    return True
+
+
+class TestJobIndex(unittest.TestCase):
+    def setUp(self):
+        self.jobs = JobIndex()
+        self.jobs.load(
+            [
+                (1, "A", 10, 1, 1, 0),
+                (2, "B", 10, 1, 1, 1),
+                (3, "A", 20, 1, 0, 0),
+                (4, "C", 30, 0, 0, 5),
+            ]
+        )
+
+    def test_get_in_queue_order(self):
+        self.assertEqual(self.jobs.get(accept_all), 3)
+        self.assertEqual(self.jobs.get(lambda plugin, queue: queue == 1), 3)
+        self.assertEqual(self.jobs.get(lambda plugin, queue: plugin == "B"), 2)
+
+    def test_update(self):
+        self.jobs.update(3, "A", 20, 1, 0, 0, status=7)  #: starting
+        self.assertEqual(self.jobs.get(lambda plugin, queue: queue == 1), 1)
+
+        self.jobs.update(2, "B", 10, 1, 0, 0, status=3)  #: moved to the top
+        self.assertEqual(self.jobs.get(lambda plugin, queue: queue == 1), 2)
+        self.assertEqual(len(self.jobs), 3)
+
+    def test_load_and_remove_package(self):
+        self.jobs.load_package(10, [(5, "A", 10, 1, 2, 0)])
+        self.assertEqual(len(self.jobs), 3)
+        self.assertEqual(self.jobs.get(lambda plugin, queue: plugin == "B"), None)
+
+        self.jobs.remove_package(20)
+        self.jobs.remove(4)
+        self.assertEqual(self.jobs.get(accept_all), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
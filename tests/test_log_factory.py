@@ -0,0 +1,78 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from types import SimpleNamespace
+
+from pyload.core.log_factory import LogFactory, LogQueueHandler
+
+
+class Config:
+    def __init__(self, userdir, **options):
+        self.options = {
+            "console": False,
+            "syslog": False,
+            "filelog": True,
+            "filelog_folder": userdir,
+            "filelog_rotate": False,
+            "background": True,
+        }
+        self.options.update(options)
+
+    def get(self, section, option):
+        return self.options[option]
+
+
+class TestLogFactory(unittest.TestCase):
+    def setUp(self):
+        self.userdir = tempfile.mkdtemp()
+        core = SimpleNamespace(
+            _=lambda x: x, debug=1, userdir=self.userdir, config=Config(self.userdir)
+        )
+        self.factory = LogFactory(core)
+        self.log = self.factory.get_logger("test")
+
+    def tearDown(self):
+        self.factory.shutdown()
+        shutil.rmtree(self.userdir)
+
+    def read_log(self):
+        with open(f"{self.userdir}/test{LogFactory.FILE_EXTENSION}") as fp:
+            return fp.read()
+
+    def test_background(self):
+        self.assertIs(self.factory.get_logger("test"), self.log)
+        (handler,) = self.log.handlers
+        self.assertIsInstance(handler, LogQueueHandler)
+
+        self.log.debug("message %d", 1)
+        self.log.error("failed", exc_info=ValueError("reason"))
+        self.factory.shutdown()
+
+        text = self.read_log()
+        self.assertIn("message 1", text)
+        self.assertIn("ValueError: reason", text)
+
+    def test_full_queue(self):
+        (handler,) = self.log.handlers
+        (filehdlr,) = handler.listener.handlers
+        blocked = threading.Event()
+        filehdlr.acquire()  #: the listener waits on the first record
+        filehdlr.handle = lambda record, handle=filehdlr.handle: (
+            blocked.set(),
+            handle(record),
+        )
+        try:
+            self.log.info("first")
+            blocked.wait(1)
+            for i in range(LogFactory.QUEUE_SIZE + 10):
+                self.log.debug("message %d", i)
+        finally:
+            filehdlr.release()
+
+        self.assertEqual(handler.dropped, 10)
+        self.assertEqual(self.factory.stats()["test"]["dropped"], 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
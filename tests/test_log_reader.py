@@ -0,0 +1,65 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from pyload.core.log_reader import LogReader
+
+
+class TestLogReader(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "pyload.log")
+        self.lines = []
+        for i in range(3000):
+            minute, second = divmod(i // 2, 60)
+            self.lines.append(
+                f"[2020-01-01 10:{minute:02}:{second:02}]  INFO  pyload  line {i}\n"
+            )
+            if i % 100 == 50:
+                self.lines.append("Traceback (most recent call last):\n")
+        self.write(self.lines)
+
+        self.reader = LogReader(self.path, "utf-8")
+        self.reader.BLOCK_SIZE = 1024
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, lines, mode="w"):
+        with open(self.path, mode=mode, encoding="utf-8") as fp:
+            fp.writelines(lines)
+
+    def test_read(self):
+        self.assertEqual(self.reader.length(), len(self.lines))
+        self.assertGreater(len(self.reader.offsets), 10)
+        for start in (0, 1, 1234, len(self.lines) - 2, len(self.lines) + 1):
+            self.assertEqual(self.reader.read(start, 5), self.lines[start : start + 5])
+        self.assertEqual(self.reader.read(2000), self.lines[2000:])
+        self.assertEqual(self.reader.tail(7), self.lines[-7:])
+
+        self.write(["new\n", "unfinished"], "a")
+        self.assertEqual(self.reader.length(), len(self.lines) + 2)
+        self.assertEqual(self.reader.read(len(self.lines)), ["new\n", "unfinished"])
+        self.assertEqual(self.reader.tail(2), ["new\n", "unfinished"])
+
+    def test_find(self):
+        for date in ("2020-01-01 09:00:00", "2020-01-01 10:12:34", "2020-01-01 10:24:59"):
+            expected = next(
+                n
+                for n, line in enumerate(self.lines)
+                if line.startswith("[") and line[1:20] >= date
+            )
+            self.assertEqual(self.reader.find(date), expected)
+        self.assertEqual(self.reader.find("2021-01-01 00:00:00"), len(self.lines))
+
+    def test_rotated(self):
+        self.assertEqual(self.reader.length(), len(self.lines))
+        os.rename(self.path, self.path + ".1")
+        self.write(["first\n", "second\n"])
+        self.assertEqual(self.reader.length(), 2)
+        self.assertEqual(self.reader.read(1), ["second\n"])
+
+
+if __name__ == "__main__":
+    unittest.main()
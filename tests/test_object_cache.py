@@ -0,0 +1,47 @@
+import unittest
+
+from pyload.core.datatypes.object_cache import ObjectCache
+
+
+class Item:
+    def __init__(self, id, pinned=False):
+        self.id = id
+        self.pinned = pinned
+
+
+class TestObjectCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = ObjectCache(2)
+
+    def test_shrink(self):
+        for id in range(4):
+            self.cache[id] = Item(id, pinned=id == 0)
+        self.cache[1]  #: used recently
+
+        dropped = self.cache.shrink(lambda x: x.pinned)
+        self.assertEqual([x.id for x in dropped], [2, 3])
+        self.assertEqual(list(self.cache.entries), [0, 1])
+        self.assertEqual(self.cache.evictions, 2)
+
+    def test_dropped_objects_in_use(self):
+        kept = Item(0)
+        self.cache[0] = kept
+        self.cache[1] = Item(1)
+        self.cache[2] = Item(2)
+        self.cache.shrink(lambda x: False)
+
+        self.assertNotIn(0, self.cache.entries)
+        self.assertIs(self.cache.get(0), kept)
+        self.assertIn(0, self.cache.entries)
+
+        del kept
+        self.cache.shrink(lambda x: False)
+        self.assertNotIn(1, self.cache)
+        self.assertIsNone(self.cache.get(1))
+        self.assertEqual(
+            (self.cache.hits, self.cache.misses, len(self.cache)), (1, 1, 2)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+from pyload.core.threads.database_thread import DatabaseThread
+
+
+class Config:
+    def get(self, section, option):
+        return "NORMAL"
+
+
+def get_stats(db):
+    db.c.execute("SELECT id, sizetotal, linkstotal, sizedone, linksdone FROM pstats")
+    return {r[0]: r[1:] for r in db.c if r[2]}
+
+
+def count_stats(db):
+    db.c.execute(
+        "SELECT package, SUM(size), COUNT(*), \
+        SUM(CASE WHEN status IN (0,4,13) THEN size ELSE 0 END), \
+        SUM(status IN (0,4,13)) FROM links GROUP BY package"
+    )
+    return {r[0]: r[1:] for r in db.c}
+
+
+def set_links(db, query, *args):
+    db.c.execute(f"UPDATE links SET {query}", args)
+
+
+class TestPackageStats(unittest.TestCase):
+    def setUp(self):
+        self.userdir = tempfile.mkdtemp()
+        self.core = SimpleNamespace(
+            userdir=self.userdir,
+            _=lambda x: x,
+            config=Config(),
+            log=logging.getLogger(),
+        )
+
+    def tearDown(self):
+        self.db.shutdown()
+        self.db.join()
+        shutil.rmtree(self.userdir)
+
+    def start(self):
+        self.db = DatabaseThread(self.core)
+        self.db.setup()
+
+    def link(self, id, package, size, status):
+        return SimpleNamespace(
+            id=id,
+            url=f"http://example.com/{id}",
+            name=str(id),
+            size=size,
+            status=status,
+            error="",
+            packageid=package,
+            order=0,
+        )
+
+    def assert_stats(self):
+        self.db.sync_save()
+        self.assertEqual(self.db.queue(get_stats), self.db.queue(count_stats))
+
+    def test_triggers(self):
+        self.start()
+        db = self.db
+        first = db.add_package("first", "first", 0)
+        second = db.add_package("second", "second", 1)
+        empty = db.add_package("empty", "empty", 0)
+
+        db.add_links([(f"http://example.com/{i}", "Plugin") for i in range(5)], first)
+        fid = db.add_link("http://example.com/x", "x", "Plugin", second)
+        self.assert_stats()
+
+        db.update_link(self.link(1, first, 100, 3))
+        db.update_link(self.link(2, first, 200, 0))  #: finished
+        db.update_link(self.link(fid, second, 50, 4))  #: skipped
+        self.assert_stats()
+        self.assertEqual(db.queue(get_stats)[first], (300, 5, 200, 1))
+
+        db.update_link(self.link(2, second, 200, 0))  #: moved to another package
+        db.update_link(self.link(1, first, 150, 13))
+        db.queue(set_links, "package=? WHERE id=?", second, 4)
+        self.assert_stats()
+
+        db.queue(set_links, "status=3 WHERE package=?", second)  #: restarted
+        db.delete_link(self.link(3, first, 0, 3))
+        self.assert_stats()
+
+        db.delete_package(SimpleNamespace(id=second, order=0, queue=1))
+        self.assert_stats()
+        self.assertNotIn(second, db.queue(get_stats))
+
+        #: packages without links are not listed, like with the old pstats view
+        self.assertEqual(list(db.get_all_packages(0)), [first])
+        self.assertEqual(db.get_all_packages(0)[first]["linkstotal"], 2)
+        self.assertNotIn(empty, db.get_all_packages(0))
+
+    def test_convert_v4(self):
+        datadir = os.path.join(self.userdir, "data")
+        os.makedirs(datadir)
+        with open(os.path.join(datadir, DatabaseThread.VERSION_FILENAME), "w") as fp:
+            fp.write("4")
+
+        #: tables and pstats view as created by version 4
+        conn = sqlite3.connect(os.path.join(datadir, DatabaseThread.DB_FILENAME))
+        conn.executescript(
+            """
+            CREATE TABLE "packages" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "name" TEXT NOT NULL, "folder" TEXT, "password" TEXT DEFAULT "", "site" TEXT DEFAULT "", "queue" INTEGER DEFAULT 0 NOT NULL, "packageorder" INTEGER DEFAULT 0 NOT NULL);
+            CREATE TABLE "links" ("id" INTEGER PRIMARY KEY AUTOINCREMENT, "url" TEXT NOT NULL, "name" TEXT, "size" INTEGER DEFAULT 0 NOT NULL, "status" INTEGER DEFAULT 3 NOT NULL, "plugin" TEXT DEFAULT "DefaultPlugin" NOT NULL, "error" TEXT DEFAULT "", "linkorder" INTEGER DEFAULT 0 NOT NULL, "package" INTEGER DEFAULT 0 NOT NULL, FOREIGN KEY(package) REFERENCES packages(id));
+            CREATE VIEW "pstats" AS SELECT p.id AS id, SUM(l.size) AS sizetotal, COUNT(l.id) AS linkstotal, linksdone, sizedone
+                FROM packages p JOIN links l ON p.id = l.package LEFT OUTER JOIN
+                (SELECT p.id AS id, COUNT(*) AS linksdone, SUM(l.size) AS sizedone
+                FROM packages p JOIN links l ON p.id = l.package AND l.status in (0,4,13) GROUP BY p.id) s ON s.id = p.id
+                GROUP BY p.id;
+            INSERT INTO packages (name, queue) VALUES ('a', 0), ('b', 1), ('empty', 0);
+            INSERT INTO links (url, size, status, package) VALUES
+                ('1', 100, 0, 1), ('2', 200, 3, 1), ('3', 50, 4, 2), ('4', 25, 8, 2);
+            """
+        )
+        conn.commit()
+        conn.close()
+
+        self.start()
+        self.assertEqual(
+            self.db.queue(get_stats), {1: (300, 2, 100, 1), 2: (75, 2, 50, 1)}
+        )
+        self.db.add_link("5", "5", "Plugin", 3)
+        self.assert_stats()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from pyload.core.managers.plugin_manager import PluginManager
+
+
+class TestPluginIndexCache(unittest.TestCase):
+    def setUp(self):
+        self.userdir = tempfile.mkdtemp()
+        os.makedirs(os.path.join(self.userdir, "data"))
+        self.core = SimpleNamespace(
+            userdir=self.userdir,
+            _=lambda x: x,
+            log=logging.getLogger(),
+            debug=0,
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.userdir)
+
+    def create_manager(self):
+        manager = PluginManager.__new__(PluginManager)
+        manager.pyload = self.core
+        manager._ = self.core._
+        manager._index_cache = manager._load_index_cache()
+        manager._index_cache_used = set()
+        manager._index_cache_changed = False
+        return manager
+
+    def test_cache(self):
+        manager = self.create_manager()
+        plugins, configs = manager.parse("addons")
+        manager._save_index_cache()
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(self.userdir, "data", PluginManager.INDEX_CACHE_FILENAME)
+            )
+        )
+
+        cached = self.create_manager()
+        self.assertEqual(cached._index_cache, manager._index_cache)
+        with mock.patch("builtins.open", wraps=open) as m:
+            self.assertEqual(cached.parse("addons"), (plugins, configs))
+        #: no plugin source was read again
+        self.assertFalse([c for c in m.call_args_list if c.kwargs.get("mode") != "wb"])
+
+        with mock.patch.object(os, "getuid", return_value=os.getuid() + 1):
+            self.assertEqual(self.create_manager()._index_cache, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from pyload.core.scheduler import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        core = SimpleNamespace(_=lambda x: x, log=mock.Mock(), debug=0)
+        self.scheduler = Scheduler(core)
+        self.scheduler.start()
+
+    def tearDown(self):
+        self.scheduler.stop()
+
+    def test_order_and_callback(self):
+        calls = []
+        done = threading.Event()
+
+        def call(name):
+            calls.append(name)
+            return name
+
+        self.scheduler.add_job(0.1, call, ["late"], threaded=False)
+        d = self.scheduler.add_job(0.02, call, ["early"], threaded=False)
+        d.add_callback(lambda ret: done.set())
+
+        self.assertTrue(done.wait(1))
+        time.sleep(0.15)
+        self.assertEqual(calls, ["early", "late"])
+        self.assertEqual(self.scheduler.stats()["executed"], 2)
+
+    def test_remove_job(self):
+        calls = []
+        jobs = [
+            self.scheduler.add_job(0.05, calls.append, [i], threaded=False)
+            for i in range(10)
+        ]
+        for d in jobs[1:]:
+            self.assertTrue(self.scheduler.remove_job(d))
+        self.assertFalse(self.scheduler.remove_job(jobs[1]))
+        #: removed jobs got dropped from the heap once they were the majority
+        self.assertLess(len(self.scheduler.queue), 10)
+
+        time.sleep(0.2)
+        self.assertEqual(calls, [0])
+        self.assertFalse(self.scheduler.remove_job(jobs[0]))
+        self.assertEqual(self.scheduler.stats()["jobs"], 0)
+
+    def test_threaded_failure(self):
+        done = threading.Event()
+
+        def fail():
+            raise ValueError
+
+        self.scheduler.add_job(0, fail)
+        self.scheduler.add_job(0.02, done.set)
+
+        self.assertTrue(done.wait(1))
+        time.sleep(0.05)
+        self.assertEqual(self.scheduler.pyload.log.error.call_count, 1)
+        self.assertEqual(self.scheduler.stats()["active"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
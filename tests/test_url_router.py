@@ -0,0 +1,157 @@
+import logging
+import re
+import shutil
+import tempfile
+import unittest
+from itertools import chain
+from types import SimpleNamespace
+from unittest import mock
+
+from pyload.core.managers import plugin_manager
+from pyload.core.managers.plugin_manager import PluginManager, URLRouter
+
+#: tried before the plugins of pyload
+PATTERNS = (
+    ("Exact", r"^(?:exact|other)$"),
+    ("Port", r"https?://ported\.net:\d+/.+"),
+    ("Userinfo", r"https?://\w+:\w+@secret\.org/.+"),
+    ("Subdomain", r"https?://(?:[\w-]+\.)*suffix\.com/\w+"),
+    ("NoScheme", r"(?:https?://)?noscheme\.io/\w+"),
+    ("IgnoreCase", r"(?i)https?://CaseHost\.com/\w+"),
+    ("Case", r"https?://CaseHost\.com/\w+"),
+    ("Extension", r".+\.(?:dlc|ccf)$"),
+)
+
+URLS = (
+    "exact",
+    "exact\n",
+    "exactly",
+    "http://ported.net:8080/x",
+    "http://ported.net/x",
+    "http://user:pw@secret.org/x",
+    "http://secret.org/x",
+    "http://a.b.suffix.com/x",
+    "http://suffix.com/x",
+    "http://notsuffix.com/x",
+    "http://suffix.com.evil.org/x",
+    "noscheme.io/x",
+    "https://noscheme.io/x",
+    "http://casehost.com/x",
+    "HTTP://CASEHOST.COM/x",
+    "http://CaseHost.com/x",
+    "/tmp/links.dlc",
+    "links.ccf\n",
+    "https://rapidgator.net/file/abc123/name.rar.html",
+    "http://www.rapidgator.net/file/abc123",
+    "HTTPS://RAPIDGATOR.NET/file/abc123",
+    "rapidgator.net/file/abc123",
+    "https://rapidgator.net:443/file/abc123",
+    "https://user:pw@rapidgator.net/file/abc123",
+    "https://evil.com/rapidgator.net/file/abc123",
+    "https://rapidgator.net.evil.com/file/abc123",
+    "https://mega.nz/file/abc#def",
+    "https://mega.nz/folder/abc#def",
+    "https://1fichier.com/?abcdef",
+    "https://abcdef.1fichier.com/",
+    "https://www.youtube.com/watch?v=abc",
+    "https://youtu.be/abc",
+    "https://drive.google.com/file/d/abc/view",
+    "https://filecrypt.cc/Container/ABCDEF.html",
+    "magnet:?xt=urn:btih:abc",
+    "http://example.com/file.torrent",
+    "https://unknown.example/x",
+    "http://",
+    "",
+)
+
+
+def full_scan(plugins, url):
+    for name, regex in plugins:
+        if regex.match(url):
+            return name
+
+
+class TestURLRouter(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.userdir = tempfile.mkdtemp()
+        core = SimpleNamespace(
+            userdir=cls.userdir,
+            _=lambda x: x,
+            log=logging.getLogger(),
+            debug=0,
+        )
+        manager = PluginManager.__new__(PluginManager)
+        manager.pyload = core
+        manager._ = core._
+        manager._router = None
+        manager._index_cache = {}
+        manager._index_cache_used = set()
+        manager._index_cache_changed = False
+        manager.decrypter_plugins = manager.parse("decrypters", pattern=True)[0]
+        manager.downloader_plugins = manager.parse("downloaders", pattern=True)[0]
+        manager.container_plugins = manager.parse("containers", pattern=True)[0]
+        cls.manager = manager
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.userdir)
+
+    def get_plugins(self):
+        plugins = [(name, re.compile(pattern)) for name, pattern in PATTERNS]
+        for name, value in chain(
+            self.manager.decrypter_plugins.items(),
+            self.manager.downloader_plugins.items(),
+            self.manager.container_plugins.items(),
+        ):
+            plugins.append((name, value["re"]))
+        return plugins
+
+    def assert_routes(self, router):
+        for url in URLS:
+            with self.subTest(url=url):
+                self.assertEqual(router.find(url), full_scan(router.plugins, url))
+
+    def test_routes(self):
+        router = URLRouter(self.get_plugins())
+        self.assert_routes(router)
+        #: most patterns are not tried for every url
+        self.assertLess(len(router.fallback), len(router.plugins) / 4)
+
+        names = [router.find(url) for url in URLS[:18]]
+        self.assertEqual(
+            names,
+            ["Exact", "Exact", None, "Port", None, "Userinfo", None]
+            + ["Subdomain", "Subdomain", None, None, "NoScheme", "NoScheme"]
+            + ["IgnoreCase", "IgnoreCase", "IgnoreCase", "Extension", "Extension"],
+        )
+
+    def test_multi_account_override(self):
+        manager = self.manager
+        hdict = manager.downloader_plugins["RapidgatorNet"]
+        original = hdict["re"]
+        router = manager.get_router()
+
+        #: like MultiAccount, which adds the hosts of a multi hoster to a pattern
+        hdict["re"] = re.compile(
+            rf"{hdict['pattern']}|.*(?P<DOMAIN>mega\.nz|youtu\.be|unknown\.example).*"
+        )
+        try:
+            overridden = manager.get_router()
+            self.assertIsNot(overridden, router)
+            url = "https://unknown.example/x"
+            self.assertEqual(overridden.find(url), "RapidgatorNet")
+            self.assert_routes(overridden)
+        finally:
+            hdict["re"] = original
+        self.assertIsNot(manager.get_router(), overridden)
+
+    def test_parser_missing(self):
+        with mock.patch.object(plugin_manager, "sre_parse", None):
+            router = URLRouter(self.get_plugins())
+        self.assertEqual(router.fallback, list(range(len(router.plugins))))
+        self.assert_routes(router)
+
+
+if __name__ == "__main__":
+    unittest.main()